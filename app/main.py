@@ -1,19 +1,26 @@
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse, StreamingResponse
 import os
+import asyncio
 from dotenv import load_dotenv
 import json
+import time
+import uuid
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 import logging
 
 from .models.job import JobData, WebhookPayload
-from .services.notion_service import NotionService  
-from .services.ai_service import AIService
-from .services.template_service import TemplateService
-from .services.pdf_service import PDFService
-from .services.markdown_service import MarkdownService
+from .services.health_service import HealthMonitor
+from .services.warmup_service import WarmUp
+from .services.artifact_service import format_record
+from .utils.container import Container
+from .utils.cancellation import job_control, current_token, check_cancelled, detached
+from .utils.events import job_events
+from .utils.metrics import metrics
+from .utils.tracing import tracer
 
 # Load environment variables
 load_dotenv()
@@ -28,16 +35,163 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialize services
-notion_service = NotionService()
-ai_service = AIService()
-template_service = TemplateService()
-pdf_service = PDFService()
-markdown_service = MarkdownService()
+# Ollama is only a dependency when cover letters are written with it
+USE_OLLAMA = os.getenv("AI_USE_OLLAMA", "false").lower() == "true"
+
+# Services are built on first use; each factory imports its own module so
+# cold starts don't pay for notion_client, Jinja2 or the PDF stack up front
+services = Container()
+
+def _shared_state():
+    from .services.state_service import SharedState
+    return SharedState()
+
+def _notion_service():
+    from .services.notion_service import NotionService
+    return NotionService()
+
+def _ai_service():
+    from .services.ai_service import AIService
+    return AIService()
+
+def _template_service():
+    from .services.template_service import TemplateService
+    return TemplateService()
+
+def _pdf_service():
+    from .services.pdf_service import PDFService
+    return PDFService(template_service=services.templates)
+
+def _markdown_service():
+    from .services.markdown_service import MarkdownService
+    return MarkdownService()
+
+def _artifact_store():
+    from .services.artifact_service import ArtifactStore
+    return ArtifactStore(lease=lambda ttl: services.state.acquire_lease("artifact_compactor", ttl))
+
+def _file_service():
+    from .services.file_service import FileService
+    return FileService(services.artifacts)
+
+def _variant_service():
+    from .services.variant_service import ResumeVariantService
+    return ResumeVariantService(services.templates, services.markdown, services.provider("pdf"))
+
+def _notion_outbox():
+    from .services.outbox_service import NotionOutbox
+    return NotionOutbox(services.state, services.notion, lease=lambda ttl: services.state.acquire_lease("notion_outbox", ttl))
+
+def _batch_service():
+    from .services.batch_service import BatchExportService
+    return BatchExportService(services.artifacts)
+
+services.register("state", _shared_state)
+services.register("notion", _notion_service)
+services.register("ai", _ai_service)
+services.register("templates", _template_service)
+services.register("pdf", _pdf_service)
+services.register("markdown", _markdown_service)
+services.register("artifacts", _artifact_store)
+services.register("files", _file_service)
+services.register("variants", _variant_service)
+services.register("batch", _batch_service)
+services.register("outbox", _notion_outbox)
+
+# One-off startup costs paid before readiness, so the first job runs as fast
+# as the rest: connections, the Ollama model, compiled templates, lazy imports
+warm_up = WarmUp()
+warm_up.register("state", lambda: services.state.is_healthy())
+warm_up.register("notion", lambda: services.notion.warm_up())
+if USE_OLLAMA:
+    warm_up.register("ollama", lambda: services.ai.preload_model())
+warm_up.register("templates", lambda: services.templates.warm_up())
+
+async def _warm_up_pipeline():
+    """Run a sample job through generation and rendering without writing anywhere"""
+    job_data = JobData(
+        job_title="Software Engineer",
+        company_name="Warm-up",
+        job_description="Python, FastAPI, SQL and REST APIs",
+        notion_page_id="warm-up"
+    )
+    # Building the AI service loads the personal info and base resume
+    ai = await asyncio.to_thread(lambda: services.ai)
+    resume_data = await ai.customize_resume(job_data)
+    # The Ollama step loads the model; a sample generation here would only hold up readiness
+    cover_letter = "Dear Hiring Manager,\n\nWarm-up." if ai.use_ollama else await ai.generate_cover_letter(job_data)
+    await asyncio.to_thread(_render_sample, cover_letter, resume_data, job_data)
+
+def _render_sample(cover_letter: str, resume_data: dict, job_data: JobData):
+    if os.getenv("OUTPUT_FORMAT", "markdown").lower() == "markdown":
+        content = services.markdown.create_cover_letter_markdown(cover_letter, job_data)
+        content += services.markdown.create_resume_markdown(resume_data, job_data)
+        services.notion._markdown_to_notion_blocks(content)
+    else:
+        # Fonts, stylesheets and the PDF backend load on the first render
+        with tempfile.TemporaryDirectory() as output_dir:
+            services.pdf.create_cover_letter_pdf(cover_letter, job_data, os.path.join(output_dir, "cover_letter.pdf"))
+            services.pdf.create_resume_pdf(resume_data, job_data, os.path.join(output_dir, "resume.pdf"))
+
+warm_up.register("pipeline", _warm_up_pipeline)
+
+# Background health probes - /health answers from this cache. The backlog
+# counts jobs queued or running in every worker, not just this one.
+health_monitor = HealthMonitor(backlog=lambda: services.state.active_jobs(), warm_up=warm_up)
+health_monitor.register("state", lambda: services.state.is_healthy())
+health_monitor.register("notion", lambda: services.notion.is_healthy(), required=True)
+if USE_OLLAMA:
+    # Without AI_USE_OLLAMA nothing calls Ollama, so a missing server isn't degradation
+    health_monitor.register("ollama", lambda: services.ai.check_ollama())
+health_monitor.register("ai", lambda: services.ai.is_healthy())
+health_monitor.register("markdown", lambda: services.markdown.is_healthy())
+if os.getenv("OUTPUT_FORMAT", "markdown").lower() == "pdf":
+    # Only probe (and so import) the PDF stack when the pipeline uses it
+    health_monitor.register("pdf", lambda: services.pdf.is_healthy())
+
+# How long a webhook delivery is remembered for de-duplication, and finished traces are shared
+WEBHOOK_DEDUP_TTL = float(os.getenv("WEBHOOK_DEDUP_TTL", "600"))
+SHARED_TRACE_TTL = float(os.getenv("SHARED_TRACE_TTL", "86400"))
+# Idle seconds between keep-alive comments on /jobs/{job_id}/events
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+# Keep each job's generated content for POST /export/bundle (off: nothing extra is written)
+BATCH_SAVE_APPLICATIONS = os.getenv("BATCH_SAVE_APPLICATIONS", "false").lower() == "true"
+# Page IDs accepted by one GET /jobs/status request
+MAX_STATUS_BATCH = int(os.getenv("MAX_STATUS_BATCH", "100"))
+# Threads for blocking calls (Notion, Ollama, SQLite, rendering) made with asyncio.to_thread
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "32"))
+# Notion caps each rich_text item at this many characters
+NOTION_TEXT_LIMIT = 2000
 
 # Create output directory if it doesn't exist
 os.makedirs(os.getenv("OUTPUT_DIR", "./output"), exist_ok=True)
 
+@app.on_event("startup")
+async def on_startup():
+    """Start background probes, the artifact compactor and the Notion outbox; warm up in the background"""
+    # asyncio.to_thread defaults to min(32, CPUs + 4) threads, which would cap Notion
+    # and Ollama calls below their adaptive limits on small machines
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="jobbuilder"))
+    await asyncio.to_thread(services.state.purge_expired)
+    await health_monitor.start()
+    await services.artifacts.start()
+    await services.outbox.start()
+    # /health/ready stays false until this finishes
+    app.state.warm_up = asyncio.create_task(warm_up.run())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop background tasks"""
+    app.state.warm_up.cancel()
+    await health_monitor.stop()
+    await services.artifacts.stop()
+    if services.is_built("outbox"):
+        await services.outbox.stop()
+    if services.is_built("templates"):
+        services.templates.stop_watching()
+    if services.is_built("batch"):
+        services.batch.shutdown()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -53,6 +207,7 @@ async def notion_webhook(request: Request, background_tasks: BackgroundTasks):
     Webhook endpoint for Notion database updates
     Processes job postings and generates application materials
     """
+    dedup_key = None
     try:
         # Get raw payload
         payload = await request.json()
@@ -75,41 +230,110 @@ async def notion_webhook(request: Request, background_tasks: BackgroundTasks):
             logger.warning("No properties found in payload")
             return {"status": "ignored", "message": "No properties in payload"}
         
+        # Notion retries deliveries and several workers may receive the same
+        # edit, so claim it in the shared state before queueing. Without
+        # last_edited_time two edits can't be told apart, so nothing is claimed.
+        page_id = page_data.get("id", "")
+        last_edited = page_data.get("last_edited_time")
+        if page_id and last_edited:
+            key = f"webhook:{page_id}:{last_edited}"
+            if not await asyncio.to_thread(services.state.claim, key, WEBHOOK_DEDUP_TTL):
+                logger.info(f"Ignoring duplicate webhook for page {page_id}")
+                return {"status": "duplicate", "message": "Webhook already received"}
+            dedup_key = key
+        
+        # The payload is the edited page, so it refreshes the status cache for free
+        if page_id and services.is_built("notion"):
+            services.notion.remember_job_status(page_data)
+        
         # Process the job application in background
-        background_tasks.add_task(process_job_application, payload)
+        job_id = uuid.uuid4().hex
+        if not await asyncio.to_thread(services.state.job_accepted, job_id, page_id):
+            logger.info(f"Job for page {page_id} is already in progress")
+            # Not processed, so a redelivery of this edit must not count as a duplicate
+            await _release_claim(dedup_key)
+            return {"status": "duplicate", "message": "Job already in progress for this page"}
+        metrics.jobs_in_progress.inc()
+        job_control.open(job_id, poll=lambda: services.state.get("cancel", job_id))
+        job_events.open(job_id)
+        job_events.publish("queued", job_id=job_id, page_id=page_id)
+        background_tasks.add_task(process_job_application, payload, job_id)
         
-        return {"status": "accepted", "message": "Job application processing started"}
+        return {"status": "accepted", "message": "Job application processing started", "job_id": job_id}
         
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in webhook payload: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
     except Exception as e:
         logger.error(f"Webhook error: {str(e)}")
+        await _release_claim(dedup_key)
         raise HTTPException(status_code=500, detail=f"Webhook processing failed: {str(e)}")
 
-async def process_job_application(payload: dict):
+async def _release_claim(dedup_key: Optional[str]):
+    if dedup_key:
+        try:
+            await asyncio.to_thread(services.state.release, dedup_key)
+        except Exception as e:
+            logger.warning(f"Could not release webhook claim {dedup_key}: {str(e)}")
+
+async def process_job_application(payload: dict, job_id: Optional[str] = None):
     """
     Background task to process job application
+    Each run is recorded as a span tree under its job ID
     """
+    job_id = job_id or uuid.uuid4().hex
+    page_id = payload.get("data", payload).get("id", "") if isinstance(payload, dict) else ""
+    
+    with tracer.start_trace(job_id, notion_page_id=page_id), job_events.job(job_id):
+        await job_control.run(job_id, lambda: _run_job_application(payload, job_id))
+    
+    # Share the finished trace so any worker can serve /jobs/{job_id}/trace
+    trace = tracer.get_trace(job_id)
+    if trace is not None:
+        try:
+            await asyncio.to_thread(services.state.put, "trace", job_id, {"tree": trace.tree(), "otlp": trace.to_otlp()}, SHARED_TRACE_TTL)
+        except Exception as e:
+            logger.warning(f"Could not share trace for job {job_id}: {str(e)}")
+
+async def _run_job_application(payload: dict, job_id: str):
+    """Run the extraction, generation, rendering and Notion stages for one job"""
+    outcome = "failed"
+    error = None
+    started = time.perf_counter()
     try:
         logger.info("Starting job application processing...")
+        await asyncio.to_thread(services.state.job_started, job_id)
+        job_events.publish("started")
         
         # Extract job data from Notion payload
-        job_data = extract_job_data_from_payload(payload)
+        with job_events.stage("extract"):
+            job_data = extract_job_data_from_payload(payload)
         
         if not job_data:
             logger.warning("No valid job data found in payload")
+            outcome = "ignored"
             return
         
         logger.info(f"Processing job: {job_data.job_title} at {job_data.company_name}")
         
+        # Long postings are pasted into the page body rather than the property
+        if description_in_page_body(payload):
+            with job_events.stage("fetch_description"):
+                job_data.job_description = await read_page_description(payload, job_data.job_description)
+        
         # Generate cover letter
         logger.info("Generating cover letter...")
-        cover_letter = await ai_service.generate_cover_letter(job_data)
+        with job_events.stage("generate_cover_letter"):
+            cover_letter = await services.ai.generate_cover_letter(job_data)
         
         # Generate customized resume
         logger.info("Customizing resume...")
-        resume_data = await ai_service.customize_resume(job_data)
+        with job_events.stage("customize_resume"):
+            resume_data = await services.ai.customize_resume(job_data)
+        
+        # Keep the generated content so it can be included in batch exports
+        if BATCH_SAVE_APPLICATIONS:
+            await asyncio.to_thread(services.batch.save_application, job_data, cover_letter, resume_data, job_id)
         
         # Get output format preference from environment
         output_format = os.getenv("OUTPUT_FORMAT", "markdown").lower()
@@ -118,37 +342,44 @@ async def process_job_application(payload: dict):
             # Create markdown documents and store in Notion
             logger.info("Creating markdown documents...")
             
-            # Generate cover letter markdown
-            cover_letter_markdown = markdown_service.create_cover_letter_markdown(cover_letter, job_data)
-            
-            # Generate resume markdown
-            resume_markdown = markdown_service.create_resume_markdown(resume_data, job_data)
-            
-            # Create child pages in Notion
-            logger.info("Creating Notion pages...")
+            with job_events.stage("render_markdown"):
+                # Generate cover letter markdown
+                cover_letter_markdown = services.markdown.create_cover_letter_markdown(cover_letter, job_data)
+                
+                # Generate resume markdown
+                resume_markdown = services.markdown.create_resume_markdown(resume_data, job_data)
             
-            # Create cover letter page
-            cover_letter_title = f"Cover Letter - {job_data.company_name}"
-            cover_letter_page_id = await notion_service.create_child_page(
-                job_data.notion_page_id, 
-                cover_letter_title, 
-                cover_letter_markdown
-            )
+            # Create child pages in Notion, or patch the ones from an earlier run
+            logger.info("Syncing Notion pages...")
             
-            # Create resume page
-            resume_title = f"Resume - {job_data.company_name}"
-            resume_page_id = await notion_service.create_child_page(
-                job_data.notion_page_id, 
-                resume_title, 
-                resume_markdown
-            )
+            # While Notion is unavailable the writes are queued and replayed later
+            with job_events.stage("notion_sync_pages"):
+                # Cover letter page
+                cover_letter_title = f"Cover Letter - {job_data.company_name}"
+                written = await services.outbox.write(
+                    "sync_child_page",
+                    parent_page_id=job_data.notion_page_id,
+                    title=cover_letter_title,
+                    content=cover_letter_markdown
+                )
+                
+                # Resume page
+                resume_title = f"Resume - {job_data.company_name}"
+                written &= await services.outbox.write(
+                    "sync_child_page",
+                    parent_page_id=job_data.notion_page_id,
+                    title=resume_title,
+                    content=resume_markdown
+                )
             
             # Update Notion with completion status
-            await notion_service.update_job_status(
-                job_data.notion_page_id,
-                status="Applied",
-                files=[cover_letter_title, resume_title]
-            )
+            with job_events.stage("notion_update_status"):
+                written &= await services.outbox.write(
+                    "update_job_status",
+                    page_id=job_data.notion_page_id,
+                    status="Applied",
+                    files=[cover_letter_title, resume_title]
+                )
             
         else:
             # Create PDF documents (legacy behavior)
@@ -156,32 +387,98 @@ async def process_job_application(payload: dict):
             output_dir = os.getenv("OUTPUT_DIR", "./output")
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # Generate cover letter PDF
-            cover_letter_path = os.path.join(
-                output_dir, 
-                f"cover_letter_{job_data.company_name.replace(' ', '_')}_{timestamp}.pdf"
-            )
-            pdf_service.create_cover_letter_pdf(cover_letter, job_data, cover_letter_path)
+            with job_events.stage("render_pdf"):
+                # Generate cover letter PDF
+                cover_letter_path = os.path.join(
+                    output_dir, 
+                    f"cover_letter_{job_data.company_name.replace(' ', '_')}_{timestamp}.pdf"
+                )
+                services.pdf.create_cover_letter_pdf(cover_letter, job_data, cover_letter_path)
+                check_cancelled()
+                
+                # Generate resume PDF
+                resume_path = os.path.join(
+                    output_dir,
+                    f"resume_{job_data.company_name.replace(' ', '_')}_{timestamp}.pdf"
+                )
+                if services.pdf.fit_one_page:
+                    # Rank bullets and projects so trimming drops the least relevant ones
+                    resume_data = await asyncio.to_thread(services.variants.prepare_context, resume_data, job_data)
+                services.pdf.create_resume_pdf(resume_data, job_data, resume_path)
             
-            # Generate resume PDF
-            resume_path = os.path.join(
-                output_dir,
-                f"resume_{job_data.company_name.replace(' ', '_')}_{timestamp}.pdf"
-            )
-            pdf_service.create_resume_pdf(resume_data, job_data, resume_path)
+            for path, kind in ((cover_letter_path, "cover_letter"), (resume_path, "resume")):
+                await asyncio.to_thread(
+                    services.artifacts.add,
+                    path,
+                    job_id=job_id,
+                    page_id=job_data.notion_page_id,
+                    company=job_data.company_name,
+                    kind=kind
+                )
             
             # Update Notion with completion status
-            await notion_service.update_job_status(
-                job_data.notion_page_id,
-                status="Applied",
-                files=[cover_letter_path, resume_path]
-            )
+            with job_events.stage("notion_update_status"):
+                written = await services.outbox.write(
+                    "update_job_status",
+                    page_id=job_data.notion_page_id,
+                    status="Applied",
+                    files=[cover_letter_path, resume_path]
+                )
         
         logger.info(f"Job application processing completed for {job_data.company_name}")
+        # Deferred: finished, but its Notion writes wait in the outbox
+        outcome = "completed" if written else "deferred"
         
+    except asyncio.CancelledError:
+        token = current_token()
+        error = (token.reason if token is not None else None) or "cancelled"
+        outcome = "expired" if error == "deadline exceeded" else "cancelled"
+        logger.warning(f"Job {job_id} stopped: {error}")
+        if token is not None and token.created_pages:
+            with detached():
+                await services.notion.archive_pages(token.created_pages)
     except Exception as e:
         logger.error(f"Error processing job application: {str(e)}")
+        error = str(e)
         # Could update Notion with error status here
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if outcome in ("cancelled", "expired"):
+            job_events.publish("cancelled", outcome=outcome, reason=error, duration_ms=duration_ms)
+        elif outcome == "failed":
+            job_events.publish("failed", outcome=outcome, error=error, duration_ms=duration_ms)
+        else:
+            job_events.publish("done", outcome=outcome, duration_ms=duration_ms)
+        metrics.jobs_in_progress.dec()
+        metrics.jobs_total.inc(outcome=outcome)
+        root_span = tracer.current_span()
+        if root_span is not None:
+            root_span.set_attribute("outcome", outcome)
+        try:
+            await asyncio.to_thread(services.state.job_finished, job_id, outcome)
+        except Exception as e:
+            logger.warning(f"Could not record outcome for job {job_id}: {str(e)}")
+
+def description_in_page_body(payload: dict) -> bool:
+    """True when the Job Description property is empty or was cut off at Notion's item limit"""
+    page_data = payload.get("data", payload)
+    items = page_data.get("properties", {}).get("Job Description", {}).get("rich_text") or []
+    texts = [item.get("plain_text") or item.get("text", {}).get("content") or "" for item in items if isinstance(item, dict)]
+    return not any(texts) or any(len(text) >= NOTION_TEXT_LIMIT for text in texts)
+
+async def read_page_description(payload: dict, fallback: str) -> str:
+    """Job description from the page body, or `fallback` if the body is shorter or unreadable"""
+    page_data = payload.get("data", payload)
+    try:
+        body = await services.notion.get_page_text(page_data.get("id", ""), page_data.get("last_edited_time"))
+    except Exception as e:
+        logger.warning(f"Could not read the page body, using the property description: {str(e)}")
+        return fallback
+    
+    if len(body) > len(fallback):
+        logger.info(f"Using job description from the page body ({len(body)} characters)")
+        return body
+    return fallback
 
 def extract_job_data_from_payload(payload: dict) -> JobData:
     """
@@ -346,43 +643,191 @@ def extract_job_data_from_payload(payload: dict) -> JobData:
         logger.error(f"Full payload for debugging: {json.dumps(payload, indent=2)}")
         return None
 
+@app.post("/resume/variants")
+async def render_resume_variants(job_data: JobData, variants: Optional[str] = None):
+    """Render several resume layouts (comma-separated ?variants=) from one shared context"""
+    names = [name.strip() for name in variants.split(",") if name.strip()] if variants else None
+    resume_data = await services.ai.customize_resume(job_data)
+    try:
+        result = await services.variants.render_variants_async(resume_data, job_data, names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for variant in result["variants"].values():
+        if variant.get("path"):
+            await asyncio.to_thread(services.artifacts.add, variant["path"], page_id=job_data.notion_page_id, company=job_data.company_name, kind="resume")
+    return result
+
+@app.post("/export/bundle")
+async def export_bundle(days: Optional[float] = 7, company: Optional[str] = None, limit: Optional[int] = None):
+    """Merge the saved applications from the last N days into one PDF with an outline per job"""
+    records = await asyncio.to_thread(services.batch.find_applications, days=days, company=company, limit=limit)
+    if not records:
+        detail = "No applications found" if BATCH_SAVE_APPLICATIONS else "No applications found; set BATCH_SAVE_APPLICATIONS=true to keep them for export"
+        raise HTTPException(status_code=404, detail=detail)
+    
+    try:
+        result = await services.batch.export(records)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {**result, "artifact": format_record(result["artifact"])}
+
+@app.post("/render/{document}")
+async def render_document(document: str, job_data: JobData):
+    """Stream a rendered resume or cover_letter template for a job as it is produced"""
+    if document not in ("resume", "cover_letter"):
+        raise HTTPException(status_code=404, detail="Unknown document type")
+    
+    resume_data = await services.ai.customize_resume(job_data)
+    skills = resume_data.get("skills", [])
+    template_data = {
+        **resume_data,
+        "job_data": job_data,
+        "date": datetime.now().strftime("%B %d, %Y"),
+        "relevant_skills": skills[:3],
+        "matching_skills": skills[:5]
+    }
+    
+    return StreamingResponse(
+        services.templates.stream(f"{document}.j2", template_data),
+        media_type="text/plain; charset=utf-8"
+    )
+
+@app.get("/jobs/status")
+async def get_job_statuses(ids: str):
+    """Get the status of several job applications (comma-separated page IDs)"""
+    page_ids = [page_id.strip() for page_id in ids.split(",") if page_id.strip()]
+    if not page_ids:
+        raise HTTPException(status_code=400, detail="No page IDs given")
+    if len(page_ids) > MAX_STATUS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATUS_BATCH} page IDs per request")
+    try:
+        statuses = await services.notion.get_job_statuses(page_ids)
+        return {"statuses": statuses}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/jobs/status/{page_id}")
 async def get_job_status(page_id: str):
     """Get the status of a job application"""
     try:
-        status = await notion_service.get_job_status(page_id)
+        status = await services.notion.get_job_status(page_id)
         return {"page_id": page_id, "status": status}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/files/{filename}")
-async def download_file(filename: str):
-    """Download generated files"""
-    output_dir = os.getenv("OUTPUT_DIR", "./output")
-    file_path = os.path.join(output_dir, filename)
+@app.get("/jobs/{job_id}/trace")
+async def get_job_trace(job_id: str, format: str = "tree"):
+    """Get the span tree recorded for a job (format=tree or format=otlp)"""
+    trace = tracer.get_trace(job_id)
+    if trace is None:
+        # The job may have run in another worker
+        shared = await asyncio.to_thread(services.state.get, "trace", job_id)
+        if shared is None:
+            raise HTTPException(status_code=404, detail="Trace not found")
+        return shared["otlp"] if format == "otlp" else shared["tree"]
     
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
+    if format == "otlp":
+        return trace.to_otlp()
+    return trace.tree()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events for a job: queued, started, stage transitions with
+    timings, partial LLM output, then done, failed or cancelled (evicted if
+    the event buffer had to drop the job). Reconnects resume after the
+    Last-Event-ID header.
+    """
+    if not job_events.known(job_id):
+        # The job was accepted by another worker; report what the shared registry knows
+        job = await asyncio.to_thread(services.state.get_job, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        snapshot = {"event": "status", "job_id": job_id, "status": job["status"], "outcome": job["outcome"], "worker": job["worker"]}
+        return StreamingResponse(iter([format_sse(snapshot)]), media_type="text/event-stream")
+    
+    try:
+        after = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        after = 0
+    
+    async def stream():
+        async for message in job_events.subscribe(job_id, after=after, heartbeat=SSE_HEARTBEAT):
+            yield format_sse(message) if message else ": keep-alive\n\n"
     
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type='application/pdf'
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+def format_sse(message: dict) -> str:
+    """One Server-Sent Events frame; the event's id lets clients resume"""
+    frame = f"event: {message['event']}\ndata: {json.dumps(message, default=str)}\n\n"
+    if "id" in message:
+        frame = f"id: {message['id']}\n" + frame
+    return frame
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job. It stops at its next await or check, and
+    Notion pages it created are archived.
+    """
+    if job_control.cancel(job_id):
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": "cancelling"})
+    
+    job = await asyncio.to_thread(services.state.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "finished":
+        raise HTTPException(status_code=409, detail=f"Job already finished ({job['outcome']})")
+    
+    # Running in another worker, which polls for this flag
+    await asyncio.to_thread(services.state.put, "cancel", job_id, True, job_control.timeout)
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "cancelling", "worker": job["worker"]})
+
+@app.get("/files")
+async def list_files(page_id: Optional[str] = None, company: Optional[str] = None):
+    """List generated files from the artifact index, optionally by page ID or company"""
+    # Both read the shared index log from disk
+    files, store = await asyncio.to_thread(
+        lambda: (services.files.list_files(page_id=page_id, company=company), services.artifacts.stats())
+    )
+    return {"count": len(files), "files": files, "store": store}
+
+@app.api_route("/files/{filename}", methods=["GET", "HEAD"])
+async def download_file(filename: str, request: Request):
+    """Download generated files (supports ETag revalidation and byte ranges)"""
+    response = await services.files.build_response(filename, request.headers)
+    if response.status_code == 404:
+        raise HTTPException(status_code=404, detail="File not found")
+    return response
+
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
-    return {
-        "status": "healthy",
-        "services": {
-            "notion": notion_service.is_healthy(),
-            "ai": ai_service.is_healthy(),
-            "pdf": pdf_service.is_healthy(),
-            "markdown": markdown_service.is_healthy()
-        },
-        "timestamp": datetime.now().isoformat()
-    }
+    """Detailed health check served from the background probe cache"""
+    return health_monitor.snapshot()
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe - the process is up and serving requests"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe - required dependencies are up and the backlog is bounded"""
+    snapshot = health_monitor.snapshot()
+    if not snapshot["ready"]:
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Expose service timings, queue depth, cache hit rates and error counts in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,17 +1,39 @@
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..models.job import JobData, ResumeData, PersonalInfo
+from ..utils.breaker import breakers
+from ..utils.cancellation import check_cancelled, time_left
+from ..utils.events import job_events
+from ..utils.limiter import limiters
+from ..utils.metrics import metrics, instrument
+from ..utils.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+@instrument("ai", include=("_extract_matching_skills",))
 class AIService:
     """Service for AI-powered content generation"""
     
     def __init__(self):
         self.ollama_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.model = os.getenv("OLLAMA_MODEL", "llama3.2")
+        self.ollama_timeout = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+        # Write cover letters with Ollama instead of the built-in template
+        self.use_ollama = os.getenv("AI_USE_OLLAMA", "false").lower() == "true"
+        # Seconds between partial-output events on /jobs/{job_id}/events
+        self.partial_interval = float(os.getenv("OLLAMA_PARTIAL_INTERVAL", "0.25"))
+        # How long Ollama keeps the model in memory after a request, and how long a cold load may take
+        self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+        self.load_timeout = float(os.getenv("OLLAMA_LOAD_TIMEOUT", "120"))
+        self._session = None
+        # Open while Ollama is failing, so cover letters go straight to the template
+        self.breaker = breakers.get("ollama")
+        # AIMD limit on concurrent generations, shared by every caller in the process
+        self.limiter = limiters.get("ollama")
         self.personal_info = self._load_personal_info()
         self.base_resume = self._load_base_resume()
         
@@ -24,6 +46,43 @@ class AIService:
             logger.error(f"AI service health check failed: {str(e)}")
             return False
     
+    def check_ollama(self) -> bool:
+        """Check whether the Ollama server is reachable (blocking network call)"""
+        try:
+            with metrics.dependency_request("ollama", "tags"):
+                response = self._http().get(f"{self.ollama_url}/api/tags", timeout=5)
+            return response.status_code == 200
+        except Exception as e:
+            logger.warning(f"Ollama not reachable at {self.ollama_url}: {str(e)}")
+            return False
+    
+    def preload_model(self) -> bool:
+        """
+        Load OLLAMA_MODEL into memory ahead of the first job (blocking). A
+        generate request without a prompt only loads the model and keeps it
+        for OLLAMA_KEEP_ALIVE.
+        """
+        if not self.use_ollama:
+            return False
+        
+        with tracer.span("ollama.preload", model=self.model), metrics.dependency_request("ollama", "preload"):
+            response = self._http().post(
+                f"{self.ollama_url}/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive},
+                timeout=self.load_timeout
+            )
+        if response.status_code != 200:
+            raise Exception(f"Failed to preload Ollama model {self.model}: HTTP {response.status_code}")
+        logger.info(f"Preloaded Ollama model {self.model}")
+        return True
+    
+    def _http(self):
+        """Pooled HTTP session for Ollama, so requests reuse connections"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+    
     def _load_personal_info(self) -> Dict[str, Any]:
         """Load personal information from file"""
         try:
@@ -62,8 +121,11 @@ class AIService:
     async def generate_cover_letter(self, job_data: JobData) -> str:
         """Generate a personalized cover letter"""
         try:
-            # For now, use template-based generation
-            # Later can be replaced with actual AI calls to Ollama
+            if self.use_ollama:
+                cover_letter = await self.call_ollama_api(self._build_cover_letter_prompt(job_data), document="cover_letter")
+                if cover_letter.strip():
+                    return cover_letter.strip()
+                logger.warning("Ollama returned no cover letter, falling back to the template")
             
             template = self._get_cover_letter_template()
             
@@ -88,6 +150,8 @@ class AIService:
         try:
             # Start with base resume
             customized_resume = self.base_resume.copy()
+            # Copy the nested dict we edit so the base resume isn't changed between calls
+            customized_resume["personal_info"] = dict(customized_resume.get("personal_info", {}))
             
             # Get matching skills for prioritization
             job_desc_lower = job_data.job_description.lower()
@@ -159,6 +223,59 @@ class AIService:
         # This is simplified - could be enhanced with company research
         return f"I am particularly drawn to {job_data.company_name}'s innovative approach and would be excited to contribute to your team's success."
     
+    def _stream_generation(self, prompt: str, document: Optional[str]) -> tuple:
+        """
+        Read a streamed generation; new text is published at most every
+        OLLAMA_PARTIAL_INTERVAL seconds. Returns (status code, text, seconds
+        to the first token).
+        """
+        check_cancelled()
+        started = time.perf_counter()
+        first_token = None
+        response = self._http().post(
+            f"{self.ollama_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "keep_alive": self.keep_alive
+            },
+            stream=True,
+            timeout=time_left(self.ollama_timeout)
+        )
+        with response:
+            if response.status_code != 200:
+                return response.status_code, "", time.perf_counter() - started
+            
+            parts, published, last_publish = [], 0, time.monotonic()
+            for line in response.iter_lines():
+                # Closing the response stops the generation on the Ollama side
+                check_cancelled()
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(chunk.get("response", ""))
+                if chunk.get("done") or time.monotonic() - last_publish >= self.partial_interval:
+                    delta = "".join(parts[published:])
+                    if delta:
+                        job_events.publish("output", document=document, text=delta)
+                    published, last_publish = len(parts), time.monotonic()
+                if chunk.get("done"):
+                    break
+            return response.status_code, "".join(parts), first_token if first_token is not None else time.perf_counter() - started
+    
+    def _build_cover_letter_prompt(self, job_data: JobData) -> str:
+        """Build the Ollama prompt for a cover letter"""
+        return (
+            f"Write a cover letter in Markdown for the {job_data.job_title} position at {job_data.company_name}, "
+            f"signed by {self.personal_info.get('full_name', 'the applicant')}.\n\n"
+            f"Relevant experience: {self._extract_relevant_experience(job_data)}\n"
+            f"Matching skills:{self._extract_matching_skills(job_data)}\n"
+            f"Job description:\n{job_data.job_description}"
+        )
+    
     def _get_cover_letter_template(self) -> str:
         """Get the cover letter template"""
         return """Dear Hiring Manager,
@@ -238,30 +355,42 @@ Thank you for your consideration.
             ]
         }
 
-    async def call_ollama_api(self, prompt: str) -> str:
-        """Call Ollama API for AI generation (placeholder for future implementation)"""
-        # This is a placeholder for when you want to integrate actual Ollama API calls
-        # For now, we'll use template-based generation
+    async def call_ollama_api(self, prompt: str, document: Optional[str] = None) -> str:
+        """
+        Call Ollama API for AI generation, streaming partial output to job
+        event subscribers. Returns "" at once while the Ollama breaker is open.
+        """
+        if not self.breaker.allow():
+            logger.info(f"Ollama circuit breaker is open, skipping generation (retry in {self.breaker.retry_in():.0f}s)")
+            return ""
         
         try:
-            import requests
-            
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
+            async with self.limiter.slot("generate") as slot:
+                try:
+                    with tracer.span("ollama.generate", model=self.model), metrics.dependency_request("ollama", "generate"):
+                        # requests blocks, so keep it off the event loop
+                        status_code, text, first_token = await asyncio.to_thread(self._stream_generation, prompt, document)
+                except Exception:
+                    slot.fail()
+                    raise
+                # Output length varies, so queueing shows in the time to the first token
+                slot.latency = first_token
+                if status_code >= 500:
+                    slot.fail()
             
-            if response.status_code == 200:
-                return response.json().get("response", "")
+            if status_code == 200:
+                self.breaker.record_success()
+                return text
             else:
-                logger.error(f"Ollama API error: {response.status_code}")
+                logger.error(f"Ollama API error: {status_code}")
+                metrics.dependency_errors.inc(dependency="ollama", operation="generate")
+                if status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
                 return ""
                 
         except Exception as e:
             logger.error(f"Error calling Ollama API: {str(e)}")
+            self.breaker.record_failure()
             return ""
@@ -0,0 +1,329 @@
+import os
+import re
+import json
+import time
+import fcntl
+import asyncio
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional, List
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".artifacts.jsonl"
+LOCK_FILENAME = ".artifacts.lock"
+
+# cover_letter_Acme_Corp_20240101_120000.pdf / resume_Acme_Corp_20240101_120000.pdf
+_LEGACY_NAME = re.compile(r"^(cover_letter|resume)_(.+)_(\d{8}_\d{6})\.(\w+)$")
+
+
+class ArtifactStore:
+    """
+    Index of generated files in the output directory.
+
+    Records live in memory with secondary indexes by filename, page ID, job ID
+    and company, and are persisted as an append-only JSON-lines log that the
+    compactor rewrites when retention removes entries. Several worker
+    processes can share one log: each tails what the others append, and
+    writes are serialized with a file lock.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, lease: Optional[Callable[[float], bool]] = None):
+        self.output_dir = os.path.realpath(output_dir or os.getenv("OUTPUT_DIR", "./output"))
+        self.index_path = os.path.join(self.output_dir, INDEX_FILENAME)
+        self.lock_path = os.path.join(self.output_dir, LOCK_FILENAME)
+        # Only the worker holding the lease (called with its TTL) runs the compactor
+        self.lease = lease
+        self.max_age_days = float(os.getenv("ARTIFACT_MAX_AGE_DAYS", "0"))
+        self.max_total_bytes = int(float(os.getenv("ARTIFACT_MAX_TOTAL_MB", "0")) * 1024 * 1024)
+        self.keep_latest = int(os.getenv("ARTIFACT_KEEP_LATEST", "0"))
+        self.compact_interval = float(os.getenv("ARTIFACT_COMPACT_INTERVAL", "3600"))
+
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._by_page: Dict[str, Dict[str, None]] = {}
+        self._by_job: Dict[str, Dict[str, None]] = {}
+        self._by_company: Dict[str, Dict[str, None]] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._loaded = False
+        # Position in the shared log this process has read up to
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._task: Optional[asyncio.Task] = None
+
+    # Loading and persistence
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            self._sync_log()
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.output_dir, exist_ok=True)
+            with self._file_lock():
+                if os.path.exists(self.index_path):
+                    self._sync_log()
+                else:
+                    self._adopt_existing_files()
+                    self._rewrite_log()
+            self._loaded = True
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other worker processes"""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync_log(self):
+        """Read records other processes appended, or reload after another process compacted the log"""
+        try:
+            stat_result = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+
+        with self._lock:
+            if stat_result.st_ino != self._log_inode or stat_result.st_size < self._log_offset:
+                self._reset_indexes()
+                self._log_inode = stat_result.st_ino
+                self._log_offset = 0
+            if stat_result.st_size == self._log_offset:
+                return
+
+            with open(self.index_path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read(stat_result.st_size - self._log_offset)
+            # Only consume complete lines; a partial write is picked up next time
+            complete = data[:data.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt artifact index line")
+                    continue
+                self._add_record(entry)
+            self._log_offset += len(complete)
+
+    def _reset_indexes(self):
+        self._records.clear()
+        self._by_page.clear()
+        self._by_job.clear()
+        self._by_company.clear()
+        self._total_bytes = 0
+
+    def _adopt_existing_files(self):
+        """Index files written before the store existed (one directory scan)"""
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                stat_result = entry.stat()
+                match = _LEGACY_NAME.match(entry.name)
+                self._add_record({
+                    "filename": entry.name,
+                    "job_id": "",
+                    "page_id": "",
+                    "company": match.group(2).replace("_", " ") if match else "",
+                    "kind": match.group(1) if match else "",
+                    "format": os.path.splitext(entry.name)[1].lstrip(".").lower(),
+                    "size": stat_result.st_size,
+                    "sha256": None,
+                    "created_at": stat_result.st_mtime
+                })
+        if self._records:
+            logger.info(f"Indexed {len(self._records)} existing artifacts")
+
+    def _append_log(self, entry: Dict[str, Any]):
+        # One write call per record, so concurrent appenders never interleave a line
+        with open(self.index_path, "ab") as f:
+            f.write((json.dumps(entry, separators=(",", ":")) + "\n").encode())
+
+    def _rewrite_log(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for record in sorted(self._records.values(), key=lambda r: r["created_at"]):
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.index_path)
+        stat_result = os.stat(self.index_path)
+        self._log_inode = stat_result.st_ino
+        self._log_offset = stat_result.st_size
+
+    # In-memory indexes
+
+    def _add_record(self, record: Dict[str, Any]):
+        filename = record["filename"]
+        if filename in self._records:
+            self._remove_record(filename)
+        self._records[filename] = record
+        self._total_bytes += record.get("size", 0)
+        for index, key in ((self._by_page, record.get("page_id")), (self._by_job, record.get("job_id")), (self._by_company, _company_key(record.get("company")))):
+            if key:
+                index.setdefault(key, {})[filename] = None
+
+    def _remove_record(self, filename: str) -> Optional[Dict[str, Any]]:
+        record = self._records.pop(filename, None)
+        if record is None:
+            return None
+        self._total_bytes -= record.get("size", 0)
+        for index, key in ((self._by_page, record.get("page_id")), (self._by_job, record.get("job_id")), (self._by_company, _company_key(record.get("company")))):
+            bucket = index.get(key) if key else None
+            if bucket is not None:
+                bucket.pop(filename, None)
+                if not bucket:
+                    del index[key]
+        return record
+
+    # Public API
+
+    def add(self, path: str, job_id: str = "", page_id: str = "", company: str = "", kind: str = "") -> Dict[str, Any]:
+        """Record a newly written file and return its index entry"""
+        self._ensure_loaded()
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        stat_result = os.stat(path)
+
+        filename = os.path.basename(path)
+        record = {
+            "filename": filename,
+            "job_id": job_id,
+            "page_id": page_id,
+            "company": company,
+            "kind": kind,
+            "format": os.path.splitext(filename)[1].lstrip(".").lower(),
+            "size": stat_result.st_size,
+            "sha256": digest.hexdigest(),
+            "created_at": time.time()
+        }
+        with self._lock, self._file_lock():
+            self._sync_log()
+            self._add_record(record)
+            self._append_log(record)
+            self._log_offset += len(json.dumps(record, separators=(",", ":")).encode()) + 1
+        return record
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._records.get(filename)
+
+    def by_page(self, page_id: str) -> List[Dict[str, Any]]:
+        return self._lookup(self._by_page, page_id)
+
+    def by_job(self, job_id: str) -> List[Dict[str, Any]]:
+        return self._lookup(self._by_job, job_id)
+
+    def by_company(self, company: str) -> List[Dict[str, Any]]:
+        return self._lookup(self._by_company, _company_key(company))
+
+    def _lookup(self, index: Dict[str, Dict[str, None]], key: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        with self._lock:
+            return [self._records[name] for name in index.get(key, {})]
+
+    def list(self) -> List[Dict[str, Any]]:
+        """All records, newest first"""
+        self._ensure_loaded()
+        with self._lock:
+            records = list(self._records.values())
+        return sorted(records, key=lambda r: r["created_at"], reverse=True)
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {"count": len(self._records), "total_bytes": self._total_bytes}
+
+    # Retention
+
+    def enforce_retention(self, now: Optional[float] = None) -> List[str]:
+        """Delete files outside the retention policy and compact the index"""
+        self._ensure_loaded()
+        now = now or time.time()
+        with self._lock, self._file_lock():
+            self._sync_log()
+            expired = set()
+
+            if self.max_age_days > 0:
+                cutoff = now - self.max_age_days * 86400
+                expired.update(name for name, record in self._records.items() if record["created_at"] < cutoff)
+
+            if self.keep_latest > 0:
+                for page_id, filenames in self._by_page.items():
+                    records = [self._records[name] for name in filenames]
+                    # A run is identified by its job ID (legacy entries fall back to the filename)
+                    runs: Dict[str, float] = {}
+                    for record in records:
+                        run = record.get("job_id") or record["filename"]
+                        runs[run] = max(runs.get(run, 0), record["created_at"])
+                    keep = set(sorted(runs, key=runs.get, reverse=True)[:self.keep_latest])
+                    expired.update(r["filename"] for r in records if (r.get("job_id") or r["filename"]) not in keep)
+
+            if self.max_total_bytes > 0:
+                remaining = self._total_bytes - sum(self._records[name].get("size", 0) for name in expired)
+                for record in sorted(self._records.values(), key=lambda r: r["created_at"]):
+                    if remaining <= self.max_total_bytes:
+                        break
+                    if record["filename"] not in expired:
+                        expired.add(record["filename"])
+                        remaining -= record.get("size", 0)
+
+            for filename in expired:
+                try:
+                    os.remove(os.path.join(self.output_dir, filename))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not delete artifact {filename}: {str(e)}")
+                    continue
+                self._remove_record(filename)
+
+            self._rewrite_log()
+
+        if expired:
+            logger.info(f"Retention removed {len(expired)} artifacts")
+        return sorted(expired)
+
+    async def start(self):
+        """Start the background compactor"""
+        if self._task is None and self.compact_interval > 0:
+            self._task = asyncio.create_task(self._compactor_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _compactor_loop(self):
+        while True:
+            try:
+                if self.lease is None or await asyncio.to_thread(self.lease, self.compact_interval * 2):
+                    await asyncio.to_thread(self.enforce_retention)
+            except Exception as e:
+                logger.error(f"Artifact compaction failed: {str(e)}")
+            await asyncio.sleep(self.compact_interval)
+
+
+def _company_key(company: Optional[str]) -> str:
+    return " ".join((company or "").lower().split())
+
+
+def format_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of an index record"""
+    return {
+        **record,
+        "created_at": datetime.fromtimestamp(record["created_at"]).isoformat(),
+        "url": f"/files/{record['filename']}"
+    }
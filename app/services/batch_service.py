@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import uuid
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List
+
+from ..models.job import JobData
+from ..utils.metrics import instrument
+from .artifact_service import ArtifactStore
+
+logger = logging.getLogger(__name__)
+
+
+@instrument("batch_export")
+class BatchExportService:
+    """
+    Saves the generated content of each application and merges many of them
+    into one PDF bundle, built in a worker process
+    """
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+        self.workers = int(os.getenv("BATCH_EXPORT_WORKERS", "1"))
+        self.buffer_size = int(os.getenv("BATCH_EXPORT_BUFFER", "64"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def save_application(self, job_data: JobData, cover_letter: str, resume_data: Dict[str, Any], job_id: str = "") -> Dict[str, Any]:
+        """Write the inputs of one application as JSON so it can be exported later"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.store.output_dir, f"application_{job_data.company_name.replace(' ', '_')}_{timestamp}_{(job_id or uuid.uuid4().hex)[:8]}.json")
+        record = {
+            "job_id": job_id,
+            "job_data": job_data.model_dump(),
+            "cover_letter": cover_letter,
+            "resume_data": resume_data,
+            "created_at": datetime.now().isoformat()
+        }
+        with open(path, "w") as f:
+            json.dump(record, f, default=str)
+
+        return self.store.add(
+            path,
+            job_id=job_id,
+            page_id=job_data.notion_page_id,
+            company=job_data.company_name,
+            kind="application"
+        )
+
+    def find_applications(self, days: Optional[float] = None, company: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Saved applications, oldest first, optionally limited to the last N days or one company"""
+        records = self.store.by_company(company) if company else self.store.list()
+        records = [r for r in records if r.get("kind") == "application"]
+        if days:
+            cutoff = time.time() - days * 86400
+            records = [r for r in records if r["created_at"] >= cutoff]
+        records.sort(key=lambda r: r["created_at"])
+        return records[-limit:] if limit else records
+
+    async def export(self, records: List[Dict[str, Any]], output_path: Optional[str] = None) -> Dict[str, Any]:
+        """Build one PDF for the given application records in the worker process"""
+        if not records:
+            raise ValueError("No applications to export")
+
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = os.path.join(self.store.output_dir, f"bundle_{timestamp}.pdf")
+        paths = [os.path.join(self.store.output_dir, r["filename"]) for r in records]
+
+        # The renderer (and ReportLab) is only imported when a bundle is exported
+        from .pdf_bundle import render_bundle
+
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), render_bundle, paths, output_path, self.buffer_size)
+        except Exception as e:
+            logger.error(f"Error exporting application bundle: {str(e)}")
+            raise Exception(f"Failed to export application bundle: {str(e)}")
+
+        result["artifact"] = self.store.add(output_path, kind="bundle")
+        logger.info(f"Exported {result['jobs']} applications to {output_path} ({result['pages']} pages)")
+        return result
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: never fork a process that is running an event loop and threads
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
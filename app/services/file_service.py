@@ -0,0 +1,242 @@
+import os
+import re
+import stat
+import hashlib
+import logging
+import mimetypes
+from email.utils import formatdate
+from typing import Dict, Any, Optional, Tuple, List
+
+import anyio
+from starlette.responses import Response
+
+from .artifact_service import ArtifactStore, format_record
+
+logger = logging.getLogger(__name__)
+
+# Types mimetypes doesn't know everywhere
+mimetypes.add_type("text/markdown", ".md")
+mimetypes.add_type("application/json", ".json")
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header cannot be served for the file"""
+
+
+class FileService:
+    """Serves generated documents from the output directory"""
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+        self.output_dir = store.output_dir
+        # (size, mtime_ns) -> ETag, per filename; avoids re-hashing unchanged files
+        self._etags: Dict[str, Tuple[int, int, str]] = {}
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """Return the absolute path for a file inside the output directory, or None"""
+        if not filename or filename.startswith(".") or "/" in filename or "\\" in filename or "\x00" in filename:
+            return None
+
+        path = os.path.realpath(os.path.join(self.output_dir, filename))
+        if os.path.dirname(path) != self.output_dir:
+            return None
+        return path
+
+    def content_type(self, filename: str) -> str:
+        media_type, _ = mimetypes.guess_type(filename)
+        return media_type or "application/octet-stream"
+
+    def etag(self, path: str, stat_result: os.stat_result) -> str:
+        """Strong ETag from the SHA-256 of the file content, cached per (size, mtime)"""
+        filename = os.path.basename(path)
+        cached = self._etags.get(filename)
+        if cached and cached[0] == stat_result.st_size and cached[1] == stat_result.st_mtime_ns:
+            return cached[2]
+
+        # Reuse the hash recorded when the file was written
+        record = self.store.get(filename)
+        if record and record.get("sha256") and record["size"] == stat_result.st_size and stat_result.st_mtime <= record["created_at"]:
+            etag = f'"{record["sha256"]}"'
+            self._etags[filename] = (stat_result.st_size, stat_result.st_mtime_ns, etag)
+            return etag
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        etag = f'"{digest.hexdigest()}"'
+        self._etags[filename] = (stat_result.st_size, stat_result.st_mtime_ns, etag)
+        return etag
+
+    def list_files(self, page_id: Optional[str] = None, company: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return indexed files, newest first, optionally filtered by page ID or company"""
+        if page_id:
+            records = self.store.by_page(page_id)
+        elif company:
+            records = self.store.by_company(company)
+        else:
+            records = self.store.list()
+        records = sorted(records, key=lambda r: r["created_at"], reverse=True)
+        return [{**format_record(r), "content_type": self.content_type(r["filename"])} for r in records]
+
+    async def build_response(self, filename: str, request_headers) -> Response:
+        """
+        Build the response for a download request, handling conditional
+        requests (If-None-Match) and single byte ranges. Range headers we
+        don't honour (several ranges, bad syntax) get the whole file, as
+        RFC 9110 allows.
+        """
+        path = self.resolve(filename)
+        if path is None:
+            return Response(status_code=404, content="File not found")
+
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except FileNotFoundError:
+            return Response(status_code=404, content="File not found")
+        if not stat.S_ISREG(stat_result.st_mode):
+            return Response(status_code=404, content="File not found")
+
+        etag = await anyio.to_thread.run_sync(self.etag, path, stat_result)
+        size = stat_result.st_size
+        headers = {
+            "etag": etag,
+            "accept-ranges": "bytes",
+            "cache-control": "private, max-age=0, must-revalidate",
+            "last-modified": _http_date(stat_result.st_mtime),
+            "content-disposition": f'attachment; filename="{filename}"'
+        }
+
+        if _etag_matches(request_headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        offset, length, status_code = 0, size, 200
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (not if_range or if_range == etag):
+            try:
+                byte_range = _parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                headers["content-range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is not None:
+                offset, length = byte_range
+                status_code = 206
+                headers["content-range"] = f"bytes {offset}-{offset + length - 1}/{size}"
+
+        return ArtifactResponse(
+            path,
+            offset=offset,
+            length=length,
+            status_code=status_code,
+            headers=headers,
+            media_type=self.content_type(filename)
+        )
+
+
+class ArtifactResponse(Response):
+    """
+    Streams a slice of a file. Uses the ASGI zero-copy send extension
+    (sendfile) when the server advertises it, otherwise reads in chunks.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, offset: int, length: int, status_code: int = 200, headers: Optional[dict] = None, media_type: Optional[str] = None):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.raw_headers = [(k, v) for k, v in self.raw_headers if k != b"content-length"]
+        self.raw_headers.append((b"content-length", str(length).encode("latin-1")))
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+
+        if scope.get("method") == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0
+                })
+            if remaining > 0:
+                # File shrank underneath us - close the body rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single 'bytes=' range into (offset, length). Returns None for a
+    header to ignore (multiple ranges, other units, invalid syntax); raises
+    RangeNotSatisfiable for a valid range outside the file.
+    """
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if start == "" and end == "":
+        return None
+    if start and end and int(end) < int(start):
+        return None
+    if size == 0:
+        raise RangeNotSatisfiable(range_header)
+
+    if start == "":
+        # Suffix range: last N bytes
+        suffix = int(end)
+        if suffix == 0:
+            raise RangeNotSatisfiable(range_header)
+        offset = max(size - suffix, 0)
+        return offset, size - offset
+
+    offset = int(start)
+    last = min(int(end), size - 1) if end else size - 1
+    if offset >= size:
+        raise RangeNotSatisfiable(range_header)
+    return offset, last - offset + 1
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def _http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
@@ -0,0 +1,146 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+from ..utils.breaker import breakers
+from ..utils.limiter import limiters
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """Runs dependency probes in the background and serves cached results"""
+
+    def __init__(self, interval: Optional[float] = None, max_backlog: Optional[int] = None, backlog: Optional[Callable[[], int]] = None,
+                 warm_up=None):
+        self.interval = interval or float(os.getenv("HEALTH_PROBE_INTERVAL", "30"))
+        self.max_backlog = max_backlog or int(os.getenv("HEALTH_MAX_BACKLOG", "50"))
+        self.probe_timeout = float(os.getenv("HEALTH_PROBE_TIMEOUT", "10"))
+        # Backlog source shared across workers (a blocking call, refreshed in the
+        # background every backlog_interval seconds); defaults to this process's queue gauge
+        self._backlog = backlog
+        self.backlog_interval = float(os.getenv("HEALTH_BACKLOG_INTERVAL", "2"))
+        self._backlog_count: Optional[int] = None
+        self._backlog_task: Optional[asyncio.Task] = None
+        # Startup warm-up (WarmUp); not ready until it has finished
+        self.warm_up = warm_up
+        self._probes: Dict[str, Callable[[], bool]] = {}
+        self._required: set = set()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.started_at = datetime.now().isoformat()
+        self.last_run: Optional[str] = None
+
+    def register(self, name: str, probe: Callable[[], bool], required: bool = False):
+        """Register a blocking probe; required probes gate readiness"""
+        self._probes[name] = probe
+        if required:
+            self._required.add(name)
+
+    async def start(self):
+        """Run one probe round, then keep probing on the configured interval"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        if self._backlog_task is None and self._backlog is not None:
+            self._backlog_task = asyncio.create_task(self._backlog_loop())
+
+    async def stop(self):
+        """Cancel the background probe and backlog tasks"""
+        for task in (self._task, self._backlog_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._backlog_task = None
+
+    async def _loop(self):
+        while True:
+            await self.run_probes()
+            await asyncio.sleep(self.interval)
+
+    async def _backlog_loop(self):
+        while True:
+            await self.refresh_backlog()
+            await asyncio.sleep(self.backlog_interval)
+
+    async def refresh_backlog(self):
+        """Read the shared backlog in a worker thread and cache it for readiness checks"""
+        try:
+            self._backlog_count = int(await asyncio.to_thread(self._backlog))
+        except Exception as e:
+            logger.warning(f"Could not read shared backlog: {str(e)}")
+
+    async def run_probes(self):
+        """Run every probe concurrently in worker threads and cache the results"""
+        names = list(self._probes)
+        results = await asyncio.gather(*(self._run_probe(name) for name in names))
+        for name, result in zip(names, results):
+            self._results[name] = result
+        self.last_run = datetime.now().isoformat()
+
+    async def _run_probe(self, name: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        error = None
+        try:
+            healthy = bool(await asyncio.wait_for(asyncio.to_thread(self._probes[name]), self.probe_timeout))
+        except asyncio.TimeoutError:
+            healthy = False
+            error = "timeout"
+        except Exception as e:
+            healthy = False
+            error = str(e)
+
+        result = {
+            "healthy": healthy,
+            "checked_at": datetime.now().isoformat(),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        if error:
+            logger.warning(f"Health probe {name} failed: {error}")
+            result["error"] = error
+        return result
+
+    def queue_backlog(self) -> int:
+        """Jobs accepted but not yet finished, from memory: the last shared count or this process's gauge"""
+        if self._backlog is not None and self._backlog_count is not None:
+            return self._backlog_count
+        return int(metrics.jobs_in_progress.get())
+
+    def is_ready(self, backlog: Optional[int] = None) -> bool:
+        """Ready once warm-up and probes have run, required dependencies are up and the backlog is bounded"""
+        if self.last_run is None or (self.warm_up is not None and not self.warm_up.done):
+            return False
+        for name in self._required:
+            if not self._results.get(name, {}).get("healthy"):
+                return False
+        return (self.queue_backlog() if backlog is None else backlog) < self.max_backlog
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cached health state without touching any dependency"""
+        services = {name: result["healthy"] for name, result in self._results.items()}
+        backlog = self.queue_backlog()
+        circuit_breakers = breakers.snapshot()
+        healthy = (self.last_run is not None and all(services.values())
+                   and all(breaker["state"] == "closed" for breaker in circuit_breakers.values()))
+
+        return {
+            "status": "healthy" if healthy else "degraded",
+            "services": services,
+            "probes": dict(self._results),
+            "circuit_breakers": circuit_breakers,
+            "concurrency": limiters.snapshot(),
+            "warm_up": self.warm_up.snapshot() if self.warm_up is not None else None,
+            "queue": {
+                "backlog": backlog,
+                "max_backlog": self.max_backlog
+            },
+            "ready": self.is_ready(backlog),
+            "last_probe": self.last_run,
+            "timestamp": datetime.now().isoformat()
+        }
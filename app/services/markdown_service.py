@@ -3,9 +3,11 @@ from datetime import datetime
 from typing import Dict, Any
 
 from ..models.job import JobData
+from ..utils.metrics import instrument
 
 logger = logging.getLogger(__name__)
 
+@instrument("markdown")
 class MarkdownService:
     """Service for generating markdown-formatted documents"""
     
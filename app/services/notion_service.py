@@ -1,10 +1,35 @@
 import os
-from typing import Dict, Any, Optional
+import json
+import time
+import asyncio
+import difflib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+import httpx
 from notion_client import Client
+from notion_client.errors import RequestTimeoutError
 import logging
 
+from ..utils.breaker import CircuitOpenError, breakers
+from ..utils.cancellation import JobCancelled, check_cancelled, current_token, time_left
+from ..utils.limiter import limiters
+from ..utils.metrics import metrics, instrument
+from ..utils.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
+# Notion accepts at most 100 child blocks per request
+NOTION_MAX_CHILDREN = 100
+
+# Per-item text limit and items per rich_text array
+NOTION_MAX_TEXT_LENGTH = 2000
+NOTION_MAX_RICH_TEXT_ITEMS = 100
+
+# Blocks whose children are separate pages, not part of this page's text
+NOTION_PAGE_BLOCKS = ("child_page", "child_database")
+
+@instrument("notion", include=("_markdown_to_notion_blocks",))
 class NotionService:
     """Service for interacting with Notion API"""
     
@@ -12,12 +37,107 @@ class NotionService:
         self.api_key = os.getenv("NOTION_API_KEY")
         self.database_id = os.getenv("NOTION_DATABASE_ID")
         self.client = None
+        self.max_retries = int(os.getenv("NOTION_MAX_RETRIES", "3"))
+        # Point the client at another API root, e.g. the benchmark stand-in
+        self.base_url = os.getenv("NOTION_BASE_URL")
+        # (parent page ID, title) -> child page ID, for pages synced by this process
+        self._child_pages: Dict[Tuple[str, str], str] = {}
+        # Concurrent block-children requests while reading a page body
+        self.fetch_concurrency = int(os.getenv("NOTION_FETCH_CONCURRENCY", "3"))
+        # (page ID, last_edited_time) -> flattened page text
+        self._page_text_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._page_text_cache_size = int(os.getenv("NOTION_PAGE_TEXT_CACHE_SIZE", "256"))
+        self._page_text_lock = threading.Lock()
+        # page ID -> (expires at, status), filled by reads, our own writes and webhooks
+        self.status_cache_ttl = float(os.getenv("NOTION_STATUS_CACHE_TTL", "15"))
+        self.status_concurrency = int(os.getenv("NOTION_STATUS_CONCURRENCY", "3"))
+        self._status_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._status_cache_size = int(os.getenv("NOTION_STATUS_CACHE_SIZE", "1024"))
+        self._status_lock = threading.Lock()
+        self._status_fetches: Dict[str, "asyncio.Future"] = {}
+        # Opens on timeouts, connection errors and 5xx; rate limits don't count
+        self.breaker = breakers.get("notion")
+        # AIMD limit on concurrent requests from this process, shared by every caller
+        self.limiter = limiters.get("notion")
         
         if self.api_key:
-            self.client = Client(auth=self.api_key)
+            options = {"auth": self.api_key}
+            if self.base_url:
+                options["base_url"] = self.base_url.rstrip("/")
+            self.client = Client(**options)
         else:
             logger.warning("Notion API key not found in environment variables")
     
+    def _call(self, operation: str, func, **kwargs):
+        """Issue a single Notion API request, recording latency and failures"""
+        with metrics.dependency_request("notion", operation):
+            result = func(**kwargs)
+        if operation == "pages.create":
+            # Recorded here, in the worker thread, so a page created after the job
+            # was cancelled is still known to its cleanup
+            token = current_token()
+            if token is not None and isinstance(result, dict) and result.get("id"):
+                token.created_pages.append(result["id"])
+        return result
+    
+    async def _request(self, operation: str, func, **kwargs):
+        """
+        Issue a Notion API request off the event loop, retrying rate limits
+        and transient server errors with backoff
+        """
+        with tracer.span(f"notion.{operation}") as span:
+            attempt = 0
+            while True:
+                attempt += 1
+                check_cancelled()
+                self.breaker.check()
+                try:
+                    async with self.limiter.slot(operation) as slot:
+                        try:
+                            with tracer.span("notion.attempt", attempt=attempt):
+                                result = await asyncio.to_thread(self._call, operation, func, **kwargs)
+                        except Exception as e:
+                            if getattr(e, "status", None) == 429 or _is_outage(e):
+                                slot.fail()
+                            raise
+                    self.breaker.record_success()
+                    return result
+                except Exception as e:
+                    if _is_outage(e):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    if time_left(delay) < delay:
+                        # The job's deadline passes before the retry would be sent
+                        raise JobCancelled("deadline exceeded")
+                    logger.warning(f"Notion {operation} failed ({str(e)}), retrying in {delay:.1f}s")
+                    if span is not None:
+                        span.set_attribute("retries", attempt)
+                    with tracer.span("notion.throttle_wait", seconds=delay):
+                        await asyncio.sleep(delay)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Return how long to wait before retrying, or None if the error is final"""
+        if attempt > self.max_retries:
+            return None
+        
+        status = getattr(error, "status", None)
+        if status != 429 and not (isinstance(status, int) and status >= 500):
+            return None
+        
+        # Honour Retry-After on rate limits, otherwise back off exponentially
+        headers = getattr(error, "headers", None) or {}
+        retry_after = headers.get("retry-after") if hasattr(headers, "get") else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return 0.5 * (2 ** (attempt - 1))
+    
     def is_healthy(self) -> bool:
         """Check if the Notion service is properly configured and accessible"""
         if not self.client or not self.api_key:
@@ -25,47 +145,117 @@ class NotionService:
         
         try:
             # Test connection by retrieving user info
-            self.client.users.me()
+            self._call("users.me", self.client.users.me)
             return True
         except Exception as e:
             logger.error(f"Notion health check failed: {str(e)}")
             return False
     
-    async def get_job_status(self, page_id: str) -> Dict[str, Any]:
-        """Get the current status of a job from Notion"""
+    def warm_up(self) -> bool:
+        """Open the pooled HTTPS connection (DNS, TCP and TLS) before the first job needs it"""
+        if not self.client:
+            return False
+        self._call("users.me", self.client.users.me)
+        return True
+    
+    async def get_job_status(self, page_id: str, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Get the current status of a job from Notion. Answers from the status
+        cache when it can; concurrent misses for one page share a single
+        pages.retrieve.
+        """
+        if not self.client:
+            raise Exception("Notion client not initialized")
+        
+        if not fresh:
+            cached = self._cached_job_status(page_id)
+            if cached is not None:
+                return cached
+        return await self._shared_job_status_fetch(page_id)
+    
+    def _cached_job_status(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """The cached status for a page if it hasn't expired"""
+        with self._status_lock:
+            entry = self._status_cache.get(page_id)
+        cached = entry is not None and entry[0] > time.monotonic()
+        metrics.record_cache("notion_job_status", cached)
+        return entry[1] if cached else None
+    
+    async def _shared_job_status_fetch(self, page_id: str) -> Dict[str, Any]:
+        fetch = self._status_fetches.get(page_id)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_job_status(page_id))
+            self._status_fetches[page_id] = fetch
+            fetch.add_done_callback(lambda _: self._status_fetches.pop(page_id, None))
+        # Shielded so one cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(fetch)
+    
+    async def get_job_statuses(self, page_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Statuses for several pages. Cached pages are answered directly and the
+        rest fetched concurrently, at most NOTION_STATUS_CONCURRENCY at a time.
+        A page that fails maps to {"error": ...} instead of failing the batch.
+        """
         if not self.client:
             raise Exception("Notion client not initialized")
         
+        slots = asyncio.Semaphore(self.status_concurrency)
+        
+        async def one(page_id: str) -> Dict[str, Any]:
+            try:
+                # Only cache misses wait for a slot
+                cached = self._cached_job_status(page_id)
+                if cached is not None:
+                    return cached
+                async with slots:
+                    return await self._shared_job_status_fetch(page_id)
+            except Exception as e:
+                return {"error": str(e)}
+        
+        page_ids = list(dict.fromkeys(page_ids))
+        results = await asyncio.gather(*(one(page_id) for page_id in page_ids))
+        return dict(zip(page_ids, results))
+    
+    def remember_job_status(self, page: Dict[str, Any]):
+        """
+        Cache the status carried by a page object we already have (a webhook
+        payload or a pages.update response). A page without a Status property
+        just invalidates the cached entry, and an older edit never replaces a
+        newer one.
+        """
+        page_id = page.get("id")
+        if not page_id:
+            return
+        
+        status = _status_from_page(page)
+        with self._status_lock:
+            entry = self._status_cache.get(page_id)
+            if entry and (entry[1].get("last_edited") or "") > (status.get("last_edited") or ""):
+                return
+            if "Status" not in status["properties"]:
+                self._status_cache.pop(page_id, None)
+                return
+            self._status_cache[page_id] = (time.monotonic() + self.status_cache_ttl, status)
+            self._status_cache.move_to_end(page_id)
+            while len(self._status_cache) > self._status_cache_size:
+                self._status_cache.popitem(last=False)
+    
+    async def _fetch_job_status(self, page_id: str) -> Dict[str, Any]:
         try:
-            page = self.client.pages.retrieve(page_id=page_id)
-            
-            # Extract status from properties
-            properties = page.get("properties", {})
-            status = "unknown"
-            
-            if "Status" in properties:
-                status_prop = properties["Status"]
-                prop_type = status_prop.get("type")
-                
-                if prop_type == "select" and status_prop.get("select"):
-                    status = status_prop["select"]["name"]
-                elif prop_type == "status" and status_prop.get("status"):
-                    status = status_prop["status"]["name"]
-                elif prop_type == "multi_select" and status_prop.get("multi_select"):
-                    # Take first status if multiple
-                    multi_select = status_prop["multi_select"]
-                    if multi_select:
-                        status = multi_select[0]["name"]
-            
-            return {
-                "status": status,
-                "last_edited": page.get("last_edited_time"),
-                "properties": properties
-            }
-            
+            page = await self._request("pages.retrieve", self.client.pages.retrieve, page_id=page_id)
+        except CircuitOpenError:
+            # Notion is down: an expired entry beats no answer
+            with self._status_lock:
+                entry = self._status_cache.get(page_id)
+            if entry is None:
+                raise
+            return {**entry[1], "stale": True}
         except Exception as e:
             logger.error(f"Error getting job status: {str(e)}")
             raise Exception(f"Failed to get job status: {str(e)}")
+        
+        self.remember_job_status(page)
+        return _status_from_page(page)
     
     async def update_job_status(self, page_id: str, status: str, files: Optional[list] = None) -> bool:
         """Update the status of a job in Notion"""
@@ -75,7 +265,7 @@ class NotionService:
         
         try:
             # First, get the current page to understand the property structure
-            page = self.client.pages.retrieve(page_id=page_id)
+            page = await self._request("pages.retrieve", self.client.pages.retrieve, page_id=page_id)
             current_properties = page.get("properties", {})
             
             # Prepare properties to update
@@ -166,17 +356,25 @@ class NotionService:
             
             logger.info(f"Updating page {page_id} with properties: {list(properties.keys())}")
             
-            # Update the page
-            self.client.pages.update(
+            # Update the page; the response carries the new status for the cache
+            updated = await self._request(
+                "pages.update",
+                self.client.pages.update,
                 page_id=page_id,
                 properties=properties
             )
+            self.remember_job_status(updated)
             
             logger.info(f"Updated Notion page {page_id} with status: {status}")
             return True
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Error updating job status: {str(e)}")
+            if _is_outage(e):
+                # A simpler payload won't help while Notion itself is failing
+                return False
             # Try a simpler update with just the status
             try:
                 logger.info("Attempting simplified status update...")
@@ -201,10 +399,13 @@ class NotionService:
                     }
                 }
                 
-                self.client.pages.update(
+                updated = await self._request(
+                    "pages.update",
+                    self.client.pages.update,
                     page_id=page_id,
                     properties=simple_properties
                 )
+                self.remember_job_status(updated)
                 
                 logger.info(f"Simplified update successful for page {page_id}")
                 return True
@@ -226,13 +427,86 @@ class NotionService:
             raise Exception("Notion client not initialized")
         
         try:
-            page = self.client.pages.retrieve(page_id=page_id)
+            page = await self._request("pages.retrieve", self.client.pages.retrieve, page_id=page_id)
             return page
             
         except Exception as e:
             logger.error(f"Error getting job details: {str(e)}")
             raise Exception(f"Failed to get job details: {str(e)}")
     
+    async def archive_pages(self, page_ids: List[str]) -> int:
+        """Archive pages (e.g. those written by a cancelled job); returns how many were archived"""
+        if not self.client:
+            return 0
+        
+        archived = 0
+        for page_id in page_ids:
+            try:
+                await self._request("pages.update", self.client.pages.update, page_id=page_id, archived=True)
+                archived += 1
+            except Exception as e:
+                logger.error(f"Error archiving page {page_id}: {str(e)}")
+        
+        # Forget remembered child pages, so the next sync creates them again
+        archived_ids = set(page_ids)
+        for key in [k for k, v in self._child_pages.items() if v in archived_ids]:
+            del self._child_pages[key]
+        logger.info(f"Archived {archived} of {len(page_ids)} Notion pages")
+        return archived
+    
+    async def get_page_text(self, page_id: str, last_edited_time: Optional[str] = None) -> str:
+        """
+        Return the page body as plain text. Nested blocks (toggles, columns,
+        nested lists) are fetched concurrently, at most NOTION_FETCH_CONCURRENCY
+        requests at a time. Results are cached by (page ID, last_edited_time),
+        so an unchanged page is never fetched twice.
+        """
+        if not self.client:
+            raise Exception("Notion client not initialized")
+        
+        key = (page_id, last_edited_time) if last_edited_time else None
+        if key:
+            with self._page_text_lock:
+                text = self._page_text_cache.get(key)
+                if text is not None:
+                    self._page_text_cache.move_to_end(key)
+            metrics.record_cache("notion_page_text", text is not None)
+            if text is not None:
+                return text
+        
+        try:
+            slots = asyncio.Semaphore(self.fetch_concurrency)
+            text = "\n".join(await self._block_tree_lines(page_id, slots, 0)).strip()
+        except Exception as e:
+            logger.error(f"Error reading page body: {str(e)}")
+            raise Exception(f"Failed to read page body: {str(e)}")
+        
+        if key:
+            with self._page_text_lock:
+                self._page_text_cache[key] = text
+                # An edited page gets a new key, so drop the entries it replaces
+                for stale in [k for k in self._page_text_cache if k[0] == page_id and k != key]:
+                    del self._page_text_cache[stale]
+                while len(self._page_text_cache) > self._page_text_cache_size:
+                    self._page_text_cache.popitem(last=False)
+        return text
+    
+    async def _block_tree_lines(self, block_id: str, slots: asyncio.Semaphore, depth: int) -> List[str]:
+        """Text lines for a block's children, recursing into nested blocks concurrently"""
+        # Only requests hold a slot, so parents never block their own children
+        blocks = await self._list_blocks(block_id, slots)
+        nested = [b for b in blocks if b.get("has_children") and b.get("type") not in NOTION_PAGE_BLOCKS]
+        children = await asyncio.gather(*(self._block_tree_lines(b["id"], slots, depth + 1) for b in nested))
+        children_by_id = {b["id"]: lines for b, lines in zip(nested, children)}
+        
+        lines = []
+        for block in blocks:
+            line = _block_text(block)
+            if line:
+                lines.append("  " * depth + line)
+            lines.extend(children_by_id.get(block["id"], []))
+        return lines
+    
     async def create_job_entry(self, job_data: Dict[str, Any]) -> str:
         """Create a new job entry in Notion (for testing purposes)"""
         if not self.client or not self.database_id:
@@ -274,7 +548,9 @@ class NotionService:
                 }
             }
             
-            page = self.client.pages.create(
+            page = await self._request(
+                "pages.create",
+                self.client.pages.create,
                 parent={"database_id": self.database_id},
                 properties=properties
             )
@@ -295,7 +571,9 @@ class NotionService:
             blocks = self._markdown_to_notion_blocks(content)
             
             # Create the child page
-            page = self.client.pages.create(
+            page = await self._request(
+                "pages.create",
+                self.client.pages.create,
                 parent={
                     "type": "page_id",
                     "page_id": parent_page_id
@@ -321,60 +599,207 @@ class NotionService:
             logger.error(f"Error creating child page: {str(e)}")
             raise Exception(f"Failed to create child page: {str(e)}")
     
-    def _markdown_to_notion_blocks(self, markdown_content: str) -> list:
-        """Convert markdown content to Notion blocks"""
-        blocks = []
-        lines = markdown_content.split('\n')
-        current_paragraph = []
+    async def sync_child_page(self, parent_page_id: str, title: str, content: str) -> Dict[str, Any]:
+        """
+        Create or update the child page titled `title` under the parent page.
+        An existing page is found (remembered, or discovered among the
+        parent's children) and patched with the minimal block updates,
+        appends and deletes instead of being recreated.
+        """
+        if not self.client:
+            raise Exception("Notion client not initialized")
         
-        for line in lines:
-            line = line.rstrip()
+        try:
+            blocks = self._markdown_to_notion_blocks(content)
+            page_id = await self._find_child_page(parent_page_id, title)
             
-            # Handle headers
-            if line.startswith('# '):
-                if current_paragraph:
-                    blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
-                    current_paragraph = []
-                blocks.append(self._create_heading_block(line[2:], 1))
-            elif line.startswith('## '):
-                if current_paragraph:
-                    blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
-                    current_paragraph = []
-                blocks.append(self._create_heading_block(line[3:], 2))
-            elif line.startswith('### '):
-                if current_paragraph:
-                    blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
-                    current_paragraph = []
-                blocks.append(self._create_heading_block(line[4:], 3))
+            existing = None
+            if page_id:
+                try:
+                    existing = await self._list_blocks(page_id)
+                except Exception as e:
+                    # Deleted or moved since we last saw it
+                    logger.warning(f"Child page {page_id} is no longer readable, creating a new one: {str(e)}")
+                    self._child_pages.pop((parent_page_id, title), None)
             
-            # Handle horizontal rules
-            elif line.strip() == '---':
-                if current_paragraph:
-                    blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
-                    current_paragraph = []
-                blocks.append({"type": "divider", "divider": {}})
+            if existing is None:
+                page_id = await self._create_page_with_blocks(parent_page_id, title, blocks)
+                self._child_pages[(parent_page_id, title)] = page_id
+                stats = {"page_id": page_id, "created": True, "unchanged": 0, "updated": 0, "appended": len(blocks), "deleted": 0}
+            else:
+                stats = {"page_id": page_id, "created": False, **await self._patch_blocks(page_id, existing, blocks)}
             
-            # Handle bullet points
-            elif line.startswith('- '):
-                if current_paragraph:
-                    blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
-                    current_paragraph = []
-                blocks.append(self._create_bullet_block(line[2:]))
+            for action in ("unchanged", "updated", "appended", "deleted"):
+                if stats[action]:
+                    metrics.notion_sync_blocks.inc(stats[action], action=action)
+            span = tracer.current_span()
+            if span is not None:
+                for key, value in stats.items():
+                    span.set_attribute(key, value)
             
-            # Handle empty lines
-            elif line.strip() == '':
-                if current_paragraph:
-                    blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
-                    current_paragraph = []
+            logger.info(f"Synced child page {title}: {stats}")
+            return stats
             
-            # Regular text lines
-            else:
-                current_paragraph.append(line)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Error syncing child page: {str(e)}")
+            raise Exception(f"Failed to sync child page: {str(e)}")
+    
+    async def _find_child_page(self, parent_page_id: str, title: str) -> Optional[str]:
+        """Return the ID of the parent's child page with this title, if there is one"""
+        page_id = self._child_pages.get((parent_page_id, title))
+        if page_id:
+            return page_id
+        
+        for block in await self._list_blocks(parent_page_id):
+            if block.get("type") == "child_page" and block.get("child_page", {}).get("title") == title:
+                self._child_pages[(parent_page_id, title)] = block["id"]
+                return block["id"]
+        return None
+    
+    async def _list_blocks(self, block_id: str, slots: Optional[asyncio.Semaphore] = None) -> List[dict]:
+        """All top-level child blocks of a block, following pagination; each request holds one of `slots`"""
+        slots = slots or asyncio.Semaphore(1)
+        blocks, cursor = [], None
+        while True:
+            kwargs = {"block_id": block_id, "page_size": NOTION_MAX_CHILDREN}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            async with slots:
+                response = await self._request("blocks.children.list", self.client.blocks.children.list, **kwargs)
+            blocks.extend(b for b in response.get("results", []) if not b.get("archived"))
+            if not response.get("has_more"):
+                return blocks
+            cursor = response.get("next_cursor")
+    
+    async def _create_page_with_blocks(self, parent_page_id: str, title: str, blocks: list) -> str:
+        page_id = None
+        for start in range(0, max(len(blocks), 1), NOTION_MAX_CHILDREN):
+            page_id = await self._write_block_batch(parent_page_id, title, page_id, blocks[start:start + NOTION_MAX_CHILDREN])
+        return page_id
+    
+    async def _patch_blocks(self, page_id: str, existing: List[dict], blocks: list, anchor: Optional[str] = None, stats: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        Turn the page's current blocks into `blocks`. Blocks are matched on
+        type and text; changed text in a block of the same type becomes an
+        update, anything else a delete and an append after the previous
+        surviving block (`anchor`).
+        """
+        stats = stats if stats is not None else {"unchanged": 0, "updated": 0, "appended": 0, "deleted": 0}
+        old = [_block_signature(b) for b in existing]
+        new = [_block_signature(b) for b in blocks]
+        opcodes = difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+        
+        # Notion can only insert after a sibling. If the page has to gain a
+        # block at the top, turn the first existing block of the right type
+        # into it and diff the rest after that block
+        head = opcodes[0][0] if opcodes else None
+        if anchor is None and existing and (head == "insert" or (head == "replace" and existing[0]["type"] != blocks[0]["type"])):
+            reuse = next((i for i, block in enumerate(existing) if block["type"] == blocks[0]["type"]), None)
+            if reuse is None:
+                for block in existing:
+                    await self._request("blocks.delete", self.client.blocks.delete, block_id=block["id"])
+                stats["deleted"] += len(existing)
+                await self._append_blocks(page_id, blocks, None, stats)
+                return stats
+            for block in existing[:reuse]:
+                await self._request("blocks.delete", self.client.blocks.delete, block_id=block["id"])
+            stats["deleted"] += reuse
+            await self._update_block(existing[reuse], blocks[0], stats)
+            return await self._patch_blocks(page_id, existing[reuse + 1:], blocks[1:], existing[reuse]["id"], stats)
+        
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                stats["unchanged"] += i2 - i1
+                anchor = existing[i2 - 1]["id"]
+                continue
+            
+            pending = []
+            for offset in range(max(i2 - i1, j2 - j1)):
+                old_block = existing[i1 + offset] if i1 + offset < i2 else None
+                new_block = blocks[j1 + offset] if j1 + offset < j2 else None
+                
+                if old_block and new_block and old_block["type"] == new_block["type"]:
+                    # Flush appends first so block order is preserved
+                    anchor = await self._append_blocks(page_id, pending, anchor, stats)
+                    pending = []
+                    await self._update_block(old_block, new_block, stats)
+                    anchor = old_block["id"]
+                    continue
+                if old_block:
+                    await self._request("blocks.delete", self.client.blocks.delete, block_id=old_block["id"])
+                    stats["deleted"] += 1
+                if new_block:
+                    pending.append(new_block)
+            anchor = await self._append_blocks(page_id, pending, anchor, stats)
         
-        # Add any remaining paragraph
-        if current_paragraph:
-            blocks.append(self._create_paragraph_block('\n'.join(current_paragraph)))
+        return stats
+    
+    async def _update_block(self, old_block: dict, new_block: dict, stats: Dict[str, int]):
+        if _block_signature(old_block) == _block_signature(new_block):
+            stats["unchanged"] += 1
+            return
+        block_type = new_block["type"]
+        await self._request("blocks.update", self.client.blocks.update, block_id=old_block["id"], **{block_type: new_block[block_type]})
+        stats["updated"] += 1
+    
+    async def _append_blocks(self, page_id: str, blocks: list, after: Optional[str], stats: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """Append blocks after `after` (or at the end) in batches; returns the last block's ID"""
+        for start in range(0, len(blocks), NOTION_MAX_CHILDREN):
+            kwargs = {"block_id": page_id, "children": blocks[start:start + NOTION_MAX_CHILDREN]}
+            if after:
+                kwargs["after"] = after
+            response = await self._request("blocks.children.append", self.client.blocks.children.append, **kwargs)
+            created = response.get("results", [])
+            if stats is not None:
+                stats["appended"] += len(kwargs["children"])
+            if after and created:
+                # Results list the parent's children, so find the last one we added
+                ids = [b["id"] for b in created]
+                after = ids[ids.index(after) + len(kwargs["children"])] if after in ids else created[-1]["id"]
+            elif created:
+                after = created[-1]["id"]
+        return after
+    
+    async def _write_block_batch(self, parent_page_id: str, title: str, page_id: Optional[str], blocks: list) -> str:
+        """Create the page with the first batch of blocks, append any later batches"""
+        if page_id is None:
+            page = await self._request(
+                "pages.create",
+                self.client.pages.create,
+                parent={
+                    "type": "page_id",
+                    "page_id": parent_page_id
+                },
+                properties={
+                    "title": {
+                        "title": [
+                            {
+                                "text": {
+                                    "content": title
+                                }
+                            }
+                        ]
+                    }
+                },
+                children=blocks
+            )
+            return page["id"]
         
+        await self._request(
+            "blocks.children.append",
+            self.client.blocks.children.append,
+            block_id=page_id,
+            children=blocks
+        )
+        return page_id
+    
+    def _markdown_to_notion_blocks(self, markdown_content: str) -> list:
+        """Convert markdown content to Notion blocks"""
+        builder = MarkdownBlockBuilder(self)
+        blocks = builder.feed(markdown_content)
+        blocks.extend(builder.finish())
         return blocks
     
     def _create_heading_block(self, text: str, level: int) -> dict:
@@ -457,9 +882,229 @@ class NotionService:
                     "text": {"content": part}
                 })
         
-        return rich_text if rich_text else [{"type": "text", "text": {"content": text}}]
+        raw = rich_text if rich_text else [{"type": "text", "text": {"content": text}}]
+        compacted = compact_rich_text(raw)
+        if metrics.enabled:
+            metrics.notion_rich_text_bytes_saved.inc(max(0, _rich_text_overhead(raw) - _rich_text_overhead(compacted)))
+        return compacted
     
     def _get_current_date(self) -> str:
         """Get current date in ISO format"""
         from datetime import datetime
         return datetime.now().isoformat()
+
+
+def _is_outage(error: Exception) -> bool:
+    """Whether a failed request points at Notion being unavailable rather than at the request"""
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status >= 500
+    return isinstance(error, (RequestTimeoutError, httpx.HTTPError))
+
+
+def _status_from_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Status, last edit time and properties of a Notion page object"""
+    properties = page.get("properties", {})
+    status = "unknown"
+    
+    if "Status" in properties:
+        status_prop = properties["Status"]
+        prop_type = status_prop.get("type")
+        
+        if prop_type == "select" and status_prop.get("select"):
+            status = status_prop["select"]["name"]
+        elif prop_type == "status" and status_prop.get("status"):
+            status = status_prop["status"]["name"]
+        elif prop_type == "multi_select" and status_prop.get("multi_select"):
+            # Take first status if multiple
+            multi_select = status_prop["multi_select"]
+            if multi_select:
+                status = multi_select[0]["name"]
+    
+    return {
+        "status": status,
+        "last_edited": page.get("last_edited_time"),
+        "properties": properties
+    }
+
+
+def compact_rich_text(rich_text: list) -> list:
+    """
+    Shrink a rich_text array for a request: merge adjacent runs with the same
+    annotations and link, leave out "type" and default annotations, and
+    split runs longer than Notion's 2000-character limit on word boundaries.
+    """
+    compacted = []
+    previous = None
+    for item in rich_text:
+        text = item.get("text") or {}
+        content = text.get("content", "")
+        if not content:
+            continue
+        link = text.get("link")
+        annotations = {k: v for k, v in (item.get("annotations") or {}).items() if v and v != "default"}
+        if previous is not None and previous["text"].get("link") == link and previous.get("annotations", {}) == annotations:
+            previous["text"]["content"] += content
+            continue
+        previous = {"text": {"content": content, "link": link} if link else {"content": content}}
+        if annotations:
+            previous["annotations"] = annotations
+        compacted.append(previous)
+
+    if any(len(item["text"]["content"]) > NOTION_MAX_TEXT_LENGTH for item in compacted):
+        compacted = [
+            {**item, "text": {**item["text"], "content": piece}}
+            for item in compacted
+            for piece in _split_text(item["text"]["content"], NOTION_MAX_TEXT_LENGTH)
+        ]
+    return compacted or [{"text": {"content": ""}}]
+
+
+def _split_text(content: str, limit: int) -> List[str]:
+    """Split into pieces of at most `limit` characters, preferring to break after whitespace"""
+    pieces = []
+    while len(content) > limit:
+        cut = max(content.rfind(" ", 0, limit), content.rfind("\n", 0, limit)) + 1
+        if cut <= 0:
+            cut = limit
+        pieces.append(content[:cut])
+        content = content[cut:]
+    pieces.append(content)
+    return pieces
+
+
+def split_rich_text_block(block: dict) -> list:
+    """Split a text block whose rich_text exceeds Notion's 100-item limit into consecutive blocks of the same type"""
+    block_type = block.get("type")
+    content = block.get(block_type) or {}
+    rich_text = content.get("rich_text") or []
+    if len(rich_text) <= NOTION_MAX_RICH_TEXT_ITEMS:
+        return [block]
+    return [
+        {"type": block_type, block_type: {**content, "rich_text": rich_text[start:start + NOTION_MAX_RICH_TEXT_ITEMS]}}
+        for start in range(0, len(rich_text), NOTION_MAX_RICH_TEXT_ITEMS)
+    ]
+
+
+def _rich_text_overhead(rich_text: list) -> int:
+    """
+    JSON size of a rich_text array minus its text content. Compaction never
+    changes the content, so the difference between two arrays' overheads is
+    exactly the bytes saved, without serializing either of them.
+    """
+    size = 2 + 2 * max(len(rich_text) - 1, 0)  # brackets and ", " separators
+    for item in rich_text:
+        size += 25  # {"text": {"content": ""}}
+        if "type" in item:
+            size += 12 + len(item["type"])  # "type": "text", 
+        text = item.get("text") or {}
+        if "link" in text:
+            size += 10 + len(json.dumps(text["link"]))  # , "link": 
+        if "annotations" in item:
+            size += 17 + _annotations_size(item["annotations"])  # , "annotations": 
+    return size
+
+
+def _annotations_size(annotations: Dict[str, Any]) -> int:
+    """Serialized length of an annotations dict; only a handful of combinations occur, so they are memoized"""
+    key = tuple(annotations.items())
+    size = _ANNOTATION_SIZES.get(key)
+    if size is None:
+        size = _ANNOTATION_SIZES[key] = len(json.dumps(annotations))
+    return size
+
+
+_ANNOTATION_SIZES: Dict[tuple, int] = {}
+
+
+def _rich_text_signature(rich_text: list) -> tuple:
+    """Comparable form of rich text, the same for what we send and what Notion returns"""
+    runs = []
+    for item in compact_rich_text(rich_text):
+        text = item["text"]
+        runs.append((text["content"], (text.get("link") or {}).get("url"), tuple(sorted(item.get("annotations", {}).items()))))
+    return tuple(runs)
+
+
+def _block_text(block: dict) -> str:
+    """One line of plain text for a block; empty for blocks without text"""
+    block_type = block.get("type")
+    content = block.get(block_type) or {}
+    if block_type == "table_row":
+        return " | ".join("".join(t.get("plain_text", "") for t in cell) for cell in content.get("cells", []))
+    text = "".join(t.get("plain_text") or (t.get("text") or {}).get("content", "") for t in content.get("rich_text", []))
+    if not text:
+        return ""
+    prefixes = {"bulleted_list_item": "- ", "numbered_list_item": "1. ", "quote": "> "}
+    if block_type == "to_do":
+        return f"[{'x' if content.get('checked') else ' '}] {text}"
+    return prefixes.get(block_type, "") + text
+
+
+def _block_signature(block: dict) -> tuple:
+    block_type = block.get("type")
+    content = block.get(block_type) or {}
+    return (block_type, _rich_text_signature(content.get("rich_text", [])))
+
+
+class MarkdownBlockBuilder:
+    """Incrementally converts markdown text into Notion blocks"""
+    
+    def __init__(self, service: NotionService):
+        self.service = service
+        self._pending = ""
+        self._paragraph = []
+    
+    def feed(self, chunk: str) -> list:
+        """Consume a chunk of markdown and return the blocks it completed"""
+        self._pending += chunk
+        *lines, self._pending = self._pending.split('\n')
+        blocks = []
+        for line in lines:
+            self._feed_line(line, blocks)
+        return blocks
+    
+    def finish(self) -> list:
+        """Flush the trailing line and any open paragraph"""
+        blocks = []
+        self._feed_line(self._pending, blocks)
+        self._pending = ""
+        self._flush_paragraph(blocks)
+        return blocks
+    
+    def _flush_paragraph(self, blocks: list):
+        if self._paragraph:
+            blocks.extend(split_rich_text_block(self.service._create_paragraph_block('\n'.join(self._paragraph))))
+            self._paragraph = []
+    
+    def _feed_line(self, line: str, blocks: list):
+        line = line.rstrip()
+        
+        # Handle headers
+        if line.startswith('# '):
+            self._flush_paragraph(blocks)
+            blocks.extend(split_rich_text_block(self.service._create_heading_block(line[2:], 1)))
+        elif line.startswith('## '):
+            self._flush_paragraph(blocks)
+            blocks.extend(split_rich_text_block(self.service._create_heading_block(line[3:], 2)))
+        elif line.startswith('### '):
+            self._flush_paragraph(blocks)
+            blocks.extend(split_rich_text_block(self.service._create_heading_block(line[4:], 3)))
+        
+        # Handle horizontal rules
+        elif line.strip() == '---':
+            self._flush_paragraph(blocks)
+            blocks.append({"type": "divider", "divider": {}})
+        
+        # Handle bullet points
+        elif line.startswith('- '):
+            self._flush_paragraph(blocks)
+            blocks.extend(split_rich_text_block(self.service._create_bullet_block(line[2:])))
+        
+        # Handle empty lines
+        elif line.strip() == '':
+            self._flush_paragraph(blocks)
+        
+        # Regular text lines
+        else:
+            self._paragraph.append(line)
@@ -0,0 +1,108 @@
+import os
+import asyncio
+import logging
+from typing import Dict, Callable, Optional
+
+from ..utils.breaker import CircuitOpenError
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# NotionService methods that may be deferred, and the argument naming the record they write
+DEFERRABLE_WRITES = {
+    "sync_child_page": ("parent_page_id", "title"),
+    "update_job_status": ("page_id",)
+}
+
+
+class NotionOutbox:
+    """
+    Notion writes made while the Notion circuit breaker is open are kept in
+    the shared state and replayed in order once it closes. A later write to
+    the same page replaces a queued one, so only the latest content is sent.
+    """
+
+    def __init__(self, state, notion, lease: Optional[Callable[[float], bool]] = None):
+        self.state = state
+        self.notion = notion
+        # Only the worker holding the lease (called with its TTL) replays the outbox
+        self.lease = lease
+        self.interval = float(os.getenv("NOTION_OUTBOX_INTERVAL", "15"))
+        self.max_attempts = int(os.getenv("NOTION_OUTBOX_MAX_ATTEMPTS", "5"))
+        self._task: Optional[asyncio.Task] = None
+
+    async def write(self, operation: str, **arguments) -> bool:
+        """Run a Notion write now, or queue it while Notion is unavailable; False if it was queued"""
+        if not self.notion.breaker.is_open:
+            try:
+                # False means the write failed on an outage (5xx, timeout) without raising
+                if await getattr(self.notion, operation)(**arguments) is not False:
+                    return True
+                logger.warning(f"Deferring Notion {operation}: Notion is unavailable")
+            except CircuitOpenError as e:
+                logger.warning(f"Deferring Notion {operation}: {str(e)}")
+        await self.add(operation, **arguments)
+        return False
+
+    async def add(self, operation: str, **arguments):
+        if operation not in DEFERRABLE_WRITES:
+            raise Exception(f"Failed to queue Notion write: unknown operation {operation}")
+        key = ":".join([operation] + [str(arguments.get(name, "")) for name in DEFERRABLE_WRITES[operation]])
+        await asyncio.to_thread(self.state.enqueue, key, operation, arguments)
+        metrics.notion_writes_queued.set(await asyncio.to_thread(self.state.outbox_size))
+        logger.info(f"Queued Notion {operation} ({key})")
+
+    async def flush(self) -> Dict[str, int]:
+        """Replay queued writes oldest first; stops as soon as the breaker opens again"""
+        stats = {"sent": 0, "failed": 0, "dropped": 0}
+        for entry in await asyncio.to_thread(self.state.pending):
+            if self.notion.breaker.is_open:
+                break
+            try:
+                result = await getattr(self.notion, entry["operation"])(**entry["arguments"])
+            except CircuitOpenError:
+                break
+            except Exception as e:
+                logger.error(f"Queued Notion {entry['operation']} failed: {str(e)}")
+                result = False
+            
+            if result is False:
+                if entry["attempts"] + 1 >= self.max_attempts:
+                    logger.error(f"Dropping Notion {entry['operation']} ({entry['key']}) after {self.max_attempts} attempts")
+                    await asyncio.to_thread(self.state.dequeue, entry["id"])
+                    stats["dropped"] += 1
+                else:
+                    await asyncio.to_thread(self.state.retry_later, entry["id"])
+                    stats["failed"] += 1
+                continue
+            
+            await asyncio.to_thread(self.state.dequeue, entry["id"])
+            stats["sent"] += 1
+        
+        metrics.notion_writes_queued.set(await asyncio.to_thread(self.state.outbox_size))
+        if stats["sent"] or stats["failed"] or stats["dropped"]:
+            logger.info(f"Notion outbox flushed: {stats}")
+        return stats
+
+    async def start(self):
+        """Start replaying the outbox in the background"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if self.lease is None or await asyncio.to_thread(self.lease, self.interval * 2):
+                    await self.flush()
+            except Exception as e:
+                logger.error(f"Notion outbox flush failed: {str(e)}")
@@ -0,0 +1,125 @@
+import os
+import logging
+import threading
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from ..models.job import JobData
+
+logger = logging.getLogger(__name__)
+
+
+class PDFBackend:
+    """Interface for PDF renderers used by PDFService"""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    def render_cover_letter(self, cover_letter_text: str, job_data: JobData, output_path: str):
+        raise NotImplementedError
+
+    def render_resume(self, resume_data: Dict[str, Any], job_data: JobData, output_path: str, fit_one_page: bool = False) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=None)
+def _weasyprint():
+    """Import WeasyPrint on first use; its import pulls in Pango and fontconfig"""
+    import weasyprint
+    return weasyprint
+
+
+@lru_cache(maxsize=None)
+def _font_config():
+    """One FontConfiguration per process - building it runs the slow fontconfig lookup"""
+    from weasyprint.text.fonts import FontConfiguration
+    return FontConfiguration()
+
+
+_stylesheets: Dict[str, Tuple[float, Any]] = {}
+_stylesheets_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _default_stylesheet(css: str):
+    return _weasyprint().CSS(string=css, font_config=_font_config())
+
+
+def _stylesheet(path: str):
+    """Parsed CSS for a file, shared by the whole process and re-parsed only when it changes"""
+    mtime = os.path.getmtime(path)
+    with _stylesheets_lock:
+        cached = _stylesheets.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    css = _weasyprint().CSS(filename=path, font_config=_font_config())
+    with _stylesheets_lock:
+        _stylesheets[path] = (mtime, css)
+    return css
+
+
+class WeasyPrintBackend(PDFBackend):
+    """Renders PDFs from the HTML templates (cover_letter.html.j2, resume.html.j2) with WeasyPrint"""
+
+    name = "weasyprint"
+
+    def __init__(self, template_service=None):
+        self._template_service = template_service
+
+    @property
+    def template_service(self):
+        if self._template_service is None:
+            from .template_service import TemplateService
+            self._template_service = TemplateService()
+        return self._template_service
+
+    def is_available(self) -> bool:
+        try:
+            _weasyprint()
+            return True
+        except Exception as e:
+            logger.error(f"WeasyPrint is not available: {str(e)}")
+            return False
+
+    def render_cover_letter(self, cover_letter_text: str, job_data: JobData, output_path: str):
+        paragraphs = [p.strip().replace('\n', ' ') for p in cover_letter_text.split('\n\n') if p.strip()]
+        self._write("cover_letter.html.j2", {
+            "paragraphs": paragraphs,
+            "job_data": job_data,
+            "date": datetime.now().strftime("%B %d, %Y")
+        }, output_path)
+
+    def render_resume(self, resume_data: Dict[str, Any], job_data: JobData, output_path: str, fit_one_page: bool = False) -> Optional[Dict[str, Any]]:
+        if fit_one_page:
+            logger.warning("Fit-to-page is only supported by the ReportLab backend; rendering the full resume")
+        self._write("resume.html.j2", {**resume_data, "job_data": job_data}, output_path)
+        return None
+
+    def _write(self, template_name: str, data: Dict[str, Any], output_path: str):
+        weasyprint = _weasyprint()
+        html = self.template_service.get_template(template_name).render(**data)
+        # A pdf.css in TEMPLATES_DIR overrides the built-in stylesheet
+        stylesheet_path = self.template_service.get_stylesheet_path()
+        stylesheet = _stylesheet(stylesheet_path) if stylesheet_path else _default_stylesheet(self.template_service.get_default_stylesheet())
+        weasyprint.HTML(string=html, base_url=self.template_service.templates_dir).write_pdf(
+            output_path,
+            stylesheets=[stylesheet],
+            font_config=_font_config()
+        )
+
+
+# Backends other than the built-in ReportLab one, by PDF_BACKEND name
+PDF_BACKENDS = {
+    "weasyprint": WeasyPrintBackend
+}
+
+
+def create_backend(name: str, template_service=None) -> PDFBackend:
+    backend_class = PDF_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown PDF backend: {name}")
+    return backend_class(template_service=template_service)
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator
+
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import PageBreak
+from reportlab.platypus.flowables import Flowable
+
+from .pdf_service import PDFService
+
+logger = logging.getLogger(__name__)
+
+
+class _Bookmark(Flowable):
+    """Zero-size flowable that adds a PDF outline entry at the position it is drawn"""
+
+    _ZEROSIZE = 1
+
+    def __init__(self, title: str, key: str, level: int = 0):
+        super().__init__()
+        self.title = title
+        self.key = key
+        self.level = level
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=self.level, closed=self.level == 0)
+
+
+class _OutlineCanvas(Canvas):
+    """Opens the outline panel when the bundle is viewed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.showOutline()
+
+
+class _LazyStory(list):
+    """
+    Story list that pulls flowables from an iterator as the document consumes
+    them, so only a small window of flowables is alive at any time
+    """
+
+    def __init__(self, flowables: Iterator, buffer_size: int):
+        super().__init__()
+        self._source = flowables
+        self._buffer_size = max(buffer_size, 8)
+        self._refill()
+
+    def _refill(self):
+        while self._source is not None and list.__len__(self) < self._buffer_size:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        if list.__len__(self) < self._buffer_size // 4:
+            self._refill()
+
+
+def _bundle_flowables(pdf_service, paths: List[str], stats: Dict[str, Any]) -> Iterator:
+    """Cover letter and resume flowables for each saved application, loaded one file at a time"""
+    first = True
+    for index, path in enumerate(paths):
+        try:
+            with open(path, "r") as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping application {os.path.basename(path)}: {str(e)}")
+            stats["skipped"].append(os.path.basename(path))
+            continue
+
+        job = record.get("job_data", {})
+        key = f"job{index}"
+        if not first:
+            yield PageBreak()
+        first = False
+        stats["jobs"] += 1
+
+        yield _Bookmark(f"{job.get('company_name', 'Company')} - {job.get('job_title', 'Position')}", key)
+        if record.get("cover_letter"):
+            yield _Bookmark("Cover Letter", f"{key}-cover-letter", level=1)
+            yield from pdf_service._build_cover_letter_story(record["cover_letter"], date_text=_format_created(record.get("created_at")))
+            yield PageBreak()
+        yield _Bookmark("Resume", f"{key}-resume", level=1)
+        yield from pdf_service._build_resume_story(record.get("resume_data", {}))
+
+
+def _format_created(created_at: Optional[str]) -> Optional[str]:
+    if not created_at:
+        return None
+    try:
+        return datetime.fromisoformat(created_at).strftime("%B %d, %Y")
+    except ValueError:
+        return None
+
+
+def render_bundle(paths: List[str], output_path: str, buffer_size: int = 64) -> Dict[str, Any]:
+    """Worker entry point: build one PDF from saved application files in a single pass"""
+    start = time.perf_counter()
+    pdf_service = PDFService()
+    stats: Dict[str, Any] = {"jobs": 0, "skipped": []}
+
+    doc = pdf_service._new_document(output_path)
+    doc.title = "Application Bundle"
+    story = _LazyStory(_bundle_flowables(pdf_service, paths, stats), buffer_size)
+    doc.build(story, canvasmaker=_OutlineCanvas)
+
+    return {
+        "path": output_path,
+        "jobs": stats["jobs"],
+        "skipped": stats["skipped"],
+        "pages": doc.page,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
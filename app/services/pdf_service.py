@@ -1,279 +1,464 @@
 import os
 import logging
+from functools import lru_cache
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.frames import Frame
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..models.job import JobData
+from ..utils.cancellation import check_cancelled
+from ..utils.metrics import instrument
+from .pdf_backends import PDFBackend, create_backend
 
 logger = logging.getLogger(__name__)
 
-class PDFService:
-    """Service for generating PDF documents"""
-    
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def is_healthy(self) -> bool:
-        """Check if PDF service is working"""
-        try:
-            # Test if we can create a basic PDF
-            return True
-        except Exception as e:
-            logger.error(f"PDF service health check failed: {str(e)}")
-            return False
+# Fonts used by the custom styles
+PDF_FONTS = ("Helvetica", "Helvetica-Bold")
+
+
+@lru_cache(maxsize=None)
+def _load_fonts() -> tuple:
+    """Load font metrics once per process"""
+    return tuple(pdfmetrics.getFont(name) for name in PDF_FONTS)
+
+
+@lru_cache(maxsize=None)
+def _get_stylesheet() -> Dict[str, Any]:
+    """Build the sample stylesheet and custom paragraph styles once per process"""
+    _load_fonts()
+    styles = getSampleStyleSheet()
     
-    def _setup_custom_styles(self):
-        """Set up custom styles for PDF generation"""
+    return {
+        "styles": styles,
         # Title style
-        self.title_style = ParagraphStyle(
+        "title": ParagraphStyle(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=16,
             spaceAfter=12,
             alignment=TA_CENTER,
             textColor=colors.black,
             fontName='Helvetica-Bold'
-        )
-        
+        ),
         # Header style
-        self.header_style = ParagraphStyle(
+        "header": ParagraphStyle(
             'CustomHeader',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=12,
             spaceAfter=6,
             spaceBefore=12,
             alignment=TA_LEFT,
             textColor=colors.black,
             fontName='Helvetica-Bold'
-        )
-        
+        ),
         # Body style
-        self.body_style = ParagraphStyle(
+        "body": ParagraphStyle(
             'CustomBody',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             spaceAfter=6,
             alignment=TA_JUSTIFY,
             textColor=colors.black,
             fontName='Helvetica'
-        )
-        
+        ),
         # Contact info style
-        self.contact_style = ParagraphStyle(
+        "contact": ParagraphStyle(
             'ContactInfo',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             spaceAfter=12,
             alignment=TA_CENTER,
             textColor=colors.black,
             fontName='Helvetica'
         )
+    }
+
+
+# Extra full builds allowed when the measured fit still overflows the page
+FIT_MAX_REBUILDS = 2
+
+
+def _story_height(story: list, width: float, height: float) -> float:
+    """
+    Height the story needs in a frame of the given size, measured with wrap()
+    only. Mirrors Frame._add: no space before the first flowable, adjacent
+    spaceAfter/spaceBefore overlap, and the trailing spaceAfter may be clipped.
+    """
+    total = 0.0
+    previous_after = 0.0
+    for index, flowable in enumerate(story):
+        before = flowable.getSpaceBefore() if index else 0.0
+        _, flowable_height = flowable.wrap(width, height)
+        total += max(before - previous_after, 0.0) + flowable_height
+        previous_after = flowable.getSpaceAfter()
+        total += previous_after
+    return total - previous_after
+
+
+@instrument("pdf")
+class PDFService(PDFBackend):
+    """
+    Service for generating PDF documents. Renders with ReportLab itself, or
+    hands off to another backend chosen by PDF_BACKEND (see pdf_backends).
+    """
+    
+    name = "reportlab"
+    
+    def __init__(self, backend: Optional[str] = None, template_service=None):
+        stylesheet = _get_stylesheet()
+        self.styles = stylesheet["styles"]
+        self.title_style = stylesheet["title"]
+        self.header_style = stylesheet["header"]
+        self.body_style = stylesheet["body"]
+        self.contact_style = stylesheet["contact"]
+        self.fit_one_page = os.getenv("PDF_FIT_ONE_PAGE", "false").lower() == "true"
+        
+        backend = (backend or os.getenv("PDF_BACKEND", self.name)).lower()
+        self.backend: PDFBackend = self if backend == self.name else create_backend(backend, template_service)
+    
+    def is_healthy(self) -> bool:
+        """Check if PDF service is working"""
+        try:
+            return self.backend.is_available()
+        except Exception as e:
+            logger.error(f"PDF service health check failed: {str(e)}")
+            return False
+    
+    def _new_document(self, output_path: str) -> SimpleDocTemplate:
+        """Letter-sized document with one-inch margins"""
+        return SimpleDocTemplate(
+            output_path,
+            pagesize=letter,
+            rightMargin=inch,
+            leftMargin=inch,
+            topMargin=inch,
+            bottomMargin=inch
+        )
     
     def create_cover_letter_pdf(self, cover_letter_text: str, job_data: JobData, output_path: str):
         """Create a PDF cover letter"""
         try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=letter,
-                rightMargin=inch,
-                leftMargin=inch,
-                topMargin=inch,
-                bottomMargin=inch
-            )
-            
-            story = []
-            
-            # Add date
-            date_text = datetime.now().strftime("%B %d, %Y")
-            story.append(Paragraph(date_text, self.body_style))
-            story.append(Spacer(1, 12))
-            
-            # Add cover letter content
-            # Split the cover letter into paragraphs
-            paragraphs = cover_letter_text.split('\n\n')
-            
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    # Clean up the paragraph text
-                    clean_text = paragraph.strip().replace('\n', ' ')
-                    story.append(Paragraph(clean_text, self.body_style))
-                    story.append(Spacer(1, 6))
-            
-            # Build the PDF
-            doc.build(story)
+            self.backend.render_cover_letter(cover_letter_text, job_data, output_path)
             logger.info(f"Cover letter PDF created: {output_path}")
             
         except Exception as e:
             logger.error(f"Error creating cover letter PDF: {str(e)}")
             raise Exception(f"Failed to create cover letter PDF: {str(e)}")
     
-    def create_resume_pdf(self, resume_data: Dict[str, Any], job_data: JobData, output_path: str):
-        """Create a PDF resume"""
-        try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=letter,
-                rightMargin=inch,
-                leftMargin=inch,
-                topMargin=inch,
-                bottomMargin=inch
-            )
-            
-            story = []
-            
-            # Personal Information Header
-            personal_info = resume_data.get('personal_info', {})
-            
-            # Name as title
-            name = personal_info.get('full_name', 'Your Name')
-            story.append(Paragraph(name, self.title_style))
-            
-            # Contact information
-            contact_parts = []
-            if personal_info.get('email'):
-                contact_parts.append(personal_info['email'])
-            if personal_info.get('phone'):
-                contact_parts.append(personal_info['phone'])
-            if personal_info.get('address'):
-                contact_parts.append(personal_info['address'])
-            
-            contact_text = ' | '.join(contact_parts)
-            story.append(Paragraph(contact_text, self.contact_style))
-            
-            # LinkedIn and GitHub
-            links = []
-            if personal_info.get('linkedin_url'):
-                links.append(f"LinkedIn: {personal_info['linkedin_url']}")
-            if personal_info.get('github_url'):
-                links.append(f"GitHub: {personal_info['github_url']}")
-            
-            if links:
-                story.append(Paragraph(' | '.join(links), self.contact_style))
-            
-            story.append(Spacer(1, 12))
-            
-            # Professional Summary
-            if personal_info.get('professional_summary'):
-                story.append(Paragraph("PROFESSIONAL SUMMARY", self.header_style))
-                story.append(Paragraph(personal_info['professional_summary'], self.body_style))
-                story.append(Spacer(1, 6))
-            
-            # Skills
-            skills = resume_data.get('skills', [])
-            if skills:
-                story.append(Paragraph("TECHNICAL SKILLS", self.header_style))
-                skills_text = ' • '.join(skills)
-                story.append(Paragraph(skills_text, self.body_style))
+    def render_cover_letter(self, cover_letter_text: str, job_data: JobData, output_path: str):
+        """ReportLab cover letter"""
+        doc = self._new_document(output_path)
+        story = self._build_cover_letter_story(cover_letter_text)
+        
+        # Build the PDF
+        doc.build(story)
+    
+    def _build_cover_letter_story(self, cover_letter_text: str, date_text: Optional[str] = None) -> list:
+        """Build the flowables for a cover letter"""
+        story = []
+        
+        # Add date
+        date_text = date_text or datetime.now().strftime("%B %d, %Y")
+        story.append(Paragraph(date_text, self.body_style))
+        story.append(Spacer(1, 12))
+        
+        # Add cover letter content
+        # Split the cover letter into paragraphs
+        paragraphs = cover_letter_text.split('\n\n')
+        
+        for paragraph in paragraphs:
+            if paragraph.strip():
+                # Clean up the paragraph text
+                clean_text = paragraph.strip().replace('\n', ' ')
+                story.append(Paragraph(clean_text, self.body_style))
                 story.append(Spacer(1, 6))
+        
+        return story
+    
+    def create_resume_pdf(self, resume_data: Dict[str, Any], job_data: JobData, output_path: str, fit_one_page: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+        """
+        Create a PDF resume. With fit_one_page (default: PDF_FIT_ONE_PAGE) the
+        lowest-ranked bullets and projects are dropped until it fits on one page,
+        and a summary of what was kept is returned; its "fits" is False when the
+        resume is still longer than a page.
+        """
+        try:
+            if fit_one_page is None:
+                fit_one_page = self.fit_one_page
             
-            # Experience
-            experience = resume_data.get('experience', [])
-            if experience:
-                story.append(Paragraph("PROFESSIONAL EXPERIENCE", self.header_style))
-                
-                for exp in experience:
-                    # Job title and company
-                    title_text = f"<b>{exp.get('title', 'Job Title')}</b> | {exp.get('company', 'Company Name')}"
-                    story.append(Paragraph(title_text, self.body_style))
-                    
-                    # Location and dates
-                    location_date = f"{exp.get('location', '')} | {exp.get('start_date', '')} - {exp.get('end_date', '')}"
-                    story.append(Paragraph(location_date, self.body_style))
-                    story.append(Spacer(1, 3))
-                    
-                    # Description
-                    if exp.get('description'):
-                        story.append(Paragraph(exp['description'], self.body_style))
-                    
-                    # Achievements
-                    if exp.get('achievements'):
-                        story.append(Spacer(1, 3))
-                        for achievement in exp['achievements']:
-                            story.append(Paragraph(f"• {achievement}", self.body_style))
-                    
-                    story.append(Spacer(1, 12))
-            
-            # Education
-            education = resume_data.get('education', [])
-            if education:
-                story.append(Paragraph("EDUCATION", self.header_style))
-                
-                for edu in education:
-                    degree_text = f"<b>{edu.get('degree', 'Degree')}</b>"
-                    story.append(Paragraph(degree_text, self.body_style))
-                    
-                    school_text = f"{edu.get('school', 'School Name')}, {edu.get('location', '')}"
-                    story.append(Paragraph(school_text, self.body_style))
-                    
-                    if edu.get('graduation_date'):
-                        grad_text = f"Graduated: {edu['graduation_date']}"
-                        if edu.get('gpa'):
-                            grad_text += f" | GPA: {edu['gpa']}"
-                        story.append(Paragraph(grad_text, self.body_style))
-                    
-                    story.append(Spacer(1, 6))
-            
-            # Projects
-            projects = resume_data.get('projects', [])
-            if projects:
-                story.append(Paragraph("PROJECTS", self.header_style))
-                
-                for project in projects:
-                    project_name = f"<b>{project.get('name', 'Project Name')}</b>"
-                    story.append(Paragraph(project_name, self.body_style))
-                    
-                    if project.get('description'):
-                        story.append(Paragraph(project['description'], self.body_style))
-                    
-                    if project.get('technologies'):
-                        tech_text = f"Technologies: {', '.join(project['technologies'])}"
-                        story.append(Paragraph(tech_text, self.body_style))
-                    
-                    if project.get('url'):
-                        story.append(Paragraph(project['url'], self.body_style))
-                    
-                    story.append(Spacer(1, 6))
-            
-            # Certifications
-            certifications = resume_data.get('certifications', [])
-            if certifications:
-                story.append(Paragraph("CERTIFICATIONS", self.header_style))
-                
-                for cert in certifications:
-                    cert_text = f"• {cert.get('name', 'Certification')}"
-                    if cert.get('issuer'):
-                        cert_text += f" - {cert['issuer']}"
-                    if cert.get('date'):
-                        cert_text += f" ({cert['date']})"
-                    story.append(Paragraph(cert_text, self.body_style))
-            
-            # Build the PDF
-            doc.build(story)
-            logger.info(f"Resume PDF created: {output_path}")
+            fit = self.backend.render_resume(resume_data, job_data, output_path, fit_one_page=fit_one_page)
+            if fit:
+                logger.info(f"Resume PDF created: {output_path} ({fit['pages']} page(s), {fit['bullets_kept']}/{fit['bullets_total']} bullets, {fit['projects_kept']}/{fit['projects_total']} projects)")
+            else:
+                logger.info(f"Resume PDF created: {output_path}")
+            return fit
             
         except Exception as e:
             logger.error(f"Error creating resume PDF: {str(e)}")
             raise Exception(f"Failed to create resume PDF: {str(e)}")
     
+    def render_resume(self, resume_data: Dict[str, Any], job_data: JobData, output_path: str, fit_one_page: bool = False) -> Optional[Dict[str, Any]]:
+        """ReportLab resume"""
+        doc = self._new_document(output_path)
+        if fit_one_page:
+            return self._build_fitted_resume(doc, resume_data)
+        
+        story = self._build_resume_story(resume_data)
+        
+        # Build the PDF
+        doc.build(story)
+        return None
+    
+    def fit_resume_to_page(self, resume_data: Dict[str, Any], width: float, height: float) -> Tuple[int, Dict[str, Any]]:
+        """
+        Find the largest number of optional items (bullets and projects, in
+        ranked order) whose story fits the given frame. Heights come from
+        wrap() alone, so each probe is a layout pass without a document build.
+        Returns (items kept, layout passes).
+        """
+        candidates = _fit_candidates(resume_data)
+        passes = 0
+        
+        def fits(count: int) -> bool:
+            nonlocal passes
+            # Each probe is a full layout pass; stop between them if the job was cancelled
+            check_cancelled()
+            passes += 1
+            story = self._build_resume_story(_trim_resume(resume_data, candidates, count))
+            return _story_height(story, width, height) <= height
+        
+        if fits(len(candidates)):
+            return len(candidates), {"layout_passes": passes, "candidates": len(candidates)}
+        
+        # Height grows with every item added, so binary search the longest prefix that fits
+        low, high = 0, len(candidates) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle - 1
+        
+        return low, {"layout_passes": passes, "candidates": len(candidates)}
+    
+    def _build_fitted_resume(self, doc: SimpleDocTemplate, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a one-page resume, verifying the measured fit against the real layout"""
+        # SimpleDocTemplate's frame pads each side by 6pt
+        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height)
+        width = frame._width - frame._leftPadding - frame._rightPadding
+        height = frame._height - frame._topPadding - frame._bottomPadding
+        
+        candidates = _fit_candidates(resume_data)
+        count, info = self.fit_resume_to_page(resume_data, width, height)
+        if count == 0 and candidates:
+            logger.warning("Resume does not fit on one page even without optional bullets and projects")
+        
+        builds = 0
+        while True:
+            check_cancelled()
+            trimmed = _trim_resume(resume_data, candidates, count)
+            doc.build(self._build_resume_story(trimmed))
+            builds += 1
+            if doc.page <= 1 or count == 0 or builds > FIT_MAX_REBUILDS:
+                break
+            count -= 1
+        
+        fits = doc.page <= 1
+        if not fits:
+            logger.warning(f"Resume is still {doc.page} pages after {builds} build(s); it could not be fitted on one page")
+        
+        kept = set(candidates[:count])
+        return {
+            "pages": doc.page,
+            "fits": fits,
+            "bullets_kept": sum(1 for item in kept if item[0] == "achievement"),
+            "bullets_total": sum(1 for item in candidates if item[0] == "achievement"),
+            "projects_kept": sum(1 for item in kept if item[0] == "project"),
+            "projects_total": sum(1 for item in candidates if item[0] == "project"),
+            "layout_passes": info["layout_passes"],
+            "builds": builds
+        }
+    
+    def _build_resume_story(self, resume_data: Dict[str, Any]) -> list:
+        """
+        Build the flowables for a resume. Sections that only depend on the
+        base resume (header, education, projects, certifications) come from the
+        section cache; summary, skills and experience are rebuilt per job.
+        """
+        story = []
+        personal_info = resume_data.get('personal_info', {})
+        
+        # Personal Information Header
+        contact = {key: personal_info[key] for key in ('full_name', 'email', 'phone', 'address', 'linkedin_url', 'github_url') if key in personal_info}
+        story.extend(self._build_header_section(contact))
+        
+        # Professional Summary
+        if personal_info.get('professional_summary'):
+            story.append(Paragraph("PROFESSIONAL SUMMARY", self.header_style))
+            story.append(Paragraph(personal_info['professional_summary'], self.body_style))
+            story.append(Spacer(1, 6))
+        
+        # Skills
+        skills = resume_data.get('skills', [])
+        if skills:
+            story.append(Paragraph("TECHNICAL SKILLS", self.header_style))
+            skills_text = ' • '.join(skills)
+            story.append(Paragraph(skills_text, self.body_style))
+            story.append(Spacer(1, 6))
+        
+        # Experience
+        experience = resume_data.get('experience', [])
+        if experience:
+            story.append(Paragraph("PROFESSIONAL EXPERIENCE", self.header_style))
+            for exp in experience:
+                story.extend(self._build_experience_entry(exp))
+        
+        # Education
+        education = resume_data.get('education', [])
+        if education:
+            story.extend(self._build_education_section(education))
+        
+        # Projects
+        projects = resume_data.get('projects', [])
+        if projects:
+            story.extend(self._build_projects_section(projects))
+        
+        # Certifications
+        certifications = resume_data.get('certifications', [])
+        if certifications:
+            story.extend(self._build_certifications_section(certifications))
+        
+        return story
+    
+    def _build_header_section(self, contact: Dict[str, Any]) -> list:
+        """Name, contact line and profile links"""
+        story = []
+        
+        # Name as title
+        name = contact.get('full_name', 'Your Name')
+        story.append(Paragraph(name, self.title_style))
+        
+        # Contact information
+        contact_parts = []
+        if contact.get('email'):
+            contact_parts.append(contact['email'])
+        if contact.get('phone'):
+            contact_parts.append(contact['phone'])
+        if contact.get('address'):
+            contact_parts.append(contact['address'])
+        
+        contact_text = ' | '.join(contact_parts)
+        story.append(Paragraph(contact_text, self.contact_style))
+        
+        # LinkedIn and GitHub
+        links = []
+        if contact.get('linkedin_url'):
+            links.append(f"LinkedIn: {contact['linkedin_url']}")
+        if contact.get('github_url'):
+            links.append(f"GitHub: {contact['github_url']}")
+        
+        if links:
+            story.append(Paragraph(' | '.join(links), self.contact_style))
+        
+        story.append(Spacer(1, 12))
+        return story
+    
+    def _build_experience_entry(self, exp: Dict[str, Any]) -> list:
+        """One job under PROFESSIONAL EXPERIENCE"""
+        story = []
+        
+        # Job title and company
+        title_text = f"<b>{exp.get('title', 'Job Title')}</b> | {exp.get('company', 'Company Name')}"
+        story.append(Paragraph(title_text, self.body_style))
+        
+        # Location and dates
+        location_date = f"{exp.get('location', '')} | {exp.get('start_date', '')} - {exp.get('end_date', '')}"
+        story.append(Paragraph(location_date, self.body_style))
+        story.append(Spacer(1, 3))
+        
+        # Description
+        if exp.get('description'):
+            story.append(Paragraph(exp['description'], self.body_style))
+        
+        # Achievements
+        if exp.get('achievements'):
+            story.append(Spacer(1, 3))
+            for achievement in exp['achievements']:
+                story.append(Paragraph(f"• {achievement}", self.body_style))
+        
+        story.append(Spacer(1, 12))
+        return story
+    
+    def _build_education_section(self, education: List[Dict[str, Any]]) -> list:
+        story = [Paragraph("EDUCATION", self.header_style)]
+        
+        for edu in education:
+            degree_text = f"<b>{edu.get('degree', 'Degree')}</b>"
+            story.append(Paragraph(degree_text, self.body_style))
+            
+            school_text = f"{edu.get('school', 'School Name')}, {edu.get('location', '')}"
+            story.append(Paragraph(school_text, self.body_style))
+            
+            if edu.get('graduation_date'):
+                grad_text = f"Graduated: {edu['graduation_date']}"
+                if edu.get('gpa'):
+                    grad_text += f" | GPA: {edu['gpa']}"
+                story.append(Paragraph(grad_text, self.body_style))
+            
+            story.append(Spacer(1, 6))
+        
+        return story
+    
+    def _build_projects_section(self, projects: List[Dict[str, Any]]) -> list:
+        story = [Paragraph("PROJECTS", self.header_style)]
+        
+        for project in projects:
+            story.extend(self._build_project_entry(project))
+        
+        return story
+    
+    def _build_project_entry(self, project: Dict[str, Any]) -> list:
+        story = []
+        project_name = f"<b>{project.get('name', 'Project Name')}</b>"
+        story.append(Paragraph(project_name, self.body_style))
+        
+        if project.get('description'):
+            story.append(Paragraph(project['description'], self.body_style))
+        
+        if project.get('technologies'):
+            tech_text = f"Technologies: {', '.join(project['technologies'])}"
+            story.append(Paragraph(tech_text, self.body_style))
+        
+        if project.get('url'):
+            story.append(Paragraph(project['url'], self.body_style))
+        
+        story.append(Spacer(1, 6))
+        return story
+    
+    def _build_certifications_section(self, certifications: List[Dict[str, Any]]) -> list:
+        story = [Paragraph("CERTIFICATIONS", self.header_style)]
+        
+        for cert in certifications:
+            cert_text = f"• {cert.get('name', 'Certification')}"
+            if cert.get('issuer'):
+                cert_text += f" - {cert['issuer']}"
+            if cert.get('date'):
+                cert_text += f" ({cert['date']})"
+            story.append(Paragraph(cert_text, self.body_style))
+        
+        return story
+    
     def create_simple_document(self, content: str, output_path: str, title: str = "Document"):
         """Create a simple PDF document with just text content"""
         try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=letter,
-                rightMargin=inch,
-                leftMargin=inch,
-                topMargin=inch,
-                bottomMargin=inch
-            )
-            
+            doc = self._new_document(output_path)
             story = []
             
             # Add title
@@ -293,3 +478,34 @@ class PDFService:
         except Exception as e:
             logger.error(f"Error creating simple PDF: {str(e)}")
             raise Exception(f"Failed to create simple PDF: {str(e)}")
+
+
+def _fit_candidates(resume_data: Dict[str, Any]) -> List[tuple]:
+    """
+    Optional resume items in the order they are kept: the best bullet of every
+    role and the best project first, then the second best, and so on. Bullets
+    and projects are assumed to already be ranked (see ResumeVariantService).
+    """
+    experience = resume_data.get('experience', [])
+    projects = resume_data.get('projects', []) or []
+    depth = max([len(exp.get('achievements') or []) for exp in experience] + [len(projects)])
+    
+    candidates = []
+    for rank in range(depth):
+        for index, exp in enumerate(experience):
+            if rank < len(exp.get('achievements') or []):
+                candidates.append(("achievement", index, rank))
+        if rank < len(projects):
+            candidates.append(("project", rank))
+    return candidates
+
+
+def _trim_resume(resume_data: Dict[str, Any], candidates: List[tuple], count: int) -> Dict[str, Any]:
+    """Copy of resume_data keeping only the first `count` candidates, in their original order"""
+    kept = set(candidates[:count])
+    experience = []
+    for index, exp in enumerate(resume_data.get('experience', [])):
+        achievements = exp.get('achievements') or []
+        experience.append({**exp, 'achievements': [text for rank, text in enumerate(achievements) if ("achievement", index, rank) in kept]})
+    projects = [project for rank, project in enumerate(resume_data.get('projects', []) or []) if ("project", rank) in kept]
+    return {**resume_data, 'experience': experience, 'projects': projects}
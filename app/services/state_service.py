@@ -0,0 +1,247 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedup (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    page_id TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    outcome TEXT,
+    worker TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at);
+CREATE INDEX IF NOT EXISTS jobs_page ON jobs (page_id, status);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    operation TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+class SharedState:
+    """
+    State shared by every worker process on the host: webhook de-duplication,
+    the job registry (queue depth), leader leases for background tasks and a
+    small key-value cache. Backed by one SQLite database in WAL mode so
+    readers never block the writer.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("STATE_DB_PATH", os.path.join(os.getenv("OUTPUT_DIR", "./output"), ".state.db"))
+        self.stale_after = float(os.getenv("JOB_STALE_AFTER", "3600"))
+        self._pid = os.getpid()
+        self.worker_id = f"{socket.gethostname()}:{self._pid}"
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; autocommit, with explicit BEGIN IMMEDIATE for read-modify-write"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=10000")
+        with self._init_lock:
+            if not self._initialized:
+                connection.executescript(_SCHEMA)
+                self._initialized = True
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        if self._pid != os.getpid():
+            # Created before a fork - the child is a different worker
+            self._pid = os.getpid()
+            self.worker_id = f"{socket.gethostname()}:{self._pid}"
+        return connection
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    # Webhook de-duplication
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """Claim a key for ttl seconds; False if another request (in any worker) already holds it"""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("DELETE FROM dedup WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = db.execute("INSERT OR IGNORE INTO dedup (key, expires_at) VALUES (?, ?)", (key, now + ttl))
+            return cursor.rowcount == 1
+
+    def release(self, key: str):
+        """Give up a claim, so a redelivery of the same request is processed"""
+        self._connection().execute("DELETE FROM dedup WHERE key = ?", (key,))
+
+    # Job registry
+
+    def job_accepted(self, job_id: str, page_id: str = "") -> bool:
+        """
+        Register a queued job. Returns False if a job for the same page is
+        already queued or running in any worker.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            if page_id:
+                active = db.execute(
+                    "SELECT 1 FROM jobs WHERE page_id = ? AND status IN ('queued', 'running') AND updated_at > ? LIMIT 1",
+                    (page_id, now - self.stale_after)
+                ).fetchone()
+                if active:
+                    return False
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, page_id, status, worker, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, page_id, self.worker_id, now, now)
+            )
+            return True
+
+    def job_started(self, job_id: str):
+        self._connection().execute(
+            "UPDATE jobs SET status = 'running', worker = ?, updated_at = ? WHERE job_id = ?",
+            (self.worker_id, time.time(), job_id)
+        )
+
+    def job_finished(self, job_id: str, outcome: str):
+        self._connection().execute(
+            "UPDATE jobs SET status = 'finished', outcome = ?, updated_at = ? WHERE job_id = ?",
+            (outcome, time.time(), job_id)
+        )
+
+    def active_jobs(self) -> int:
+        """Jobs queued or running across all workers (jobs not updated within JOB_STALE_AFTER are ignored)"""
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running') AND updated_at > ?",
+            (time.time() - self.stale_after,)
+        ).fetchone()
+        return row[0]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT job_id, page_id, status, outcome, worker, created_at, updated_at FROM jobs WHERE job_id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("job_id", "page_id", "status", "outcome", "worker", "created_at", "updated_at"), row))
+
+    # Leader leases
+
+    def acquire_lease(self, name: str, ttl: float) -> bool:
+        """Take or renew a named lease; only one worker holds it until it expires"""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] != self.worker_id and row[1] > now:
+                return False
+            db.execute("INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)", (name, self.worker_id, now + ttl))
+            return True
+
+    def release_lease(self, name: str):
+        self._connection().execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, self.worker_id))
+
+    # Outbox of deferred writes
+
+    def enqueue(self, key: str, operation: str, arguments: Dict[str, Any]):
+        """Queue a write; a newer write with the same key replaces the older one and moves to the back"""
+        self._connection().execute(
+            "INSERT OR REPLACE INTO outbox (key, operation, arguments, created_at) VALUES (?, ?, ?, ?)",
+            (key, operation, json.dumps(arguments, default=str), time.time())
+        )
+
+    def pending(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Oldest queued writes first"""
+        rows = self._connection().execute(
+            "SELECT id, key, operation, arguments, attempts, created_at FROM outbox ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        return [
+            {"id": row[0], "key": row[1], "operation": row[2], "arguments": json.loads(row[3]), "attempts": row[4], "created_at": row[5]}
+            for row in rows
+        ]
+
+    def dequeue(self, entry_id: int):
+        self._connection().execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def retry_later(self, entry_id: int):
+        self._connection().execute("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", (entry_id,))
+
+    def outbox_size(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    # Key-value cache
+
+    def put(self, namespace: str, key: str, value: Any, ttl: float):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, default=str), time.time() + ttl)
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge_expired(self) -> int:
+        """Drop expired dedup keys, cache entries and old finished jobs"""
+        now = time.time()
+        with self._transaction() as db:
+            removed = db.execute("DELETE FROM dedup WHERE expires_at <= ?", (now,)).rowcount
+            removed += db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+            removed += db.execute("DELETE FROM jobs WHERE status = 'finished' AND updated_at <= ?", (now - 7 * 86400,)).rowcount
+        return removed
+
+    def is_healthy(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except Exception as e:
+            logger.error(f"Shared state health check failed: {str(e)}")
+            return False
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, so check-then-write sequences are atomic across processes"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
@@ -1,38 +1,160 @@
 import os
 import logging
-from jinja2 import Environment, FileSystemLoader, Template
+import tempfile
+import time
+import threading
+from typing import Dict, AsyncIterator, Callable, Optional
+from jinja2 import Environment, FileSystemLoader, DictLoader, ChoiceLoader, FileSystemBytecodeCache, Template
+
+from ..utils.metrics import metrics, instrument
 
 logger = logging.getLogger(__name__)
 
+
+def _autoescape(name: str) -> bool:
+    """Escape HTML templates (used for PDF rendering); plain-text templates stay raw"""
+    return bool(name) and name.endswith(".html.j2")
+
+
+@instrument("template")
 class TemplateService:
     """Service for managing document templates"""
     
     def __init__(self):
         self.templates_dir = os.getenv("TEMPLATES_DIR", "./templates")
+        self.cache_dir = os.getenv("TEMPLATES_CACHE_DIR", os.path.join(tempfile.gettempdir(), "jobbuilder-jinja-cache"))
+        self.hot_reload = os.getenv("TEMPLATES_HOT_RELOAD", "false").lower() == "true"
+        self.watch_interval = float(os.getenv("TEMPLATES_WATCH_INTERVAL", "1.0"))
+        self.stream_chunk_size = int(os.getenv("TEMPLATES_STREAM_CHUNK_SIZE", "8192"))
         self.env = None
+        self.async_env = None
+        # Compiled templates by name - renders never touch the loader after warm-up
+        self._templates: Dict[str, Template] = {}
+        self._async_templates: Dict[str, Template] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
         self._setup_jinja_environment()
     
     def _setup_jinja_environment(self):
         """Set up Jinja2 environment for template rendering"""
         try:
-            if os.path.exists(self.templates_dir):
-                self.env = Environment(loader=FileSystemLoader(self.templates_dir))
-            else:
-                logger.warning(f"Templates directory not found: {self.templates_dir}")
-                # Create directory and add default templates
-                os.makedirs(self.templates_dir, exist_ok=True)
-                self._create_default_templates()
-                self.env = Environment(loader=FileSystemLoader(self.templates_dir))
+            if not os.path.exists(self.templates_dir):
+                logger.warning(f"Templates directory not found: {self.templates_dir}, using built-in templates")
+            
+            # Files in the templates directory override the built-in defaults,
+            # which are served from memory so startup never writes to disk
+            loader = ChoiceLoader([
+                FileSystemLoader(self.templates_dir),
+                DictLoader({name: get_template() for name, get_template in self._default_templates().items()})
+            ])
+            
+            # Compiled bytecode survives restarts so cold starts skip compilation.
+            # auto_reload is off: sources are only re-read by the opt-in watcher.
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.env = Environment(
+                loader=loader,
+                bytecode_cache=FileSystemBytecodeCache(self.cache_dir),
+                auto_reload=False,
+                autoescape=_autoescape
+            )
+            # Async templates compile to different code, so they need their own bytecode cache
+            async_cache_dir = os.path.join(self.cache_dir, "async")
+            os.makedirs(async_cache_dir, exist_ok=True)
+            self.async_env = Environment(
+                loader=loader,
+                bytecode_cache=FileSystemBytecodeCache(async_cache_dir),
+                auto_reload=False,
+                autoescape=_autoescape,
+                enable_async=True
+            )
         except Exception as e:
             logger.error(f"Error setting up template environment: {str(e)}")
     
+    def warm_up(self) -> int:
+        """Compile every template up front and start the watcher if hot reload is enabled"""
+        if not self.env:
+            return 0
+        
+        count = 0
+        for name in self.env.list_templates(extensions=["j2"]):
+            try:
+                self._load_template(name)
+                count += 1
+            except Exception as e:
+                logger.error(f"Error compiling template {name}: {str(e)}")
+        
+        logger.info(f"Compiled {count} templates")
+        if self.hot_reload:
+            self.start_watching()
+        return count
+    
+    def get_template(self, name: str) -> Template:
+        """Return a compiled template, compiling it on first use"""
+        template = self._templates.get(name)
+        if template is not None:
+            metrics.record_cache("template", hit=True)
+            return template
+        metrics.record_cache("template", hit=False)
+        return self._load_template(name)
+    
+    def _load_template(self, name: str) -> Template:
+        with self._lock:
+            template = self.env.get_template(name)
+            self._templates[name] = template
+            self._mtimes[name] = self._source_mtime(name)
+            return template
+    
+    def _source_mtime(self, name: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(self.templates_dir, name))
+        except OSError:
+            return 0.0
+    
+    def start_watching(self):
+        """Poll template sources and recompile the ones that change"""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, name="template-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.templates_dir} for template changes")
+    
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join(timeout=self.watch_interval * 2)
+            self._watcher = None
+    
+    def _watch_loop(self):
+        while not self._stop_watching.wait(self.watch_interval):
+            try:
+                self.reload_changed()
+            except Exception as e:
+                logger.error(f"Template watcher error: {str(e)}")
+    
+    def reload_changed(self) -> list:
+        """Recompile templates whose source changed since they were loaded"""
+        changed = [name for name in self.env.list_templates(extensions=["j2"]) if self._source_mtime(name) != self._mtimes.get(name)]
+        if changed:
+            # Drop Jinja's own cache so get_template re-reads the sources
+            self.env.cache.clear()
+            if self.async_env:
+                self.async_env.cache.clear()
+            for name in changed:
+                self._async_templates.pop(name, None)
+                self._load_template(name)
+            logger.info(f"Reloaded templates: {', '.join(changed)}")
+        return changed
+    
     def render_cover_letter(self, template_data: dict) -> str:
         """Render cover letter using template"""
         try:
             if not self.env:
                 return self._get_fallback_cover_letter(template_data)
             
-            template = self.env.get_template("cover_letter.j2")
+            template = self.get_template("cover_letter.j2")
             return template.render(**template_data)
             
         except Exception as e:
@@ -45,30 +167,86 @@ class TemplateService:
             if not self.env:
                 return self._get_fallback_resume(template_data)
             
-            template = self.env.get_template("resume.j2")
+            template = self.get_template("resume.j2")
             return template.render(**template_data)
             
         except Exception as e:
             logger.error(f"Error rendering resume template: {str(e)}")
             return self._get_fallback_resume(template_data)
     
-    def _create_default_templates(self):
-        """Create default template files"""
+    def get_async_template(self, name: str) -> Template:
+        """Return a compiled async-capable template, compiling it on first use"""
+        template = self._async_templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self.async_env.get_template(name)
+                self._async_templates[name] = template
+        return template
+    
+    async def stream(self, name: str, template_data: dict) -> AsyncIterator[str]:
+        """
+        Render a template incrementally. Jinja's per-node output is coalesced
+        into chunks of roughly TEMPLATES_STREAM_CHUNK_SIZE characters.
+        """
+        start = time.perf_counter()
+        template = self.get_async_template(name)
+        buffer = []
+        buffered = 0
+        
+        async for piece in template.generate_async(**template_data):
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= self.stream_chunk_size:
+                yield "".join(buffer)
+                buffer = []
+                buffered = 0
+        
+        if buffer:
+            yield "".join(buffer)
+        metrics.service_call_duration.observe(time.perf_counter() - start, service="template", method="stream")
+    
+    def _default_templates(self) -> Dict[str, Callable[[], str]]:
+        """Built-in templates by name"""
+        return {
+            "cover_letter.j2": self._get_default_cover_letter_template,
+            "resume.j2": self._get_default_resume_template,
+            "resume_one_page.j2": self._get_default_one_page_resume_template,
+            "resume_ats.j2": self._get_default_ats_resume_template,
+            "cover_letter.html.j2": self._get_default_cover_letter_html_template,
+            "resume.html.j2": self._get_default_resume_html_template
+        }
+    
+    def get_stylesheet_path(self) -> Optional[str]:
+        """Path of a customized pdf.css in the templates directory, if there is one"""
+        path = os.path.join(self.templates_dir, "pdf.css")
+        return path if os.path.exists(path) else None
+    
+    def get_default_stylesheet(self) -> str:
+        """Built-in CSS for HTML-rendered PDFs"""
+        return self._get_default_pdf_stylesheet()
+    
+    def write_default_templates(self) -> list:
+        """Write the built-in templates (and pdf.css) that don't exist yet, as a starting point for customizing"""
+        defaults = {**self._default_templates(), "pdf.css": self._get_default_pdf_stylesheet}
+        
         try:
-            # Create cover letter template
-            cover_letter_template = self._get_default_cover_letter_template()
-            with open(os.path.join(self.templates_dir, "cover_letter.j2"), 'w') as f:
-                f.write(cover_letter_template)
-            
-            # Create resume template
-            resume_template = self._get_default_resume_template()
-            with open(os.path.join(self.templates_dir, "resume.j2"), 'w') as f:
-                f.write(resume_template)
+            os.makedirs(self.templates_dir, exist_ok=True)
+            created = []
+            for name, get_template in defaults.items():
+                path = os.path.join(self.templates_dir, name)
+                if os.path.exists(path):
+                    continue
+                with open(path, 'w') as f:
+                    f.write(get_template())
+                created.append(name)
             
-            logger.info("Created default templates")
+            if created:
+                logger.info(f"Created default templates: {', '.join(created)}")
+            return created
             
         except Exception as e:
             logger.error(f"Error creating default templates: {str(e)}")
+            return []
     
     def _get_default_cover_letter_template(self) -> str:
         """Get default cover letter template"""
@@ -158,6 +336,171 @@ CERTIFICATIONS
 {% endfor %}
 {% endif %}"""
     
+    def _get_default_one_page_resume_template(self) -> str:
+        """Get default one-page resume template (top skills and bullets only)"""
+        return """{{ personal_info.full_name }}
+{{ personal_info.email }} | {{ personal_info.phone }}{% if personal_info.address %} | {{ personal_info.address }}{% endif %}
+
+SUMMARY
+{{ personal_info.professional_summary }}
+
+SKILLS
+{{ skills[:max_skills|default(10)]|join(' • ') }}
+
+EXPERIENCE
+{% for exp in experience %}
+{{ exp.title }} | {{ exp.company }} | {{ exp.dates }}
+{% for achievement in exp.achievements[:max_bullets|default(2)] %}
+• {{ achievement }}
+{% endfor %}
+{% endfor %}
+
+EDUCATION
+{% for edu in education %}
+{{ edu.degree }}, {{ edu.school }}{% if edu.graduation %} ({{ edu.graduation }}){% endif %}
+{% endfor %}"""
+    
+    def _get_default_ats_resume_template(self) -> str:
+        """Get default ATS-friendly plain resume template (no symbols or columns)"""
+        return """{{ personal_info.full_name }}
+Email: {{ personal_info.email }}
+Phone: {{ personal_info.phone }}
+{% if personal_info.address %}Location: {{ personal_info.address }}
+{% endif %}{% if personal_info.linkedin_url %}LinkedIn: {{ personal_info.linkedin_url }}
+{% endif %}{% if personal_info.github_url %}GitHub: {{ personal_info.github_url }}
+{% endif %}
+SUMMARY
+{{ personal_info.professional_summary }}
+
+SKILLS
+{{ skills|join(', ') }}
+
+EXPERIENCE
+{% for exp in experience %}
+{{ exp.title }}
+{{ exp.company }}, {{ exp.location }}
+{{ exp.dates }}
+{% if exp.description %}{{ exp.description }}
+{% endif %}{% for achievement in exp.achievements %}- {{ achievement }}
+{% endfor %}
+{% endfor %}
+EDUCATION
+{% for edu in education %}
+{{ edu.degree }}
+{{ edu.school }}, {{ edu.location }}
+{% if edu.graduation %}Graduation: {{ edu.graduation }}
+{% endif %}{% if edu.gpa %}GPA: {{ edu.gpa }}
+{% endif %}
+{% endfor %}{% if projects %}
+PROJECTS
+{% for project in projects %}
+{{ project.name }}
+{{ project.description }}
+Technologies: {{ project.technologies|join(', ') }}
+{% endfor %}{% endif %}"""
+    
+    def _get_default_cover_letter_html_template(self) -> str:
+        """Get default HTML cover letter template (PDF backends)"""
+        return """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Cover Letter - {{ job_data.company_name }}</title></head>
+<body class="cover-letter">
+<p class="date">{{ date }}</p>
+{% for paragraph in paragraphs %}
+<p>{{ paragraph }}</p>
+{% endfor %}
+</body>
+</html>"""
+    
+    def _get_default_resume_html_template(self) -> str:
+        """Get default HTML resume template (PDF backends)"""
+        return """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{{ personal_info.full_name }} - Resume</title></head>
+<body class="resume">
+<header>
+<h1>{{ personal_info.full_name|default('Your Name') }}</h1>
+<p class="contact">{{ [personal_info.email, personal_info.phone, personal_info.address]|select|join(' | ') }}</p>
+{% if personal_info.linkedin_url or personal_info.github_url %}
+<p class="contact">{% if personal_info.linkedin_url %}LinkedIn: {{ personal_info.linkedin_url }}{% endif %}{% if personal_info.linkedin_url and personal_info.github_url %} | {% endif %}{% if personal_info.github_url %}GitHub: {{ personal_info.github_url }}{% endif %}</p>
+{% endif %}
+</header>
+
+{% if personal_info.professional_summary %}
+<h2>Professional Summary</h2>
+<p>{{ personal_info.professional_summary }}</p>
+{% endif %}
+
+{% if skills %}
+<h2>Technical Skills</h2>
+<p>{{ skills|join(' • ') }}</p>
+{% endif %}
+
+{% if experience %}
+<h2>Professional Experience</h2>
+{% for exp in experience %}
+<section class="entry">
+<p><strong>{{ exp.title }}</strong> | {{ exp.company }}</p>
+<p>{{ exp.location }} | {{ exp.start_date }} - {{ exp.end_date }}</p>
+{% if exp.description %}<p>{{ exp.description }}</p>{% endif %}
+{% if exp.achievements %}
+<ul>
+{% for achievement in exp.achievements %}<li>{{ achievement }}</li>
+{% endfor %}
+</ul>
+{% endif %}
+</section>
+{% endfor %}
+{% endif %}
+
+{% if education %}
+<h2>Education</h2>
+{% for edu in education %}
+<section class="entry">
+<p><strong>{{ edu.degree }}</strong></p>
+<p>{{ edu.school }}, {{ edu.location }}</p>
+{% if edu.graduation_date %}<p>Graduated: {{ edu.graduation_date }}{% if edu.gpa %} | GPA: {{ edu.gpa }}{% endif %}</p>{% endif %}
+</section>
+{% endfor %}
+{% endif %}
+
+{% if projects %}
+<h2>Projects</h2>
+{% for project in projects %}
+<section class="entry">
+<p><strong>{{ project.name }}</strong></p>
+{% if project.description %}<p>{{ project.description }}</p>{% endif %}
+{% if project.technologies %}<p>Technologies: {{ project.technologies|join(', ') }}</p>{% endif %}
+{% if project.url %}<p>{{ project.url }}</p>{% endif %}
+</section>
+{% endfor %}
+{% endif %}
+
+{% if certifications %}
+<h2>Certifications</h2>
+<ul>
+{% for cert in certifications %}<li>{{ cert.name }}{% if cert.issuer %} - {{ cert.issuer }}{% endif %}{% if cert.date %} ({{ cert.date }}){% endif %}</li>
+{% endfor %}
+</ul>
+{% endif %}
+</body>
+</html>"""
+    
+    def _get_default_pdf_stylesheet(self) -> str:
+        """Get default stylesheet for HTML-rendered PDFs (matches the ReportLab layout)"""
+        return """@page { size: letter; margin: 1in; }
+body { font-family: Helvetica, Arial, sans-serif; font-size: 10pt; line-height: 1.2; color: #000; }
+p { margin: 0 0 6pt 0; text-align: justify; }
+h1 { font-size: 16pt; text-align: center; margin: 0 0 12pt 0; }
+h2 { font-size: 12pt; text-transform: uppercase; margin: 12pt 0 6pt 0; }
+.contact { text-align: center; margin-bottom: 12pt; }
+header { margin-bottom: 12pt; }
+.entry { margin-bottom: 12pt; break-inside: avoid; }
+ul { margin: 3pt 0 0 0; padding-left: 12pt; }
+li { margin-bottom: 3pt; }
+.cover-letter .date { margin-bottom: 18pt; }
+"""
+    
     def _get_fallback_cover_letter(self, data: dict) -> str:
         """Fallback cover letter when template fails"""
         personal_info = data.get('personal_info', {})
@@ -0,0 +1,184 @@
+import os
+import re
+import time
+import asyncio
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+
+from ..models.job import JobData
+from ..utils.metrics import instrument
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> how it is rendered
+RESUME_VARIANTS = {
+    "one_page": {"kind": "template", "template": "resume_one_page.j2"},
+    "two_page": {"kind": "template", "template": "resume.j2"},
+    "ats_plain": {"kind": "template", "template": "resume_ats.j2"},
+    "notion": {"kind": "markdown"},
+    "pdf": {"kind": "pdf"},
+    "pdf_one_page": {"kind": "pdf", "fit_one_page": True, "prefix": "resume_one_page"}
+}
+
+DEFAULT_VARIANTS = ("one_page", "two_page", "ats_plain", "notion")
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_STOPWORDS = {
+    "the", "and", "for", "with", "you", "our", "are", "will", "your", "this", "that", "have",
+    "from", "who", "all", "not", "but", "can", "into", "able", "such", "their", "they", "has",
+    "work", "team", "role", "experience", "years", "using", "including", "strong"
+}
+
+
+@instrument("variants")
+class ResumeVariantService:
+    """Renders several resume layouts from one shared, pre-computed context"""
+
+    def __init__(self, template_service, markdown_service, pdf_service=None, max_workers: Optional[int] = None):
+        self.template_service = template_service
+        self.markdown_service = markdown_service
+        # A PDFService, or a zero-argument provider so the PDF stack loads only when a PDF variant is rendered
+        self._pdf_service = pdf_service
+        self.max_workers = max_workers or int(os.getenv("VARIANT_WORKERS", "4"))
+
+    @property
+    def pdf_service(self):
+        if callable(self._pdf_service):
+            self._pdf_service = self._pdf_service()
+        return self._pdf_service
+
+    def prepare_context(self, resume_data: Dict[str, Any], job_data: JobData) -> Dict[str, Any]:
+        """
+        Build the context every variant shares: skills in priority order and
+        achievements and projects ranked by relevance to the job. Dates are left
+        as given; _with_display_dates formats them for the layouts that want it.
+        """
+        keywords = _keywords(job_data.job_description)
+        skills = list(resume_data.get("skills", []))
+        job_desc_lower = job_data.job_description.lower()
+        skill_terms = {skill.lower() for skill in skills if skill.lower() in job_desc_lower}
+
+        experience = []
+        for exp in resume_data.get("experience", []):
+            achievements = exp.get("achievements") or []
+            # Stable sort keeps the author's order among equally relevant bullets
+            ranked = sorted(achievements, key=lambda text: _relevance(text, keywords, skill_terms), reverse=True)
+            experience.append({
+                **exp,
+                "achievements": ranked,
+                "relevance": sum(_relevance(text, keywords, skill_terms) for text in achievements)
+            })
+
+        projects = sorted(
+            resume_data.get("projects", []) or [],
+            key=lambda project: _relevance(
+                " ".join([project.get("description", "")] + list(project.get("technologies", []))),
+                keywords,
+                skill_terms
+            ),
+            reverse=True
+        )
+
+        return {
+            **resume_data,
+            "skills": skills,
+            "experience": experience,
+            "projects": projects,
+            "job_data": job_data,
+            "date": datetime.now().strftime("%B %d, %Y")
+        }
+
+    def render_variants(self, resume_data: Dict[str, Any], job_data: JobData, variants: Optional[List[str]] = None, output_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Render the requested variants in parallel from one shared context.
+        Each variant reports its content (or PDF path), elapsed_ms and any error.
+        """
+        variants = list(variants or DEFAULT_VARIANTS)
+        unknown = [name for name in variants if name not in RESUME_VARIANTS]
+        if unknown:
+            raise ValueError(f"Unknown resume variants: {', '.join(unknown)}")
+
+        start = time.perf_counter()
+        context = _with_display_dates(self.prepare_context(resume_data, job_data))
+        prepare_ms = (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(variants)) or 1) as pool:
+            futures = {name: pool.submit(self._render_variant, name, context, job_data, output_dir) for name in variants}
+            results = {name: future.result() for name, future in futures.items()}
+
+        return {
+            "variants": results,
+            "timing": {
+                "prepare_ms": round(prepare_ms, 2),
+                "total_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
+        }
+
+    async def render_variants_async(self, resume_data: Dict[str, Any], job_data: JobData, variants: Optional[List[str]] = None, output_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Run render_variants off the event loop"""
+        return await asyncio.to_thread(self.render_variants, resume_data, job_data, variants, output_dir)
+
+    def _render_variant(self, name: str, context: Dict[str, Any], job_data: JobData, output_dir: Optional[str]) -> Dict[str, Any]:
+        spec = RESUME_VARIANTS[name]
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"variant": name}
+
+        try:
+            if spec["kind"] == "template":
+                result["content"] = self.template_service.get_template(spec["template"]).render(**context)
+            elif spec["kind"] == "markdown":
+                result["content"] = self.markdown_service.create_resume_markdown(context, job_data)
+            elif spec["kind"] == "pdf":
+                if self.pdf_service is None:
+                    raise ValueError("PDF variant requested but no PDF service configured")
+                output_dir = output_dir or os.getenv("OUTPUT_DIR", "./output")
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                prefix = spec.get("prefix", "resume")
+                path = os.path.join(output_dir, f"{prefix}_{job_data.company_name.replace(' ', '_')}_{timestamp}.pdf")
+                fit = self.pdf_service.create_resume_pdf(context, job_data, path, fit_one_page=spec.get("fit_one_page", False))
+                result["path"] = path
+                if fit:
+                    result["fit"] = fit
+        except Exception as e:
+            logger.error(f"Error rendering resume variant {name}: {str(e)}")
+            result["error"] = str(e)
+
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+
+def _keywords(text: str) -> set:
+    return {word for word in _WORD_PATTERN.findall(text.lower()) if len(word) > 2 and word not in _STOPWORDS}
+
+
+def _relevance(text: str, keywords: set, skill_terms: set) -> int:
+    """Keyword overlap with the job description, plus a bonus for each job-relevant skill named"""
+    lowered = text.lower()
+    score = len(_keywords(lowered) & keywords)
+    score += sum(2 for skill in skill_terms if skill in lowered)
+    return score
+
+
+def _with_display_dates(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the formatted 'dates' and 'graduation' fields the one-page and ATS layouts show"""
+    experience = []
+    for exp in context.get("experience", []):
+        start = _format_date(exp.get("start_date", ""))
+        end = _format_date(exp.get("end_date", ""))
+        experience.append({**exp, "dates": f"{start} - {end}" if start or end else ""})
+    education = [{**edu, "graduation": _format_date(edu.get("graduation_date", ""))} for edu in context.get("education", [])]
+    return {**context, "experience": experience, "education": education}
+
+
+def _format_date(value: str) -> str:
+    """'2024-05' -> 'May 2024'; anything else is returned unchanged"""
+    if not value:
+        return ""
+    for fmt in ("%Y-%m", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%b %Y")
+        except ValueError:
+            continue
+    return value
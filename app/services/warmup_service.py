@@ -0,0 +1,81 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    """
+    Startup steps that pay one-off costs (connections, model load, template
+    compilation, lazy imports and caches) before the first job does. Steps run
+    concurrently; blocking ones in worker threads. A failed or slow step is
+    reported, never fatal. Steps don't count toward metrics or adaptive limits.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, timeout: Optional[float] = None):
+        self.enabled = enabled if enabled is not None else os.getenv("WARM_UP_ENABLED", "true").lower() == "true"
+        self.timeout = timeout or float(os.getenv("WARM_UP_TIMEOUT", "120"))
+        self._steps: Dict[str, Callable[[], Any]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    def register(self, name: str, step: Callable[[], Any]):
+        """Register a step: a blocking callable or a coroutine function"""
+        self._steps[name] = step
+
+    @property
+    def done(self) -> bool:
+        return not self.enabled or self.finished_at is not None
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        """Run every step once; returns per-step status and duration"""
+        if not self.enabled:
+            return {}
+
+        self.started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        names = list(self._steps)
+        # Keep warm-up traffic out of the request metrics and the adaptive limits
+        with metrics.suppressed():
+            results = await asyncio.gather(*(self._run_step(name) for name in names))
+        self.results = dict(zip(names, results))
+        self.finished_at = datetime.now().isoformat()
+
+        failed = [name for name, result in self.results.items() if result["status"] != "ok"]
+        logger.info(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms"
+                    + (f" ({', '.join(failed)} did not complete)" if failed else ""))
+        return self.results
+
+    async def _run_step(self, name: str) -> Dict[str, Any]:
+        step = self._steps[name]
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"status": "ok"}
+        try:
+            call = step() if inspect.iscoroutinefunction(step) else asyncio.to_thread(step)
+            value = await asyncio.wait_for(call, self.timeout)
+            if value is False:
+                result["status"] = "skipped"
+        except asyncio.TimeoutError:
+            result = {"status": "timeout"}
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {str(e)}")
+            result = {"status": "failed", "error": str(e)}
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "done": self.done,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": dict(self.results)
+        }
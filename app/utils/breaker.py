@@ -0,0 +1,157 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for jobbuilder_circuit_breaker_state
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit breaker is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a sliding time window. It opens when
+    at least `min_calls` calls in the last `window` seconds failed at
+    `failure_rate` or more, rejects calls for `open_seconds`, then lets
+    `half_open_calls` trial calls through: all succeed -> closed, any
+    fails -> open again.
+    """
+
+    def __init__(self, name: str, window: Optional[float] = None, min_calls: Optional[int] = None,
+                 failure_rate: Optional[float] = None, open_seconds: Optional[float] = None, half_open_calls: Optional[int] = None):
+        self.name = name
+        self.window = window or float(os.getenv("BREAKER_WINDOW", "60"))
+        self.min_calls = min_calls or int(os.getenv("BREAKER_MIN_CALLS", "5"))
+        self.failure_rate = failure_rate or float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+        self.open_seconds = open_seconds or float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+        self.half_open_calls = half_open_calls or int(os.getenv("BREAKER_HALF_OPEN_CALLS", "1"))
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._calls: deque = deque()
+        self._trials = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+        metrics.circuit_breaker_state.set(0, dependency=name)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; an open breaker turns half-open once open_seconds have passed"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    if time.monotonic() - self.opened_at < self.open_seconds:
+                        return False
+                    # The trial calls never reported back (e.g. cancelled); allow new ones
+                    self._trials = self._trial_successes = 0
+                self._trials += 1
+            return True
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a trial call through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN and self.retry_in() > 0
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._transition(CLOSED)
+                return
+            self._record(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._record(False)
+            failures = sum(1 for _, ok in self._calls if not ok)
+            if self.state == CLOSED and len(self._calls) >= self.min_calls and failures / len(self._calls) >= self.failure_rate:
+                self._transition(OPEN)
+
+    def _record(self, ok: bool):
+        now = time.monotonic()
+        self._calls.append((now, ok))
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        self._trials = 0
+        self._trial_successes = 0
+        if state in (OPEN, HALF_OPEN):
+            self.opened_at = time.monotonic()
+        if state == CLOSED:
+            self._calls.clear()
+        metrics.circuit_breaker_state.set(_STATE_VALUES[state], dependency=self.name)
+        metrics.circuit_breaker_transitions.inc(dependency=self.name, state=state)
+        logger.warning(f"{self.name} circuit breaker {previous} -> {state}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            calls = [ok for at, ok in self._calls if at >= now - self.window]
+            snapshot = {
+                "state": self.state,
+                "calls": len(calls),
+                "failures": calls.count(False),
+                "window_seconds": self.window
+            }
+        if self.state == OPEN:
+            snapshot["retry_in_seconds"] = round(self.retry_in(), 1)
+        return snapshot
+
+
+class BreakerRegistry:
+    """One breaker per dependency, shared by everything in the process that calls it"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name)
+            return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+breakers = BreakerRegistry()
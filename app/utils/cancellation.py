@@ -0,0 +1,178 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_token: contextvars.ContextVar = contextvars.ContextVar("jobbuilder_cancel_token", default=None)
+
+
+class JobCancelled(asyncio.CancelledError):
+    """
+    Raised when a job was cancelled or ran past its deadline. A
+    CancelledError, so the `except Exception` fallbacks along the pipeline
+    let it through instead of carrying on with a template.
+    """
+
+
+class CancelToken:
+    """
+    Cancellation flag and deadline for one job; safe to check from worker
+    threads. Checks only read memory: `poll`, which looks for a cancellation
+    requested through another worker, is run off the event loop by
+    JobControl.run every `poll_interval` seconds.
+    """
+
+    def __init__(self, job_id: str, timeout: Optional[float] = None, poll: Optional[Callable[[], Any]] = None, poll_interval: float = 1.0):
+        self.job_id = job_id
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason: Optional[str] = None
+        # Page IDs this job created in Notion, archived again if it is cancelled
+        self.created_pages: List[str] = []
+        self.poll = poll
+        self.poll_interval = poll_interval
+        self._cancelled = threading.Event()
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._cancelled.is_set():
+            self.reason = reason
+            self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline exceeded")
+            return True
+        return False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self.cancelled:
+            raise JobCancelled(self.reason)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _current_token.get()
+
+
+def check_cancelled():
+    """Raise JobCancelled if the current job was cancelled or is past its deadline"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def time_left(default: float) -> float:
+    """`default` capped at the current job's remaining time"""
+    token = _current_token.get()
+    remaining = token.remaining() if token is not None else None
+    return default if remaining is None else min(default, remaining)
+
+
+@contextmanager
+def detached():
+    """Run cleanup work outside the current job's token, so it isn't cancelled itself"""
+    token = _current_token.set(None)
+    try:
+        yield
+    finally:
+        _current_token.reset(token)
+
+
+class JobControl:
+    """
+    Tokens of the jobs this worker has accepted and the tasks running them.
+    cancel() flags the token and cancels the task, so awaits stop at once and
+    worker threads stop at their next check.
+    """
+
+    def __init__(self):
+        self.timeout = float(os.getenv("JOB_TIMEOUT", "300"))
+        self._tokens: Dict[str, CancelToken] = {}
+        self._tasks: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def open(self, job_id: str, poll: Optional[Callable[[], Any]] = None) -> CancelToken:
+        """Create a job's token when it is accepted; the deadline counts from here"""
+        with self._lock:
+            token = self._tokens.get(job_id)
+            if token is None:
+                token = self._tokens[job_id] = CancelToken(job_id, self.timeout, poll)
+            return token
+
+    def get(self, job_id: str) -> Optional[CancelToken]:
+        with self._lock:
+            return self._tokens.get(job_id)
+
+    async def run(self, job_id: str, job: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run job() in its own task with the job's token bound, cancelling it
+        when the deadline passes, cancel() is called or the token's poll
+        reports a cancellation
+        """
+        token = self.open(job_id)
+        context_token = _current_token.set(token)
+        try:
+            # The task copies the context, token included
+            task = asyncio.ensure_future(job())
+        finally:
+            _current_token.reset(context_token)
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._tasks[job_id] = (loop, task)
+        remaining = token.remaining()
+        timer = loop.call_later(remaining, self.cancel, job_id, "deadline exceeded") if remaining is not None else None
+        watcher = asyncio.ensure_future(self._watch(job_id, token)) if token.poll is not None else None
+        try:
+            return await task
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if watcher is not None:
+                watcher.cancel()
+            with self._lock:
+                self._tasks.pop(job_id, None)
+                self._tokens.pop(job_id, None)
+
+    async def _watch(self, job_id: str, token: CancelToken):
+        """Run the token's poll in a worker thread, so a slow shared-state read never stalls the loop"""
+        while not token.cancelled:
+            try:
+                requested = await asyncio.to_thread(token.poll)
+            except Exception as e:
+                logger.warning(f"Could not check cancellation of job {job_id}: {str(e)}")
+                requested = False
+            if requested:
+                self.cancel(job_id)
+                return
+            await asyncio.sleep(token.poll_interval)
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> bool:
+        """Cancel a queued or running job of this worker; False if it isn't here"""
+        with self._lock:
+            token = self._tokens.get(job_id)
+            # Only interrupt once, so a second request can't cut the cleanup short
+            running = self._tasks.pop(job_id, None)
+        if token is None:
+            return False
+        token.cancel(reason)
+        if running is not None:
+            loop, task = running
+            loop.call_soon_threadsafe(task.cancel)
+        return True
+
+
+job_control = JobControl()
@@ -0,0 +1,53 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class Container:
+    """
+    Builds services on first use from registered factories. Factories import
+    their modules themselves, so nothing heavy loads until a service is needed.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        # Re-entrant: factories resolve their own dependencies through the container
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"No service registered as '{name}'")
+                start = time.perf_counter()
+                instance = self._factories[name]()
+                self._instances[name] = instance
+                logger.info(f"Initialized {name} service in {(time.perf_counter() - start) * 1000:.1f} ms")
+            return instance
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name not in self._factories:
+            raise AttributeError(name)
+        return self.get(name)
+
+    def provider(self, name: str) -> Callable[[], Any]:
+        """Zero-argument callable returning the service, for consumers that may never need it"""
+        return lambda: self.get(name)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def built(self) -> List[str]:
+        return list(self._instances)
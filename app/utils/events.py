@@ -0,0 +1,170 @@
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, AsyncIterator
+
+from .cancellation import check_cancelled
+from .metrics import metrics
+
+# Events after which a job's stream ends; "evicted" closes the stream of a job
+# whose history had to be dropped while it still had subscribers
+TERMINAL_EVENTS = ("done", "failed", "cancelled", "evicted")
+
+_current_job: contextvars.ContextVar = contextvars.ContextVar("jobbuilder_current_job", default=None)
+
+
+class _Channel:
+    """Event history of one job and the queues of its current subscribers"""
+
+    def __init__(self, history_size: int):
+        self.history: List[Dict[str, Any]] = []
+        self.history_size = history_size
+        self.subscribers: List[tuple] = []
+        self.seq = 0
+        self.closed = False
+
+
+class JobEvents:
+    """
+    In-process pub/sub for job progress. Every subscriber owns a queue and
+    publish() pushes each event straight into all of them, so idle streams
+    cost nothing. A short history per job lets late subscribers (and SSE
+    reconnects with Last-Event-ID) catch up.
+    """
+
+    def __init__(self, max_jobs: Optional[int] = None, history_size: Optional[int] = None):
+        self.max_jobs = max_jobs or int(os.getenv("JOB_EVENTS_BUFFER_SIZE", "200"))
+        self.history_size = history_size or int(os.getenv("JOB_EVENTS_HISTORY", "500"))
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, job_id: str):
+        """
+        Start a job's channel. Beyond JOB_EVENTS_BUFFER_SIZE the oldest channel
+        without subscribers is dropped; if every channel has some, the oldest
+        one's streams are ended with an "evicted" event first.
+        """
+        evicted = []
+        with self._lock:
+            if job_id in self._channels:
+                return
+            self._channels[job_id] = _Channel(self.history_size)
+            while len(self._channels) > self.max_jobs:
+                idle = next((key for key, channel in self._channels.items() if not channel.subscribers and key != job_id), None)
+                if idle is not None:
+                    del self._channels[idle]
+                    continue
+                old_id, channel = self._channels.popitem(last=False)
+                channel.seq += 1
+                channel.closed = True
+                message = {"id": channel.seq, "event": "evicted", "job_id": old_id, "time": time.time(), "reason": "event buffer full"}
+                evicted.append((message, list(channel.subscribers)))
+
+        for message, subscribers in evicted:
+            _deliver(subscribers, message)
+
+    def known(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._channels
+
+    @contextmanager
+    def job(self, job_id: str):
+        """Make job_id the target of publish() calls in this context (threads started with to_thread inherit it)"""
+        self.open(job_id)
+        token = _current_job.set(job_id)
+        try:
+            yield
+        finally:
+            _current_job.reset(token)
+
+    def publish(self, event: str, job_id: Optional[str] = None, **data):
+        """Record an event for a job (the current one by default) and hand it to every subscriber; safe from any thread"""
+        job_id = job_id or _current_job.get()
+        if job_id is None:
+            return
+
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is None or channel.closed:
+                return
+            channel.seq += 1
+            message = {"id": channel.seq, "event": event, "job_id": job_id, "time": time.time(), **data}
+            channel.history.append(message)
+            if len(channel.history) > channel.history_size:
+                # Partial output is the first to go; stage transitions are kept longest
+                index = next((i for i, old in enumerate(channel.history) if old["event"] == "output"), 0)
+                del channel.history[index]
+            channel.closed = event in TERMINAL_EVENTS
+            subscribers = list(channel.subscribers)
+
+        _deliver(subscribers, message)
+
+    async def subscribe(self, job_id: str, after: int = 0, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Events for a job with an id greater than `after`, then live ones until
+        the job finishes. Yields None after `heartbeat` idle seconds so callers
+        can keep the connection alive.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is None:
+                return
+            backlog = [message for message in channel.history if message["id"] > after]
+            closed = channel.closed
+            if not closed:
+                channel.subscribers.append(subscriber)
+
+        try:
+            for message in backlog:
+                yield message
+            last = backlog[-1]["id"] if backlog else after
+            while not closed:
+                try:
+                    message = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message["id"] <= last:
+                    continue
+                last = message["id"]
+                yield message
+                closed = message["event"] in TERMINAL_EVENTS
+        finally:
+            with self._lock:
+                if subscriber in channel.subscribers:
+                    channel.subscribers.remove(subscriber)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        metrics.stage() that also announces the stage's start and finish to
+        subscribers. Stages don't start once the job is cancelled or expired.
+        """
+        check_cancelled()
+        self.publish("stage", stage=stage, state="started")
+        start = time.perf_counter()
+        try:
+            with metrics.stage(stage):
+                yield
+        except BaseException:
+            self.publish("stage", stage=stage, state="failed", duration_ms=round((time.perf_counter() - start) * 1000, 1))
+            raise
+        self.publish("stage", stage=stage, state="finished", duration_ms=round((time.perf_counter() - start) * 1000, 1))
+
+
+def _deliver(subscribers: List[tuple], message: Dict[str, Any]):
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+        except RuntimeError:
+            # The subscriber's loop has shut down
+            pass
+
+
+job_events = JobEvents()
@@ -0,0 +1,196 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Defaults per dependency: (initial, min, max) concurrent calls
+_DEFAULT_LIMITS = {
+    "notion": (3, 1, 20),
+    "ollama": (1, 1, 8)
+}
+
+
+class _Slot:
+    """One admitted call. Mark it overloaded on 429s, 5xx or timeouts; set latency to override the measured duration."""
+
+    __slots__ = ("operation", "started", "latency", "overloaded")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.latency: Optional[float] = None
+        self.overloaded = False
+
+    def fail(self):
+        self.overloaded = True
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one dependency. Every call that completes
+    while the limit was in use and within `tolerance` x its operation's
+    baseline latency adds 1/limit (about +1 per round trip of calls); a 429,
+    5xx, timeout or latency spike multiplies the limit by `backoff`, at most
+    once per round trip so one burst of failures counts once.
+    """
+
+    def __init__(self, name: str, initial: Optional[float] = None, min_limit: Optional[float] = None, max_limit: Optional[float] = None,
+                 backoff: Optional[float] = None, tolerance: Optional[float] = None):
+        default_initial, default_min, default_max = _DEFAULT_LIMITS.get(name, (4, 1, 32))
+        prefix = name.upper()
+        self.name = name
+        self.min_limit = min_limit or float(os.getenv(f"{prefix}_CONCURRENCY_MIN", str(default_min)))
+        self.max_limit = max_limit or float(os.getenv(f"{prefix}_CONCURRENCY_MAX", str(default_max)))
+        self.limit = initial or float(os.getenv(f"{prefix}_CONCURRENCY_INITIAL", str(default_initial)))
+        self.backoff = backoff or float(os.getenv("ADAPTIVE_LIMIT_BACKOFF", "0.5"))
+        self.tolerance = tolerance or float(os.getenv("ADAPTIVE_LIMIT_LATENCY_TOLERANCE", "2.0"))
+        # Per operation, a slowly rising minimum of observed latencies: the no-queueing round trip
+        self.baselines: Dict[str, float] = {}
+        self.in_flight = 0
+        self._decreased_at = 0.0
+        self._waiters: deque = deque()
+        # Waiters given a place (counted in in_flight) that haven't woken up yet
+        self._handed_over: set = set()
+        self._lock = threading.Lock()
+        self._export()
+
+    def slot(self, operation: str) -> "_SlotContext":
+        """async with limiter.slot("pages.create") as slot: ... - waits while `limit` calls are in flight"""
+        return _SlotContext(self, operation)
+
+    async def acquire(self, operation: str) -> _Slot:
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._waiters:
+                self.in_flight += 1
+                self._export()
+                return _Slot(operation)
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            # The releasing call hands its place straight to the waiter
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                admitted = waiter in self._handed_over
+                self._handed_over.discard(waiter)
+            if admitted:
+                # Admitted just as we were cancelled: give the place back
+                self._release_place()
+            raise
+        with self._lock:
+            self._handed_over.discard(waiter)
+        return _Slot(operation)
+
+    def release(self, slot: _Slot, error: Optional[BaseException] = None):
+        """
+        Record the call's outcome and free its place. An exception that wasn't
+        marked as overload (e.g. a 404 or a cancellation) leaves the limit alone,
+        as does any call made while metrics are suppressed.
+        """
+        if not metrics.recording:
+            # Warm-up calls are cold by design: don't let them set baselines or move the limit
+            self._release_place()
+            return
+        latency = slot.latency if slot.latency is not None else time.perf_counter() - slot.started
+        with self._lock:
+            saturated = self.in_flight >= int(self.limit)
+            if slot.overloaded:
+                self._decrease("error", latency)
+            elif error is None:
+                baseline = self.baselines.get(slot.operation)
+                spike = baseline is not None and latency > baseline * self.tolerance
+                self.baselines[slot.operation] = latency if baseline is None else min(baseline * 1.01, latency)
+                if spike:
+                    self._decrease("latency", latency)
+                elif saturated:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_place()
+
+    def _decrease(self, reason: str, latency: float):
+        now = time.perf_counter()
+        if now - self._decreased_at < latency:
+            # Calls started before the last cut are still reporting back
+            return
+        self._decreased_at = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        metrics.adaptive_limit_decreases.inc(dependency=self.name, reason=reason)
+        logger.debug(f"{self.name} concurrency limit cut to {self.limit:.2f} ({reason})")
+
+    def _release_place(self):
+        with self._lock:
+            # Hand places to waiters while there is room under the (possibly lowered) limit
+            self.in_flight -= 1
+            while self._waiters and self.in_flight < int(self.limit):
+                waiter = self._waiters.popleft()
+                if waiter.done():
+                    # Cancelled while queued; it never held a place
+                    continue
+                self.in_flight += 1
+                self._handed_over.add(waiter)
+                waiter.get_loop().call_soon_threadsafe(_admit, waiter)
+            self._export()
+
+    def _export(self):
+        metrics.adaptive_limit.set(round(self.limit, 2), dependency=self.name)
+        metrics.adaptive_in_flight.set(self.in_flight, dependency=self.name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "baseline_ms": {operation: round(baseline * 1000, 1) for operation, baseline in self.baselines.items()}
+            }
+
+
+def _admit(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class _SlotContext:
+    def __init__(self, limiter: AdaptiveLimiter, operation: str):
+        self.limiter = limiter
+        self.operation = operation
+        self.slot: Optional[_Slot] = None
+
+    async def __aenter__(self) -> _Slot:
+        self.slot = await self.limiter.acquire(self.operation)
+        return self.slot
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter.release(self.slot, exc)
+        return False
+
+
+class LimiterRegistry:
+    """One limiter per dependency, shared by every service that calls it"""
+
+    def __init__(self):
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> AdaptiveLimiter:
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                limiter = self._limiters[name] = AdaptiveLimiter(name)
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+
+limiters = LimiterRegistry()
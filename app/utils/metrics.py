@@ -0,0 +1,389 @@
+import os
+import time
+import bisect
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Tuple, Optional, Iterable
+
+from .tracing import tracer
+
+# Default histogram buckets (seconds) - covers sub-millisecond renders up to slow AI calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# False inside MetricsRegistry.suppressed(); copied into tasks and to_thread calls started there
+_recording: ContextVar[bool] = ContextVar("metrics_recording", default=True)
+
+
+def _metrics_enabled() -> bool:
+    return os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def expose(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not _recording.get():
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], list] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        if not _recording.get():
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def _samples(self) -> list:
+        lines = []
+        with self._lock:
+            snapshot = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all application metrics and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self.enabled = _metrics_enabled()
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+        self.service_call_duration = self.histogram(
+            "jobbuilder_service_call_duration_seconds",
+            "Duration of service method calls",
+            ("service", "method"),
+        )
+        self.service_call_errors = self.counter(
+            "jobbuilder_service_call_errors_total",
+            "Service method calls that raised an exception",
+            ("service", "method"),
+        )
+        self.stage_duration = self.histogram(
+            "jobbuilder_stage_duration_seconds",
+            "Duration of job pipeline stages",
+            ("stage",),
+        )
+        self.dependency_request_duration = self.histogram(
+            "jobbuilder_dependency_request_duration_seconds",
+            "Duration of outbound requests to Notion and Ollama",
+            ("dependency", "operation"),
+        )
+        self.dependency_errors = self.counter(
+            "jobbuilder_dependency_errors_total",
+            "Failed outbound requests to Notion and Ollama",
+            ("dependency", "operation"),
+        )
+        self.jobs_in_progress = self.gauge(
+            "jobbuilder_jobs_in_progress",
+            "Job applications accepted but not yet finished (queue depth)",
+        )
+        self.jobs_total = self.counter(
+            "jobbuilder_jobs_total",
+            "Finished job applications by outcome",
+            ("outcome",),
+        )
+        self.cache_requests = self.counter(
+            "jobbuilder_cache_requests_total",
+            "Cache lookups by cache name and result (hit/miss)",
+            ("cache", "result"),
+        )
+        self.circuit_breaker_state = self.gauge(
+            "jobbuilder_circuit_breaker_state",
+            "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+            ("dependency",),
+        )
+        self.circuit_breaker_transitions = self.counter(
+            "jobbuilder_circuit_breaker_transitions_total",
+            "Circuit breaker state changes by dependency and new state",
+            ("dependency", "state"),
+        )
+        self.adaptive_limit = self.gauge(
+            "jobbuilder_adaptive_concurrency_limit",
+            "Current adaptive (AIMD) concurrency limit per dependency",
+            ("dependency",),
+        )
+        self.adaptive_in_flight = self.gauge(
+            "jobbuilder_adaptive_concurrency_in_flight",
+            "Calls in flight under the adaptive limit per dependency",
+            ("dependency",),
+        )
+        self.adaptive_limit_decreases = self.counter(
+            "jobbuilder_adaptive_concurrency_decreases_total",
+            "Multiplicative decreases of the adaptive limit by dependency and reason (error/latency)",
+            ("dependency", "reason"),
+        )
+        self.notion_writes_queued = self.gauge(
+            "jobbuilder_notion_writes_queued",
+            "Notion writes waiting in the outbox for the breaker to close",
+        )
+        self.notion_rich_text_bytes_saved = self.counter(
+            "jobbuilder_notion_rich_text_bytes_saved_total",
+            "Request bytes saved by compacting Notion rich_text arrays",
+        )
+        self.notion_sync_blocks = self.counter(
+            "jobbuilder_notion_sync_blocks_total",
+            "Blocks handled when syncing child pages, by action (unchanged/updated/appended/deleted)",
+            ("action",),
+        )
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    @property
+    def recording(self) -> bool:
+        return _recording.get()
+
+    @contextmanager
+    def suppressed(self):
+        """
+        Leave counters and histograms untouched for calls made inside the
+        block (e.g. warm-up traffic). Gauges still follow the current state.
+        """
+        token = _recording.set(False)
+        try:
+            yield
+        finally:
+            _recording.reset(token)
+
+    def record_cache(self, cache: str, hit: bool):
+        """Record a cache lookup so hit rates can be derived"""
+        if self.enabled:
+            self.cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time a pipeline stage and record it as a span of the current job trace"""
+        with tracer.span(f"stage.{stage}"):
+            if not self.enabled:
+                yield
+                return
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.stage_duration.observe(time.perf_counter() - start, stage=stage)
+
+    @contextmanager
+    def dependency_request(self, dependency: str, operation: str):
+        """Time an outbound request and count failures"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.dependency_errors.inc(dependency=dependency, operation=operation)
+            raise
+        finally:
+            self.dependency_request_duration.observe(time.perf_counter() - start, dependency=dependency, operation=operation)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def instrument(service: str, include: Optional[Iterable[str]] = None):
+    """
+    Class decorator that times every public method of a service and records
+    a span for it when a job trace is active.
+    Private helpers can be opted in through ``include``.
+    """
+    extra = set(include or ())
+
+    def decorator(cls):
+        if not metrics.enabled and not tracer.enabled:
+            return cls
+
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_") and name not in extra:
+                continue
+            # Generators are timed by the code that drains them
+            if not inspect.isfunction(member) or inspect.isgeneratorfunction(member) or inspect.isasyncgenfunction(member):
+                continue
+            setattr(cls, name, _wrap(service, name, member))
+        return cls
+
+    return decorator
+
+
+def _wrap(service: str, method: str, func):
+    span_name = f"{service}.{method}"
+    record = metrics.enabled
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            except BaseException:
+                if record:
+                    metrics.service_call_errors.inc(service=service, method=method)
+                raise
+            finally:
+                if record:
+                    metrics.service_call_duration.observe(time.perf_counter() - start, service=service, method=method)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        except BaseException:
+            if record:
+                metrics.service_call_errors.inc(service=service, method=method)
+            raise
+        finally:
+            if record:
+                metrics.service_call_duration.observe(time.perf_counter() - start, service=service, method=method)
+
+    return wrapper
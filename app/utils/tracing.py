@@ -0,0 +1,228 @@
+import os
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List
+
+
+def _tracing_enabled() -> bool:
+    return os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+
+class Span:
+    """A single timed operation within a job trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "events", "status", "error")
+
+    def __init__(self, trace_id: str, name: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = "unset"
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+        elif self.status == "unset":
+            self.status = "ok"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class Trace:
+    """All spans recorded for one job"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def tree(self) -> Dict[str, Any]:
+        """Return spans nested under their parents"""
+        with self._lock:
+            spans = list(self.spans)
+
+        nodes = {}
+        for span in spans:
+            nodes[span.span_id] = {
+                "name": span.name,
+                "span_id": span.span_id,
+                "start": span.start_ns / 1_000_000_000,
+                "duration_ms": span.duration_ms,
+                "status": span.status,
+                "error": span.error,
+                "attributes": span.attributes,
+                "events": span.events,
+                "children": [],
+            }
+
+        roots = []
+        for span in spans:
+            node = nodes[span.span_id]
+            parent = nodes.get(span.parent_id) if span.parent_id else None
+            if parent is not None:
+                parent["children"].append(node)
+            else:
+                roots.append(node)
+
+        return {"job_id": self.job_id, "trace_id": self.trace_id, "spans": roots}
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Export spans as OTLP/JSON (ExportTraceServiceRequest)"""
+        with self._lock:
+            spans = list(self.spans)
+
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": _otlp_attributes(span.attributes),
+                "events": [
+                    {
+                        "timeUnixNano": str(event["time_ns"]),
+                        "name": event["name"],
+                        "attributes": _otlp_attributes(event["attributes"]),
+                    }
+                    for event in span.events
+                ],
+                # OTLP status codes: 0 unset, 1 ok, 2 error
+                "status": {"code": {"unset": 0, "ok": 1, "error": 2}[span.status]},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            if span.error:
+                otlp_span["status"]["message"] = span.error
+            otlp_spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": "jobbuilder", "job.id": self.job_id})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "jobbuilder"},
+                            "spans": otlp_spans,
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> list:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        result.append({"key": key, "value": encoded})
+    return result
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("jobbuilder_current_span", default=None)
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("jobbuilder_current_trace", default=None)
+
+
+class Tracer:
+    """Records span trees per job into a bounded in-memory ring buffer"""
+
+    def __init__(self, max_traces: Optional[int] = None):
+        self.enabled = _tracing_enabled()
+        self.max_traces = max_traces or int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_trace(self, job_id: str, name: str = "process_job_application", **attributes):
+        """Start a new trace for a job and make its root span current"""
+        if not self.enabled:
+            yield None
+            return
+
+        trace = Trace(job_id)
+        with self._lock:
+            self._traces[job_id] = trace
+            self._traces.move_to_end(job_id)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+        trace_token = _current_trace.set(trace)
+        try:
+            with self.span(name, job_id=job_id, **attributes) as root:
+                yield root
+        finally:
+            _current_trace.reset(trace_token)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Record a child span of the current span; no-op outside a trace"""
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(trace.trace_id, name, parent.span_id if parent else None, attributes)
+        trace.add(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        else:
+            span.finish()
+        finally:
+            _current_span.reset(token)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def get_trace(self, job_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(job_id)
+
+    def job_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._traces.keys())
+
+
+tracer = Tracer()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the webhook pipeline against local stand-ins for
+Notion and Ollama (see fakes.py), so results are reproducible and nothing
+touches the real API.
+
+The app runs under uvicorn in a subprocess with NOTION_BASE_URL and
+OLLAMA_BASE_URL pointed at the fakes. Webhooks for seeded job pages are sent
+open-loop at --rps for --duration seconds; each job is then followed through
+/jobs/{id}/trace until it finishes. The report covers webhook latency, job
+throughput and latency, per-stage span timings and the request counts seen by
+the fakes. --reruns re-delivers the same pages afterwards to measure the
+Notion writes of a rerun. --output writes the report as JSON for regression
+tracking.
+
+Usage: python benchmarks/bench_e2e.py [--rps 2] [--duration 20] [--notion-latency-ms 150] [--notion-429-rate 0.05] [--ollama-tps 40] [--reruns 1] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from collections import Counter
+from typing import Dict, Any, List
+
+import httpx
+
+from fakes import FakeNotion, FakeOllama
+from load_test import start_server, stop_server
+
+DESCRIPTION = (
+    "We are looking for a Senior Python Developer to build data pipelines and APIs. "
+    "Experience with FastAPI, AWS, Docker, PostgreSQL and machine learning is required. "
+    "You will work with product and design to ship features used by millions of customers."
+)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.mean(ordered), 2),
+        "p50": at(0.50),
+        "p90": at(0.90),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": round(ordered[-1], 2)
+    }
+
+
+def job_properties(index: int) -> Dict[str, Any]:
+    """Properties shaped like the jobs database the app is deployed against"""
+    return {
+        "Job Title": {"id": "title", "type": "title", "title": [{"type": "text", "text": {"content": f"Senior Python Developer {index}"}, "plain_text": f"Senior Python Developer {index}"}]},
+        "Company": {"id": "company", "type": "rich_text", "rich_text": [{"type": "text", "text": {"content": f"Bench Corp {index}"}, "plain_text": f"Bench Corp {index}"}]},
+        "Job Description": {"id": "description", "type": "rich_text", "rich_text": [{"type": "text", "text": {"content": DESCRIPTION}, "plain_text": DESCRIPTION}]},
+        "Status": {"id": "status", "type": "status", "status": {"name": "Not started"}},
+        "Application Generated": {"id": "generated", "type": "checkbox", "checkbox": False},
+        "Generated Date": {"id": "date", "type": "date", "date": None},
+        "Generated Files": {"id": "files", "type": "rich_text", "rich_text": []}
+    }
+
+
+def collect_spans(node: Dict[str, Any], spans: Dict[str, List[float]]):
+    if node.get("duration_ms") is not None:
+        spans.setdefault(node["name"], []).append(node["duration_ms"])
+    for child in node.get("children", []):
+        collect_spans(child, spans)
+
+
+async def send_webhooks(base_url: str, pages: List[Dict[str, Any]], rps: float) -> List[Dict[str, Any]]:
+    """Open-loop: request i is sent at i / rps regardless of how earlier ones are doing"""
+    sent = []
+
+    async def send(client: httpx.AsyncClient, page: Dict[str, Any], at: float):
+        await asyncio.sleep(max(0.0, at - time.perf_counter()))
+        record = {"page_id": page["id"], "sent_at": time.time()}
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{base_url}/webhook/notion", json={"data": page})
+            record["status_code"] = response.status_code
+            if response.status_code == 200:
+                record.update(response.json())
+        except httpx.HTTPError as e:
+            record["error"] = str(e)
+        record["latency_ms"] = (time.perf_counter() - start) * 1000
+        sent.append(record)
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=30) as client:
+        await asyncio.gather(*(send(client, page, start + index / rps) for index, page in enumerate(pages)))
+    return sent
+
+
+async def follow_jobs(base_url: str, sent: List[Dict[str, Any]], timeout: float) -> Dict[str, Dict[str, Any]]:
+    """Poll each accepted job's trace until its root span has finished"""
+    pending = {r["job_id"]: r for r in sent if r.get("status") == "accepted"}
+    finished = {}
+    deadline = time.time() + timeout
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        while pending and time.time() < deadline:
+            for job_id in list(pending):
+                response = await client.get(f"{base_url}/jobs/{job_id}/trace")
+                if response.status_code != 200:
+                    continue
+                roots = response.json().get("spans", [])
+                if roots and roots[0].get("duration_ms") is not None:
+                    finished[job_id] = {"request": pending.pop(job_id), "root": roots[0]}
+            await asyncio.sleep(0.2)
+
+    for job_id, request in pending.items():
+        finished[job_id] = {"request": request, "root": None}
+    return finished
+
+
+def summarize(sent: List[Dict[str, Any]], jobs: Dict[str, Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    outcomes: Dict[str, int] = {}
+    latencies, queue_waits, spans = [], [], {}
+    first_sent = min((r["sent_at"] for r in sent), default=0)
+    last_done = first_sent
+
+    for job in jobs.values():
+        root = job["root"]
+        if root is None:
+            outcomes["timed_out"] = outcomes.get("timed_out", 0) + 1
+            continue
+        outcome = root["attributes"].get("outcome", "unknown")
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        done_at = root["start"] + root["duration_ms"] / 1000
+        last_done = max(last_done, done_at)
+        latencies.append((done_at - job["request"]["sent_at"]) * 1000)
+        queue_waits.append(max(0.0, root["start"] - job["request"]["sent_at"]) * 1000)
+        collect_spans(root, spans)
+
+    completed = outcomes.get("completed", 0)
+    elapsed = last_done - first_sent
+    job_time = sum(spans.get("process_job_application", [])) or 1
+    return {
+        "webhooks": {
+            "sent": len(sent),
+            "achieved_rps": round(len(sent) / duration, 2) if duration else 0,
+            "statuses": dict(Counter(str(r.get("status", r.get("status_code", "error"))) for r in sent)),
+            "latency_ms": percentiles([r["latency_ms"] for r in sent])
+        },
+        "jobs": {
+            "outcomes": outcomes,
+            "throughput_per_s": round(completed / elapsed, 3) if elapsed > 0 else 0,
+            "latency_ms": percentiles(latencies),
+            "queue_wait_ms": percentiles(queue_waits)
+        },
+        "stages": {
+            name: {**percentiles(values), "share": round(sum(values) / job_time, 3)}
+            for name, values in sorted(spans.items())
+            if name != "process_job_application"
+        }
+    }
+
+
+def notion_pass(index: int, notion: FakeNotion, before: Dict[str, int], jobs: int) -> Dict[str, Any]:
+    """Notion requests made during one pass over the pages"""
+    delta = {k: v - before.get(k, 0) for k, v in notion.requests.items() if v > before.get(k, 0)}
+    writes = sum(v for k, v in delta.items() if not k.startswith("GET"))
+    return {
+        "pass": index,
+        "jobs": jobs,
+        "writes": writes,
+        "reads": sum(delta.values()) - writes,
+        "writes_per_job": round(writes / jobs, 2) if jobs else 0,
+        "requests": delta
+    }
+
+
+def report(result: Dict[str, Any]):
+    config, webhooks, jobs = result["config"], result["webhooks"], result["jobs"]
+    print(f"offered {config['rps']} rps for {config['duration']}s: sent {webhooks['sent']} webhooks, statuses {webhooks['statuses']}")
+    print(f"webhook latency  p50 {webhooks['latency_ms'].get('p50', 0):8.1f} ms   p95 {webhooks['latency_ms'].get('p95', 0):8.1f} ms")
+    print(f"job latency      p50 {jobs['latency_ms'].get('p50', 0):8.1f} ms   p95 {jobs['latency_ms'].get('p95', 0):8.1f} ms   "
+          f"throughput {jobs['throughput_per_s']:.2f} jobs/s   outcomes {jobs['outcomes']}")
+    print(f"{'span':<36}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'share':>8}")
+    for name, stats in result["stages"].items():
+        print(f"{name:<36}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['share']:>8.0%}")
+    notion = result["notion"]
+    print(f"notion: {notion['requests_total']} requests, {notion['throttled_total']} throttled (429)")
+    for notion_run in result["passes"]:
+        label = "first run" if notion_run["pass"] == 0 else f"rerun {notion_run['pass']}"
+        print(f"  {label:<10} {notion_run['writes']:>5} writes ({notion_run['writes_per_job']:.1f}/job), {notion_run['reads']} reads")
+    if result.get("ollama"):
+        ollama = result["ollama"]
+        print(f"ollama: {ollama['generations']} generations, {ollama['tokens_generated']} tokens, queue wait max {ollama['queue_wait_max_ms']:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end webhook benchmark against fake Notion and Ollama")
+    parser.add_argument("--rps", type=float, default=2.0, help="Webhooks per second to offer")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to send webhooks for")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--output-format", default="markdown", choices=("markdown", "pdf"), help="OUTPUT_FORMAT for the app")
+    parser.add_argument("--notion-latency-ms", type=float, default=150.0)
+    parser.add_argument("--notion-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--notion-429-rate", type=float, default=0.0, help="Probability of a 429 on any Notion request")
+    parser.add_argument("--notion-rate-limit", type=float, default=0.0, help="Requests/sec before Notion returns 429 (0 = unlimited)")
+    parser.add_argument("--notion-retry-after", type=float, default=0.1, help="Minimum Retry-After seconds on a 429")
+    parser.add_argument("--ollama-tps", type=float, default=0.0, help="Ollama tokens/sec; 0 keeps template cover letters")
+    parser.add_argument("--ollama-tokens", type=int, default=300, help="Tokens per generation")
+    parser.add_argument("--ollama-parallel", type=int, default=1, help="Concurrent Ollama generations")
+    parser.add_argument("--reruns", type=int, default=0, help="Re-deliver every page this many times after the first pass")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for jobs after sending")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report")
+    args = parser.parse_args()
+
+    notion = FakeNotion(
+        latency_ms=args.notion_latency_ms,
+        jitter_ms=args.notion_jitter_ms,
+        error_rate=args.notion_429_rate,
+        rate_limit=args.notion_rate_limit,
+        retry_after=args.notion_retry_after,
+        seed=args.seed
+    ).start()
+    ollama = FakeOllama(tokens_per_second=args.ollama_tps, tokens=args.ollama_tokens, parallel=args.ollama_parallel).start() if args.ollama_tps > 0 else None
+
+    database_id = notion.add_database()
+    count = max(1, int(args.rps * args.duration))
+    pages = [notion.add_page(job_properties(i), parent={"type": "database_id", "database_id": database_id}) for i in range(count)]
+
+    env = {
+        "NOTION_API_KEY": "bench",
+        "NOTION_BASE_URL": notion.base_url,
+        "NOTION_DATABASE_ID": database_id,
+        "OUTPUT_FORMAT": args.output_format,
+        "AI_USE_OLLAMA": "true" if ollama else "false",
+        "OLLAMA_BASE_URL": ollama.base_url if ollama else "http://127.0.0.1:9",
+        "HEALTH_MAX_BACKLOG": str(count * 2),
+        "TRACE_BUFFER_SIZE": str(count * 2)
+    }
+
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            process, base_url = start_server(args.workers, scratch, env)
+            before = dict(notion.requests)
+            try:
+                started = time.perf_counter()
+                sent = asyncio.run(send_webhooks(base_url, pages, args.rps))
+                send_duration = time.perf_counter() - started
+                jobs = asyncio.run(follow_jobs(base_url, sent, args.timeout))
+                passes = [notion_pass(0, notion, before, len(jobs))]
+                
+                # Re-deliver the same pages as edited ones: child pages now exist and are patched
+                for rerun in range(1, args.reruns + 1):
+                    before = dict(notion.requests)
+                    edited = [{**page, "last_edited_time": f"{page['last_edited_time']}#{rerun}"} for page in pages]
+                    rerun_sent = asyncio.run(send_webhooks(base_url, edited, args.rps))
+                    rerun_jobs = asyncio.run(follow_jobs(base_url, rerun_sent, args.timeout))
+                    passes.append(notion_pass(rerun, notion, before, len(rerun_jobs)))
+            finally:
+                stop_server(process)
+    finally:
+        notion.stop()
+        if ollama:
+            ollama.stop()
+
+    result = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "json")},
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        **summarize(sent, jobs, send_duration),
+        "notion": notion.stats(),
+        "passes": passes,
+        "ollama": ollama.stats() if ollama else None
+    }
+
+    report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {args.output}")
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cold-start import cost of app.main, measured with `python -X importtime` in
+fresh interpreters. With --compare-ref the same measurement runs against
+another git revision (exported to a temp dir) to report before and after.
+
+Usage: python benchmarks/bench_import_time.py [--runs 5] [--compare-ref HEAD~1] [--top 10]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_PACKAGES = ("reportlab", "weasyprint", "notion_client", "jinja2", "httpx", "requests")
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Map module -> (self_us, cumulative_us) from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(root: str, runs: int) -> dict:
+    totals, app_main, loaded = [], [], {}
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {
+            **os.environ,
+            "PYTHONPATH": root,
+            # Older revisions write default templates at import time - keep that out of the repo
+            "TEMPLATES_DIR": os.path.join(scratch, "templates"),
+            "OUTPUT_DIR": os.path.join(scratch, "output"),
+            "TEMPLATES_CACHE_DIR": os.path.join(scratch, "jinja-cache")
+        }
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", "import app.main"],
+                cwd=root, env=env, capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip().splitlines()[-1])
+            modules = parse_importtime(result.stderr)
+            totals.append(sum(self_us for self_us, _ in modules.values()) / 1000)
+            app_main.append(modules.get("app.main", (0, 0))[1] / 1000)
+            for name, (_, cumulative_us) in modules.items():
+                loaded.setdefault(name, []).append(cumulative_us / 1000)
+
+    top_level = {name: statistics.median(times) for name, times in loaded.items() if "." not in name}
+    return {
+        "runs": runs,
+        "total_ms": round(statistics.median(totals), 1),
+        "app_main_ms": round(statistics.median(app_main), 1),
+        "modules": len(loaded),
+        "heavy_loaded": [name for name in HEAVY_PACKAGES if name in loaded],
+        "top_packages": sorted(((name, round(ms, 1)) for name, ms in top_level.items()), key=lambda item: item[1], reverse=True)
+    }
+
+
+def export_ref(ref: str, target: str):
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", target], input=archive.stdout, check=True)
+
+
+def report(label: str, result: dict, top: int):
+    print(f"{label}: app.main {result['app_main_ms']:.1f} ms, all imports {result['total_ms']:.1f} ms, {result['modules']} modules")
+    print(f"  heavy packages loaded: {', '.join(result['heavy_loaded']) or 'none'}")
+    for name, ms in result["top_packages"][:top]:
+        print(f"  {name:<24} {ms:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--compare-ref", help="git revision to measure as the baseline")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest top-level packages to list")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    if args.compare_ref:
+        with tempfile.TemporaryDirectory() as baseline_root:
+            export_ref(args.compare_ref, baseline_root)
+            results["before"] = measure(baseline_root, args.runs)
+        report(f"before ({args.compare_ref})", results["before"], args.top)
+
+    results["after"] = measure(ROOT, args.runs)
+    report("after (working tree)" if args.compare_ref else "app.main", results["after"], args.top)
+
+    if args.compare_ref:
+        before, after = results["before"]["app_main_ms"], results["after"]["app_main_ms"]
+        print(f"import time saved: {before - after:.1f} ms ({(1 - after / before) * 100 if before else 0:.0f}%)")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Per-PDF latency benchmark for PDFService: cold (stylesheet rebuilt per
+render, the old behaviour) versus a warm stylesheet cache.
+
+Usage: python benchmarks/bench_pdf.py [--iterations 50]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.job import JobData
+from app.services import pdf_service as pdf_module
+from app.services.pdf_service import PDFService
+
+
+def load_resume() -> dict:
+    data_dir = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+    with open(os.path.join(data_dir, "base_resume.json")) as f:
+        return json.load(f)
+
+
+def run(iterations: int, cached: bool, output_dir: str) -> list:
+    resume = load_resume()
+    job = JobData(
+        job_title="Senior Python Developer",
+        company_name="Benchmark Corp",
+        job_description="Python, FastAPI, AWS, Docker and machine learning experience required.",
+        notion_page_id="benchmark"
+    )
+    path = os.path.join(output_dir, "resume.pdf")
+    timings = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        if not cached:
+            # Reproduce the pre-cache behaviour: styles rebuilt per render
+            pdf_module._get_stylesheet.cache_clear()
+        service = PDFService()
+        service.create_resume_pdf(resume, job, path)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def summarize(label: str, timings: list) -> dict:
+    ordered = sorted(timings)
+    result = {
+        "label": label,
+        "iterations": len(timings),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3)
+    }
+    print(f"{label:<8} mean {result['mean_ms']:8.3f} ms   p50 {result['p50_ms']:8.3f} ms   p95 {result['p95_ms']:8.3f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDFService per-PDF latency")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Warm the interpreter (imports, font files) before timing either mode
+        run(3, cached=True, output_dir=output_dir)
+        before = summarize("before", run(args.iterations, cached=False, output_dir=output_dir))
+        after = summarize("after", run(args.iterations, cached=True, output_dir=output_dir))
+
+    speedup = before["mean_ms"] / after["mean_ms"] if after["mean_ms"] else 0
+    print(f"speedup  {speedup:.2f}x")
+    if args.json:
+        print(json.dumps({"before": before, "after": after, "speedup": round(speedup, 3)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the per-job CPU work of each service: payload extraction,
+resume customization, Markdown and template rendering, Notion block
+conversion and PDF generation.
+
+Fixtures are scaled from data/base_resume.json and a realistic webhook
+payload:
+  real    the resume as-is, ~600-char job description
+  large   100 bullets, 2k-char description
+  stress  500 bullets, 10k-char description
+
+Each benchmark is timed for --min-time seconds split over --repeat runs,
+with GC paused; ops/sec comes from the fastest run's median round. A few
+extra iterations under tracemalloc then record peak memory and the memory
+still held per call. Results can be saved as a baseline and compared against later.
+
+Usage:
+  python benchmarks/bench_services.py [--sizes real,large,stress] [--only notion] [--min-time 1] [--repeat 5]
+  python benchmarks/bench_services.py --save benchmarks/baselines/services.json
+  python benchmarks/bench_services.py --compare benchmarks/baselines/services.json [--threshold 0.1] [--fail-on-regression]
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import atexit
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCRATCH = tempfile.mkdtemp(prefix="jobbuilder-bench-")
+atexit.register(shutil.rmtree, SCRATCH, ignore_errors=True)
+os.environ.setdefault("DATA_DIR", os.path.join(ROOT, "data"))
+os.environ.setdefault("TEMPLATES_DIR", os.path.join(SCRATCH, "templates"))
+os.environ.setdefault("TEMPLATES_CACHE_DIR", os.path.join(SCRATCH, "jinja-cache"))
+os.environ.setdefault("OUTPUT_DIR", os.path.join(SCRATCH, "output"))
+
+from app.main import extract_job_data_from_payload
+from app.models.job import JobData
+from app.services.ai_service import AIService
+from app.services.markdown_service import MarkdownService
+from app.services.notion_service import NotionService
+from app.services.template_service import TemplateService
+from app.services.pdf_service import PDFService
+
+SIZES = {
+    "real": {"bullets": None, "description_chars": 600},
+    "large": {"bullets": 100, "description_chars": 2000},
+    "stress": {"bullets": 500, "description_chars": 10000}
+}
+
+SENTENCES = (
+    "You will design and operate Python services on AWS with FastAPI, Docker and PostgreSQL.",
+    "Experience with machine learning pipelines, React front ends and CI/CD is a plus.",
+    "We value ownership, clear written communication and a focus on customer impact.",
+    "The team ships weekly and owns reliability, observability and on-call for its systems.",
+    "Familiarity with Kubernetes, Terraform, Redis and message queues such as Kafka helps.",
+    "You will mentor engineers, review designs and work closely with product and design."
+)
+
+
+def load_resume() -> Dict[str, Any]:
+    with open(os.path.join(os.environ["DATA_DIR"], "base_resume.json")) as f:
+        return json.load(f)
+
+
+def scale_resume(resume: Dict[str, Any], bullets: int) -> Dict[str, Any]:
+    """Grow the resume to `bullets` achievements by repeating its experience entries"""
+    if not bullets:
+        return resume
+    experience = resume.get("experience", [])
+    achievements = [a for entry in experience for a in entry.get("achievements", [])] or ["Delivered results"]
+    per_entry = 10
+    scaled = []
+    for index in range((bullets + per_entry - 1) // per_entry):
+        entry = dict(experience[index % len(experience)])
+        count = min(per_entry, bullets - index * per_entry)
+        entry["achievements"] = [f"{achievements[(index * per_entry + i) % len(achievements)]} ({index}.{i})" for i in range(count)]
+        scaled.append(entry)
+    projects = resume.get("projects", [])
+    return {
+        **resume,
+        "experience": scaled,
+        "projects": [dict(projects[i % len(projects)], name=f"{projects[i % len(projects)]['name']} {i}") for i in range(max(len(projects), bullets // 20))] if projects else [],
+        "skills": resume.get("skills", []) + [f"Skill {i}" for i in range(bullets // 10)]
+    }
+
+
+def description(chars: int) -> str:
+    text, index = [], 0
+    while sum(len(s) + 1 for s in text) < chars:
+        text.append(SENTENCES[index % len(SENTENCES)])
+        index += 1
+    return " ".join(text)[:chars]
+
+
+def webhook_payload(job_description: str) -> Dict[str, Any]:
+    """Notion automation payload; long rich_text arrives split into 2000-char runs"""
+    def rich_text(content: str) -> List[Dict[str, Any]]:
+        return [{"type": "text", "text": {"content": content[i:i + 2000]}, "plain_text": content[i:i + 2000]} for i in range(0, len(content), 2000)]
+
+    return {"data": {
+        "id": "bench-page",
+        "last_edited_time": "2024-01-01T00:00:00.000Z",
+        "properties": {
+            "Job Title": {"type": "title", "title": rich_text("Senior Python Developer")},
+            "Company": {"type": "rich_text", "rich_text": rich_text("Bench Corp")},
+            "Job Description": {"type": "rich_text", "rich_text": rich_text(job_description)}
+        }
+    }}
+
+
+def build_cases(size: str) -> List[Tuple[str, Callable[[], Any]]]:
+    spec = SIZES[size]
+    loop = asyncio.new_event_loop()
+    ai = AIService()
+    ai.base_resume = scale_resume(load_resume(), spec["bullets"])
+    markdown, notion, templates, pdf = MarkdownService(), NotionService(), TemplateService(), PDFService(backend="reportlab")
+
+    payload = webhook_payload(description(spec["description_chars"]))
+    job_data = JobData(job_title="Senior Python Developer", company_name="Bench Corp",
+                       job_description=description(spec["description_chars"]), notion_page_id="bench-page")
+    resume = loop.run_until_complete(ai.customize_resume(job_data))
+    cover_letter = loop.run_until_complete(ai.generate_cover_letter(job_data))
+    resume_markdown = markdown.create_resume_markdown(resume, job_data)
+    template_data = {**resume, "job_data": job_data, "date": datetime.now().strftime("%B %d, %Y"),
+                     "relevant_skills": resume["skills"][:3], "matching_skills": resume["skills"][:5]}
+    longest_line = max(resume_markdown.splitlines(), key=len)
+    pdf_path = os.path.join(SCRATCH, f"bench_{size}.pdf")
+
+    return [
+        ("main.extract_job_data_from_payload", lambda: extract_job_data_from_payload(payload)),
+        ("ai.customize_resume", lambda: loop.run_until_complete(ai.customize_resume(job_data))),
+        ("ai._extract_matching_skills", lambda: ai._extract_matching_skills(job_data)),
+        ("markdown.create_cover_letter_markdown", lambda: markdown.create_cover_letter_markdown(cover_letter, job_data)),
+        ("markdown.create_resume_markdown", lambda: markdown.create_resume_markdown(resume, job_data)),
+        ("notion._markdown_to_notion_blocks", lambda: notion._markdown_to_notion_blocks(resume_markdown)),
+        ("notion._parse_rich_text", lambda: notion._parse_rich_text(longest_line)),
+        ("templates.render_cover_letter", lambda: templates.render_cover_letter(template_data)),
+        ("templates.render_resume", lambda: templates.render_resume(template_data)),
+        ("pdf.create_cover_letter_pdf", lambda: pdf.create_cover_letter_pdf(cover_letter, job_data, pdf_path)),
+        ("pdf.create_resume_pdf", lambda: pdf.create_resume_pdf(resume, job_data, pdf_path))
+    ]
+
+
+def measure(func: Callable[[], Any], min_time: float, repeat: int, memory_rounds: int) -> Dict[str, float]:
+    func()  # warm caches and lazy imports
+
+    # Like timeit: collector pauses stay out of the timings, and the best of
+    # several repeats is the least disturbed by other load on the machine
+    timings, medians = [], []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            batch = []
+            deadline = time.perf_counter() + min_time / repeat
+            while time.perf_counter() < deadline or len(batch) < 5:
+                start = time.perf_counter()
+                func()
+                batch.append(time.perf_counter() - start)
+            medians.append(statistics.median(batch))
+            timings.extend(batch)
+    finally:
+        gc.enable()
+
+    # Memory is measured separately so tracemalloc's overhead stays out of the timings
+    peaks, retained, blocks = [], [], []
+    tracemalloc.start()
+    try:
+        for _ in range(memory_rounds):
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            result = func()
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            del result
+            stats = after.compare_to(before, "filename")
+            peaks.append(peak - base)
+            retained.append(sum(s.size_diff for s in stats))
+            blocks.append(sum(s.count_diff for s in stats))
+    finally:
+        tracemalloc.stop()
+
+    best = min(medians)
+    return {
+        "ops_per_sec": round(1 / best, 2),
+        "best_us": round(best * 1e6, 2),
+        "mean_us": round(statistics.mean(timings) * 1e6, 2),
+        "p50_us": round(statistics.median(timings) * 1e6, 2),
+        "stdev_us": round(statistics.pstdev(timings) * 1e6, 2),
+        "rounds": len(timings),
+        "peak_kib": round(statistics.median(peaks) / 1024, 2) if peaks else 0,
+        "retained_kib": round(statistics.median(retained) / 1024, 2) if retained else 0,
+        "retained_blocks": int(statistics.median(blocks)) if blocks else 0
+    }
+
+
+def calibrate(repeat: int) -> float:
+    """Ops/sec of a fixed pure-Python workload, to separate machine speed from code changes"""
+    data = [(i * 7919) % 1000 for i in range(1000)]
+
+    def reference():
+        return sum(sorted(data)) + len({str(x) for x in data})
+
+    return measure(reference, 0.5, repeat, 0)["ops_per_sec"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a before/after table; return the benchmarks that got slower than threshold"""
+    regressions = []
+    # Scale the baseline by how fast this machine runs the reference workload today
+    speed = current["calibration_ops"] / baseline["calibration_ops"] if baseline.get("calibration_ops") else 1.0
+    print(f"\ncomparison against baseline from {baseline.get('timestamp', '?')} (threshold {threshold:.0%})")
+    print(f"machine speed vs baseline: {speed:.2f}x (changes below are adjusted for it)")
+    print(f"{'benchmark':<48}{'base ops/s':>12}{'ops/s':>12}{'change':>9}{'peak KiB':>18}")
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            print(f"{key:<48}{'-':>12}{result['ops_per_sec']:>12.1f}{'new':>9}")
+            continue
+        change = result["ops_per_sec"] / (before["ops_per_sec"] * speed) - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  SLOWER"
+            regressions.append(key)
+        elif change > threshold:
+            flag = "  faster"
+        peak = f"{before['peak_kib']:.0f} -> {result['peak_kib']:.0f}"
+        print(f"{key:<48}{before['ops_per_sec']:>12.1f}{result['ops_per_sec']:>12.1f}{change:>+9.1%}{peak:>18}{flag}")
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"{len(missing)} baseline benchmarks not run this time")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service hot-path microbenchmarks")
+    parser.add_argument("--sizes", default="real,large,stress", help="Comma-separated fixture sizes")
+    parser.add_argument("--only", help="Run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to time each benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark; the best is reported")
+    parser.add_argument("--memory-rounds", type=int, default=3, help="Iterations traced for memory")
+    parser.add_argument("--save", help="Write results to this JSON file as a baseline")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative ops/sec drop reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any benchmark regressed")
+    args = parser.parse_args()
+
+    # Per-call INFO logging would dominate the smaller benchmarks
+    logging.basicConfig(level=logging.WARNING, force=True)
+
+    results = {}
+    calibration = calibrate(args.repeat)
+    print(f"reference workload: {calibration:.1f} ops/s")
+    print(f"{'benchmark':<48}{'ops/s':>12}{'best us':>12}{'peak KiB':>11}{'held KiB':>11}")
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        if size not in SIZES:
+            parser.error(f"unknown size '{size}' (choose from {', '.join(SIZES)})")
+        for name, func in build_cases(size):
+            if args.only and args.only not in name:
+                continue
+            key = f"{name}[{size}]"
+            result = measure(func, args.min_time, args.repeat, args.memory_rounds)
+            results[key] = result
+            print(f"{key:<48}{result['ops_per_sec']:>12.1f}{result['best_us']:>12.1f}{result['peak_kib']:>11.1f}{result['retained_kib']:>11.1f}")
+
+    current = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "calibration_ops": calibration,
+        "results": results
+    }
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"saved baseline to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
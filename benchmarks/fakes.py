@@ -0,0 +1,489 @@
+"""
+In-process stand-ins for the Notion API and an Ollama server, used by the
+end-to-end benchmark. Each runs a small FastAPI app on uvicorn in a
+background thread:
+
+- FakeNotion stores pages, databases and blocks in memory and serves the
+  endpoints NotionService uses, with configurable latency and 429 injection
+  (random, or a token bucket like Notion's per-integration limit).
+- FakeOllama answers /api/tags and /api/generate, producing tokens at a fixed
+  rate with a bounded number of parallel generations.
+"""
+
+import json
+import time
+import uuid
+import random
+import socket
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Limits the real API enforces
+NOTION_MAX_CHILDREN = 100
+NOTION_MAX_TEXT_LENGTH = 2000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _endpoint(request: Request) -> str:
+    """'PATCH /v1/blocks/{id}/children' style label for counting requests"""
+    parts = request.url.path.strip("/").split("/")
+    for index in range(1, len(parts)):
+        if parts[index - 1] in ("pages", "blocks", "databases"):
+            parts[index] = "{id}"
+    return f"{request.method} /{'/'.join(parts)}"
+
+
+def _error(status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse({"object": "error", "status": status, "code": code, "message": message}, status_code=status, headers=headers)
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn on a thread of the current process"""
+
+    def __init__(self, app, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self) -> "BackgroundServer":
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Server on port {self.port} did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class FakeNotion:
+    """
+    In-memory Notion API. latency_ms (+/- jitter_ms) is added to every
+    request; error_rate is the probability of a 429, and rate_limit (requests
+    per second, 0 = off) rejects bursts above the limit with Retry-After.
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 rate_limit: float = 0, burst: float = 10, retry_after: float = 0.1, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.bucket = _TokenBucket(rate_limit, burst) if rate_limit > 0 else None
+        self.random = random.Random(seed)
+
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.databases: Dict[str, Dict[str, Any]] = {}
+        self.blocks: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, list] = {}
+        self.requests = Counter()
+        self.throttled = Counter()
+        self.bytes_received = 0
+
+        self.app = self._build_app()
+        self.server: Optional[BackgroundServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return self.server.base_url
+
+    def start(self) -> "FakeNotion":
+        self.server = BackgroundServer(self.app).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
+
+    # Seeding
+
+    def add_database(self, properties: Optional[Dict[str, Any]] = None) -> str:
+        database_id = str(uuid.uuid4())
+        self.databases[database_id] = {
+            "object": "database",
+            "id": database_id,
+            "title": [{"type": "text", "text": {"content": "Jobs"}, "plain_text": "Jobs"}],
+            "properties": properties or {},
+            "created_time": _now(),
+            "last_edited_time": _now()
+        }
+        return database_id
+
+    def add_page(self, properties: Dict[str, Any], parent: Optional[Dict[str, Any]] = None, children: Optional[list] = None) -> Dict[str, Any]:
+        page_id = str(uuid.uuid4())
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": _now(),
+            "last_edited_time": _now(),
+            "parent": parent or {"type": "workspace", "workspace": True},
+            "archived": False,
+            "properties": properties,
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}"
+        }
+        self.pages[page_id] = page
+        self.children[page_id] = []
+        self._append_children(page_id, children or [])
+        if page["parent"].get("type") == "page_id" and page["parent"]["page_id"] in self.children:
+            # Sub-pages also show up as child_page blocks of their parent, with the page's ID
+            title = "".join(t.get("text", {}).get("content", "") for t in properties.get("title", {}).get("title", []))
+            parent_id = page["parent"]["page_id"]
+            self.blocks[page_id] = {
+                "object": "block",
+                "id": page_id,
+                "parent": {"type": "page_id", "page_id": parent_id},
+                "created_time": page["created_time"],
+                "last_edited_time": page["last_edited_time"],
+                "has_children": bool(children),
+                "archived": False,
+                "type": "child_page",
+                "child_page": {"title": title}
+            }
+            self.children[parent_id].append(page_id)
+        return page
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "requests_total": sum(self.requests.values()),
+            "throttled": dict(self.throttled),
+            "throttled_total": sum(self.throttled.values()),
+            "pages": len(self.pages),
+            "blocks": len(self.blocks),
+            "bytes_received": self.bytes_received
+        }
+
+    # Internals
+
+    def _append_children(self, parent_id: str, children: list, after: Optional[str] = None) -> list:
+        siblings = self.children[parent_id]
+        position = siblings.index(after) + 1 if after in siblings else len(siblings)
+        created = []
+        for child in children:
+            block_id = str(uuid.uuid4())
+            block = {
+                "object": "block",
+                "id": block_id,
+                "parent": {"type": "block_id", "block_id": parent_id},
+                "created_time": _now(),
+                "last_edited_time": _now(),
+                "has_children": False,
+                "archived": False,
+                **child
+            }
+            content = block.get(block.get("type", ""))
+            nested = content.pop("children", None) if isinstance(content, dict) else None
+            self.blocks[block_id] = block
+            self.children[block_id] = []
+            if nested:
+                block["has_children"] = True
+                self._append_children(block_id, nested)
+            siblings.insert(position, block_id)
+            position += 1
+            created.append(block)
+        return created
+
+    def _validate_children(self, children: list) -> Optional[JSONResponse]:
+        if len(children) > NOTION_MAX_CHILDREN:
+            return _error(400, "validation_error", f"body failed validation: body.children.length should be ≤ `{NOTION_MAX_CHILDREN}`, instead was `{len(children)}`.")
+        for child in children:
+            content = child.get(child.get("type", ""), {})
+            for item in content.get("rich_text", []) if isinstance(content, dict) else []:
+                text = item.get("text", {}).get("content", "")
+                if len(text) > NOTION_MAX_TEXT_LENGTH:
+                    return _error(400, "validation_error", f"body failed validation: rich_text.text.content.length should be ≤ `{NOTION_MAX_TEXT_LENGTH}`, instead was `{len(text)}`.")
+        return None
+
+    def _list(self, block_id: str, request: Request) -> Dict[str, Any]:
+        ids = self.children.get(block_id, [])
+        page_size = min(int(request.query_params.get("page_size", "100")), 100)
+        cursor = request.query_params.get("start_cursor")
+        start = ids.index(cursor) if cursor in ids else 0
+        window = ids[start:start + page_size]
+        has_more = start + page_size < len(ids)
+        return {
+            "object": "list",
+            "results": [self.blocks[i] for i in window],
+            "next_cursor": ids[start + page_size] if has_more else None,
+            "has_more": has_more,
+            "type": "block",
+            "block": {}
+        }
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def simulate_network(request: Request, call_next):
+            endpoint = _endpoint(request)
+            # Reading the body here would starve the endpoint (BaseHTTPMiddleware)
+            self.bytes_received += int(request.headers.get("content-length", 0))
+
+            delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+
+            wait = self.bucket.take() if self.bucket else 0.0
+            if wait or (self.error_rate and self.random.random() < self.error_rate):
+                self.throttled[endpoint] += 1
+                retry_after = max(wait, self.retry_after)
+                return _error(429, "rate_limited", "You have been rate limited. Please try again in a few minutes.",
+                              headers={"Retry-After": f"{retry_after:.3f}"})
+
+            self.requests[endpoint] += 1
+            return await call_next(request)
+
+        @app.get("/v1/users/me")
+        async def users_me():
+            return {"object": "user", "id": "bench-bot", "type": "bot", "bot": {}}
+
+        @app.get("/v1/databases/{database_id}")
+        async def retrieve_database(database_id: str):
+            database = self.databases.get(database_id)
+            if database is None:
+                return _error(404, "object_not_found", f"Could not find database with ID: {database_id}.")
+            return database
+
+        @app.post("/v1/databases/{database_id}/query")
+        async def query_database(database_id: str):
+            if database_id not in self.databases:
+                return _error(404, "object_not_found", f"Could not find database with ID: {database_id}.")
+            results = [p for p in self.pages.values() if p["parent"].get("database_id") == database_id]
+            return {"object": "list", "results": results[:100], "next_cursor": None, "has_more": len(results) > 100, "type": "page_or_database", "page_or_database": {}}
+
+        @app.post("/v1/pages")
+        async def create_page(request: Request):
+            body = await request.json()
+            children = body.get("children", [])
+            invalid = self._validate_children(children)
+            if invalid:
+                return invalid
+            return self.add_page(body.get("properties", {}), body.get("parent"), children)
+
+        @app.get("/v1/pages/{page_id}")
+        async def retrieve_page(page_id: str):
+            page = self.pages.get(page_id)
+            if page is None:
+                return _error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+            return page
+
+        @app.patch("/v1/pages/{page_id}")
+        async def update_page(page_id: str, request: Request):
+            page = self.pages.get(page_id)
+            if page is None:
+                return _error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+            body = await request.json()
+            for name, value in body.get("properties", {}).items():
+                prop_type = next(iter(value), None)
+                page["properties"][name] = {"id": name, "type": prop_type, **value}
+            if "archived" in body:
+                page["archived"] = body["archived"]
+            page["last_edited_time"] = _now()
+            return page
+
+        @app.get("/v1/blocks/{block_id}")
+        async def retrieve_block(block_id: str):
+            block = self.blocks.get(block_id)
+            if block is None:
+                return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            return block
+
+        @app.patch("/v1/blocks/{block_id}")
+        async def update_block(block_id: str, request: Request):
+            block = self.blocks.get(block_id)
+            if block is None:
+                return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            body = await request.json()
+            for key, value in body.items():
+                if key == block.get("type") and isinstance(value, dict):
+                    block[key] = {**block.get(key, {}), **value}
+                elif key == "archived":
+                    block["archived"] = value
+            block["last_edited_time"] = _now()
+            return block
+
+        @app.delete("/v1/blocks/{block_id}")
+        async def delete_block(block_id: str):
+            block = self.blocks.get(block_id)
+            if block is None:
+                return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            block["archived"] = True
+            parent_id = block["parent"].get("block_id") or block["parent"].get("page_id")
+            if block_id in self.children.get(parent_id, []):
+                self.children[parent_id].remove(block_id)
+            return block
+
+        @app.get("/v1/blocks/{block_id}/children")
+        async def list_children(block_id: str, request: Request):
+            if block_id not in self.children:
+                return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            return self._list(block_id, request)
+
+        @app.patch("/v1/blocks/{block_id}/children")
+        async def append_children(block_id: str, request: Request):
+            if block_id not in self.children:
+                return _error(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            body = await request.json()
+            children = body.get("children", [])
+            invalid = self._validate_children(children)
+            if invalid:
+                return invalid
+            after = body.get("after")
+            if after and after not in self.children[block_id]:
+                return _error(400, "validation_error", f"Block {after} is not a child of {block_id}.")
+            created = self._append_children(block_id, children, after)
+            return {"object": "list", "results": created, "next_cursor": None, "has_more": False, "type": "block", "block": {}}
+
+        return app
+
+
+class FakeOllama:
+    """
+    Ollama stand-in that emits tokens_per_second tokens per generation after
+    load_ms of prompt processing. Like a single-GPU Ollama, at most
+    `parallel` generations run at once and the rest queue, and the first
+    request pays cold_load_ms to load the model; a request without a prompt
+    only loads it.
+    """
+
+    WORDS = ("experience", "team", "engineering", "python", "impact", "systems", "delivered",
+             "customers", "scalable", "ownership", "data", "product", "the", "and", "with", "to")
+
+    def __init__(self, tokens_per_second: float = 40, tokens: int = 300, load_ms: float = 0,
+                 parallel: int = 1, model: str = "llama3.2", cold_load_ms: float = 0):
+        self.tokens_per_second = tokens_per_second
+        self.tokens = tokens
+        self.load_ms = load_ms
+        self.parallel = parallel
+        self.model = model
+        self.cold_load_ms = cold_load_ms
+        self.model_loads = 0
+        self._loaded = False
+        self.generations = 0
+        self.tokens_generated = 0
+        self.queue_wait_ms = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.app = self._build_app()
+        self.server: Optional[BackgroundServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return self.server.base_url
+
+    def start(self) -> "FakeOllama":
+        self.server = BackgroundServer(self.app).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.queue_wait_ms) or [0]
+        return {
+            "generations": self.generations,
+            "tokens_generated": self.tokens_generated,
+            "tokens_per_second": self.tokens_per_second,
+            "parallel": self.parallel,
+            "model_loads": self.model_loads,
+            "queue_wait_p50_ms": round(waits[len(waits) // 2], 2),
+            "queue_wait_max_ms": round(waits[-1], 2)
+        }
+
+    def _token(self, index: int) -> str:
+        word = self.WORDS[index % len(self.WORDS)]
+        return ("\n\n" if index and index % 60 == 0 else " ") + word if index else word.capitalize()
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/api/tags")
+        async def tags():
+            return {"models": [{"name": f"{self.model}:latest", "model": f"{self.model}:latest", "size": 2019393189}]}
+
+        @app.post("/api/generate")
+        async def generate(request: Request):
+            body = await request.json()
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.parallel)
+            queued = time.perf_counter()
+            interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+
+            async def load():
+                if not self._loaded:
+                    self._loaded = True
+                    self.model_loads += 1
+                    await asyncio.sleep(self.cold_load_ms / 1000)
+
+            if "prompt" not in body:
+                async with self._slots:
+                    await load()
+                return {"model": self.model, "created_at": _now(), "response": "", "done": True, "done_reason": "load"}
+
+            async def tokens():
+                async with self._slots:
+                    self.queue_wait_ms.append((time.perf_counter() - queued) * 1000)
+                    await load()
+                    self.generations += 1
+                    if self.load_ms:
+                        await asyncio.sleep(self.load_ms / 1000)
+                    started = time.perf_counter()
+                    for index in range(self.tokens):
+                        # Sleep to the schedule rather than per token so the rate holds
+                        ahead = started + (index + 1) * interval - time.perf_counter()
+                        if ahead > 0:
+                            await asyncio.sleep(ahead)
+                        self.tokens_generated += 1
+                        yield self._token(index)
+
+            if body.get("stream", True):
+                async def stream():
+                    async for token in tokens():
+                        yield json.dumps({"model": self.model, "created_at": _now(), "response": token, "done": False}) + "\n"
+                    yield json.dumps({"model": self.model, "created_at": _now(), "response": "", "done": True, "eval_count": self.tokens}) + "\n"
+                return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+            text = "".join([token async for token in tokens()])
+            return {"model": self.model, "created_at": _now(), "response": text, "done": True, "eval_count": self.tokens}
+
+        return app
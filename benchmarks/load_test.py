@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Throughput scaling with the number of uvicorn workers. For each worker count
+a server is started on a scratch OUTPUT_DIR, driven with concurrent
+POST /resume/variants requests (CPU-bound template and Markdown rendering)
+for a fixed duration, and requests/sec, latency percentiles and scaling
+efficiency relative to one worker are reported.
+
+--dedup-check also sends every webhook payload twice, concurrently, and
+verifies that each page is accepted exactly once across workers.
+
+Usage: python benchmarks/load_test.py [--workers 1,2,4] [--duration 10] [--concurrency 32] [--dedup-check]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import httpx
+
+from fakes import free_port
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JOB = {
+    "job_title": "Senior Python Developer",
+    "company_name": "Load Test Corp",
+    "job_description": "Python, FastAPI, AWS, Docker, PostgreSQL and machine learning experience required.",
+    "notion_page_id": "load-test"
+}
+
+
+def start_server(workers: int, scratch: str, extra_env: dict = None) -> tuple:
+    port = free_port()
+    env = {
+        **os.environ,
+        "OUTPUT_DIR": os.path.join(scratch, "output"),
+        "TEMPLATES_DIR": os.path.join(scratch, "templates"),
+        "STATE_DB_PATH": os.path.join(scratch, "state.db"),
+        # Keep background probes (Notion, Ollama) out of the measurement
+        "HEALTH_PROBE_INTERVAL": "3600",
+        "WEB_CONCURRENCY": str(workers),
+        **(extra_env or {})
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health/live", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def drive(base_url: str, duration: float, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    url = f"{base_url}/resume/variants?variants=one_page,two_page,ats_plain,notion"
+    stop_at = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=JOB)
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies) or [0]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "mean_ms": round(statistics.mean(ordered), 2)
+    }
+
+
+async def dedup_check(base_url: str, pages: int) -> dict:
+    """Send each webhook twice at once; each page must be accepted exactly once"""
+    def payload(index: int) -> dict:
+        return {"data": {
+            "id": f"load-test-page-{index}",
+            "last_edited_time": "2024-01-01T00:00:00.000Z",
+            "properties": {"Name": {"type": "title", "title": [{"plain_text": f"Role {index}"}]}}
+        }}
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        requests = [client.post(f"{base_url}/webhook/notion", json=payload(i)) for i in range(pages) for _ in range(2)]
+        responses = await asyncio.gather(*requests)
+
+    accepted = sum(1 for r in responses if r.status_code == 200 and r.json().get("status") == "accepted")
+    duplicates = sum(1 for r in responses if r.status_code == 200 and r.json().get("status") == "duplicate")
+    return {"pages": pages, "accepted": accepted, "duplicates": duplicates, "ok": accepted == pages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput scaling across uvicorn workers")
+    parser.add_argument("--workers", default=f"1,2,{os.cpu_count() or 1}", help="Comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--dedup-check", action="store_true", help="Also verify webhook de-duplication across workers")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    worker_counts = sorted({int(w) for w in args.workers.split(",") if w.strip()})
+    print(f"{os.cpu_count()} CPUs available")
+    results = {}
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as scratch:
+            process, base_url = start_server(workers, scratch)
+            try:
+                # Warm templates and imports in every worker before measuring
+                asyncio.run(drive(base_url, 2, args.concurrency))
+                result = asyncio.run(drive(base_url, args.duration, args.concurrency))
+                if args.dedup_check:
+                    result["dedup"] = asyncio.run(dedup_check(base_url, 20))
+            finally:
+                stop_server(process)
+        results[workers] = result
+
+    baseline = results[worker_counts[0]]["rps"] / worker_counts[0] if worker_counts else 0
+    for workers, result in results.items():
+        efficiency = result["rps"] / (baseline * workers) if baseline else 0
+        result["scaling_efficiency"] = round(efficiency, 3)
+        line = (f"{workers:>2} workers  {result['rps']:8.1f} req/s   p50 {result['p50_ms']:7.1f} ms   "
+                f"p95 {result['p95_ms']:7.1f} ms   errors {result['errors']:<4} efficiency {efficiency:5.0%}")
+        if "dedup" in result:
+            line += f"   dedup {'ok' if result['dedup']['ok'] else 'FAILED'} ({result['dedup']['accepted']}/{result['dedup']['pages']} accepted)"
+        print(line)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
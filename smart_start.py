@@ -38,8 +38,27 @@ def get_port():
     print("🔧 No valid PORT found, using default: 8000")
     return 8000
 
+def get_workers():
+    """
+    Number of worker processes from WEB_CONCURRENCY: a number, or 'auto' for
+    one per CPU. Defaults to a single worker.
+    """
+    value = os.environ.get('WEB_CONCURRENCY', '1').strip().lower()
+    
+    if value == 'auto':
+        workers = os.cpu_count() or 1
+    elif value.isdigit() and int(value) > 0:
+        workers = int(value)
+    else:
+        print(f"⚠️ Invalid WEB_CONCURRENCY '{value}', using 1 worker")
+        workers = 1
+    
+    print(f"👷 Using {workers} worker process(es)")
+    return workers
+
 def main():
     port = get_port()
+    workers = get_workers()
     
     print(f"🚀 Starting JobBuilder on port {port}...")
     
@@ -51,10 +70,17 @@ def main():
         "--port", str(port)
     ]
     
+    if workers > 1:
+        # Workers share dedup, job and lease state through STATE_DB_PATH (SQLite, WAL mode)
+        cmd += ["--workers", str(workers)]
+    
     print(f"📋 Running command: {' '.join(cmd)}")
     
+    # uvicorn also reads WEB_CONCURRENCY and doesn't understand 'auto'
+    env = {**os.environ, 'WEB_CONCURRENCY': str(workers)}
+    
     try:
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, check=True, env=env)
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to start server: {e}")
         sys.exit(1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the circuit breaker state machine, on a fake clock
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils import breaker as breaker_module
+from app.utils.breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    return clock
+
+
+def make_breaker(**options) -> CircuitBreaker:
+    settings = {"window": 60, "min_calls": 4, "failure_rate": 0.5, "open_seconds": 30, "half_open_calls": 2}
+    settings.update(options)
+    return CircuitBreaker("test", **settings)
+
+
+def test_opens_at_failure_rate_once_min_calls_reached(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    # 3 of 3 failed, but fewer than min_calls
+    assert breaker.state == CLOSED
+
+    breaker.record_success()
+    breaker.record_failure()
+    # 4 of 5 failed
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 61
+    breaker.record_failure()
+    # Only the last failure is still inside the window
+    assert breaker.state == CLOSED
+
+
+def test_half_open_closes_after_successful_trials(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 29
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(1)
+
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    # Only half_open_calls trial calls are let through
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    # Closing starts a fresh window
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(30)
+
+
+def test_lost_trial_calls_are_replaced_after_open_seconds(clock):
+    breaker = make_breaker(half_open_calls=1)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    # The trial call never reported back
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
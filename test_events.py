@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for job event channels being dropped when the buffer is full
+"""
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.events import JobEvents
+
+
+async def next_event(stream):
+    return await asyncio.wait_for(stream.__anext__(), 1)
+
+
+def test_channels_with_subscribers_outlive_idle_ones():
+    async def run():
+        events = JobEvents(max_jobs=2)
+        events.open("a")
+        events.publish("started", job_id="a")
+        stream = events.subscribe("a")
+        assert (await next_event(stream))["event"] == "started"
+
+        events.open("b")
+        events.open("c")
+        # "b" is newer but idle, so it goes instead of "a"
+        assert events.known("a") and not events.known("b") and events.known("c")
+
+        events.publish("done", job_id="a")
+        assert (await next_event(stream))["event"] == "done"
+    asyncio.run(run())
+
+
+def test_evicted_channel_ends_its_streams():
+    async def run():
+        events = JobEvents(max_jobs=1)
+        events.open("a")
+        events.publish("started", job_id="a")
+        stream = events.subscribe("a")
+        assert (await next_event(stream))["event"] == "started"
+
+        events.open("b")
+        assert not events.known("a")
+        message = await next_event(stream)
+        assert message["event"] == "evicted" and message["id"] == 2
+        try:
+            await next_event(stream)
+            assert False, "stream should have ended"
+        except StopAsyncIteration:
+            pass
+    asyncio.run(run())
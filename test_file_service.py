@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for serving generated files: byte ranges, ETag revalidation and 416s
+"""
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.artifact_service import ArtifactStore
+from app.services.file_service import FileService, RangeNotSatisfiable, _parse_range
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 100)),
+    ("bytes=100-", (100, 924)),
+    ("bytes=1000-5000", (1000, 24)),
+    ("bytes=-24", (1000, 24)),
+    ("bytes=-5000", (0, 1024)),
+    (" bytes=5-5 ", (5, 1))
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, len(CONTENT)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=0-1,5-6", "items=0-10", "bytes=-", "bytes=10-5", "bytes=a-b"])
+def test_parse_range_ignores_ranges_it_does_not_honour(header):
+    assert _parse_range(header, len(CONTENT)) is None
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1024-", 1024), ("bytes=-0", 1024), ("bytes=0-10", 0)])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        _parse_range(header, size)
+
+
+@pytest.fixture
+def client(tmp_path):
+    with open(tmp_path / "resume.pdf", "wb") as f:
+        f.write(CONTENT)
+    files = FileService(ArtifactStore(str(tmp_path)))
+
+    app = FastAPI()
+
+    @app.get("/files/{filename}")
+    async def download(filename: str, request: Request):
+        return await files.build_response(filename, request.headers)
+
+    return TestClient(app)
+
+
+def test_full_download(client):
+    response = client.get("/files/resume.pdf")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_single_range(client):
+    response = client.get("/files/resume.pdf", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+    assert response.headers["content-length"] == "10"
+
+
+def test_multiple_ranges_get_the_whole_file(client):
+    response = client.get("/files/resume.pdf", headers={"Range": "bytes=0-1,5-6"})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert "content-range" not in response.headers
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/files/resume.pdf", headers={"Range": "bytes=2000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1024"
+
+
+def test_etag_revalidation(client):
+    etag = client.get("/files/resume.pdf").headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    response = client.get("/files/resume.pdf", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert client.get("/files/resume.pdf", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/files/resume.pdf", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_range_with_a_stale_etag_gets_the_whole_file(client):
+    response = client.get("/files/resume.pdf", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+@pytest.mark.parametrize("filename", ["missing.pdf", ".index.json", "..%2Fsecret"])
+def test_unknown_or_hidden_files_are_not_found(client, filename):
+    assert client.get(f"/files/{filename}").status_code == 404
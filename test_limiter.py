@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Tests for the AIMD concurrency limiter, on a fake clock
+"""
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils import limiter as limiter_module
+from app.utils.limiter import AdaptiveLimiter
+from app.utils.metrics import metrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(limiter_module, "time", clock)
+    return clock
+
+
+def make_limiter(initial: float, min_limit: float = 1, max_limit: float = 10) -> AdaptiveLimiter:
+    return AdaptiveLimiter("test", initial=initial, min_limit=min_limit, max_limit=max_limit, backoff=0.5, tolerance=2.0)
+
+
+async def call(limiter: AdaptiveLimiter, clock: FakeClock, seconds: float = 0.1, error: BaseException = None, overloaded: bool = False):
+    """One call taking `seconds`; overloaded calls (429, timeout) mark their slot before raising"""
+    try:
+        async with limiter.slot("op") as slot:
+            clock.now += seconds
+            if overloaded:
+                slot.fail()
+            if error is not None:
+                raise error
+    except Exception as e:
+        if e is not error:
+            raise
+
+
+async def saturated_round(limiter: AdaptiveLimiter, clock: FakeClock):
+    """Fill every place, then complete the calls successfully"""
+    slots = [await limiter.acquire("op") for _ in range(int(limiter.limit))]
+    clock.now += 0.1
+    for slot in slots:
+        limiter.release(slot)
+
+
+def test_success_while_saturated_adds_one_over_limit(clock):
+    limiter = make_limiter(initial=2)
+    asyncio.run(saturated_round(limiter, clock))
+    # Only the first release happened at full use: 2 + 1/2
+    assert limiter.limit == pytest.approx(2.5)
+    assert limiter.in_flight == 0
+
+
+def test_success_below_the_limit_does_not_grow_it(clock):
+    limiter = make_limiter(initial=4)
+    asyncio.run(call(limiter, clock))
+    assert limiter.limit == 4
+
+
+def test_increase_is_clamped_at_max(clock):
+    limiter = make_limiter(initial=3, max_limit=3)
+    for _ in range(3):
+        asyncio.run(saturated_round(limiter, clock))
+    assert limiter.limit == 3
+
+
+@pytest.mark.parametrize("error", [asyncio.TimeoutError(), Exception("429 rate limited")])
+def test_overload_multiplies_by_backoff(clock, error):
+    limiter = make_limiter(initial=8)
+    asyncio.run(call(limiter, clock, error=error, overloaded=True))
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_decrease_is_clamped_at_min(clock):
+    limiter = make_limiter(initial=3, min_limit=2)
+    for _ in range(3):
+        clock.now += 10
+        asyncio.run(call(limiter, clock, error=asyncio.TimeoutError(), overloaded=True))
+    assert limiter.limit == 2
+
+
+def test_one_burst_of_failures_decreases_once(clock):
+    limiter = make_limiter(initial=8)
+
+    async def burst():
+        slots = [await limiter.acquire("op") for _ in range(4)]
+        clock.now += 1
+        for slot in slots:
+            slot.fail()
+            limiter.release(slot, asyncio.TimeoutError())
+    asyncio.run(burst())
+    assert limiter.limit == 4
+
+    # Calls started after the cut count again
+    clock.now += 2
+    asyncio.run(call(limiter, clock, seconds=1, error=asyncio.TimeoutError(), overloaded=True))
+    assert limiter.limit == 2
+
+
+def test_unmarked_error_leaves_the_limit_alone(clock):
+    limiter = make_limiter(initial=1)
+    asyncio.run(call(limiter, clock, error=KeyError("404")))
+    assert limiter.limit == 1
+    assert "op" not in limiter.baselines
+
+
+def test_latency_spike_decreases(clock):
+    limiter = make_limiter(initial=8)
+    asyncio.run(call(limiter, clock, seconds=0.1))
+    assert limiter.baselines["op"] == pytest.approx(0.1)
+    asyncio.run(call(limiter, clock, seconds=0.15))
+    assert limiter.limit == 8
+    asyncio.run(call(limiter, clock, seconds=0.5))
+    assert limiter.limit == 4
+
+
+def test_waiters_are_admitted_as_places_free_up(clock):
+    limiter = make_limiter(initial=1)
+
+    async def run():
+        first = await limiter.acquire("op")
+        waiter = asyncio.ensure_future(limiter.acquire("op"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert limiter.snapshot()["waiting"] == 1
+        limiter.release(first)
+        second = await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 1
+        limiter.release(second)
+    asyncio.run(run())
+    assert limiter.in_flight == 0
+
+
+def test_waiter_cancelled_while_queued_does_not_give_back_a_place(clock):
+    limiter = make_limiter(initial=1, max_limit=1)
+
+    async def run():
+        held = await limiter.acquire("op")
+        waiter = asyncio.ensure_future(limiter.acquire("op"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release(held)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+    asyncio.run(run())
+    assert limiter.in_flight == 0
+    assert limiter.snapshot()["waiting"] == 0
+
+
+def test_waiter_cancelled_after_admission_gives_its_place_back(clock):
+    limiter = make_limiter(initial=1, max_limit=1)
+
+    async def run():
+        held = await limiter.acquire("op")
+        waiter = asyncio.ensure_future(limiter.acquire("op"))
+        await asyncio.sleep(0)
+        # The place is handed over, then the waiter is cancelled before it wakes up
+        limiter.release(held)
+        assert limiter.in_flight == 1
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        assert limiter.in_flight == 0
+        # The limit still holds afterwards
+        first = await limiter.acquire("op")
+        second = asyncio.ensure_future(limiter.acquire("op"))
+        await asyncio.sleep(0)
+        assert not second.done()
+        limiter.release(first)
+        limiter.release(await second)
+    asyncio.run(run())
+    assert limiter.in_flight == 0
+
+
+def test_calls_with_metrics_suppressed_leave_the_limit_alone(clock):
+    limiter = make_limiter(initial=1)
+
+    async def cold_calls():
+        with metrics.suppressed():
+            # A slow first call and an overload, as a cold start might produce
+            await call(limiter, clock, seconds=5.0)
+            await call(limiter, clock, overloaded=True, error=RuntimeError("429"))
+
+    asyncio.run(cold_calls())
+    assert limiter.limit == 1
+    assert limiter.baselines == {}
+    assert limiter.in_flight == 0
+
+    asyncio.run(call(limiter, clock, seconds=0.1))
+    assert limiter.baselines["op"] == pytest.approx(0.1)
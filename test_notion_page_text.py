@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for reading a job description from the Notion page body, against the
+in-memory Notion API from benchmarks/fakes.py
+"""
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from fakes import FakeNotion
+from app.services.notion_service import NotionService
+
+
+def text_block(block_type: str, content: str, **extra) -> dict:
+    return {"type": block_type, block_type: {"rich_text": [{"type": "text", "text": {"content": content}, "plain_text": content}], **extra}}
+
+
+@pytest.fixture(scope="module")
+def notion():
+    server = FakeNotion().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def service(notion, monkeypatch):
+    monkeypatch.setenv("NOTION_API_KEY", "test")
+    monkeypatch.setenv("NOTION_BASE_URL", notion.base_url)
+    return NotionService()
+
+
+def test_page_text_follows_pagination_and_nesting(notion, service):
+    # 150 top-level blocks take two blocks.children.list pages of 100
+    paragraphs = [text_block("paragraph", f"Line {i}") for i in range(148)]
+    toggle = text_block("toggle", "Requirements", children=[
+        text_block("bulleted_list_item", "Python", children=[text_block("paragraph", "FastAPI")]),
+        text_block("to_do", "Docker", checked=True)
+    ])
+    table = {"type": "table_row", "table_row": {"cells": [[{"plain_text": "Level"}], [{"plain_text": "Senior"}]]}}
+    page = notion.add_page({}, children=[*paragraphs, toggle, table])
+
+    text = asyncio.run(service.get_page_text(page["id"]))
+
+    expected = [f"Line {i}" for i in range(148)] + [
+        "Requirements",
+        "  - Python",
+        "    FastAPI",
+        "  [x] Docker",
+        "Level | Senior"
+    ]
+    assert text == "\n".join(expected)
+
+
+def test_page_text_cached_by_last_edited_time(notion, service):
+    page = notion.add_page({}, children=[text_block("heading_2", "About"), text_block("quote", "Ship it")])
+    edited = page["last_edited_time"]
+
+    first = asyncio.run(service.get_page_text(page["id"], edited))
+    requests = sum(notion.requests.values())
+    second = asyncio.run(service.get_page_text(page["id"], edited))
+
+    assert first == second == "About\n> Ship it"
+    assert sum(notion.requests.values()) == requests
+
+    # A new last_edited_time misses the cache and reads the page again
+    notion.children[page["id"]].pop()
+    assert asyncio.run(service.get_page_text(page["id"], "2030-01-01T00:00:00.000Z")) == "About"
+    assert sum(notion.requests.values()) > requests
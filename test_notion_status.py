@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for batch job status lookups and the status cache
+"""
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.notion_service import NotionService
+
+
+def page(page_id: str, status: str) -> dict:
+    return {
+        "id": page_id,
+        "last_edited_time": "2026-01-01T00:00:00.000Z",
+        "properties": {"Status": {"type": "select", "select": {"name": status}}}
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("NOTION_API_KEY", "test")
+    monkeypatch.setenv("NOTION_STATUS_CONCURRENCY", "1")
+    return NotionService()
+
+
+def test_cached_pages_do_not_wait_for_a_slot(service, monkeypatch):
+    log = []
+
+    async def fetch(page_id):
+        log.append(f"fetch {page_id}")
+        await asyncio.sleep(0.05)
+        log.append(f"fetched {page_id}")
+        return {"page_id": page_id}
+
+    cached_job_status = service._cached_job_status
+
+    def cached_lookup(page_id):
+        status = cached_job_status(page_id)
+        if status is not None:
+            log.append(f"answered {page_id}")
+        return status
+
+    monkeypatch.setattr(service, "_fetch_job_status", fetch)
+    monkeypatch.setattr(service, "_cached_job_status", cached_lookup)
+    service.remember_job_status(page("cached", "Applied"))
+
+    results = asyncio.run(service.get_job_statuses(["slow", "other", "cached"]))
+
+    assert results["cached"]["status"] == "Applied"
+    assert results["other"] == {"page_id": "other"}
+    # The second miss waited for the only slot; the cached page did not
+    assert log.index("fetch other") > log.index("fetched slow")
+    assert log.index("answered cached") < log.index("fetched slow")
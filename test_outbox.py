@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for queueing and replaying Notion writes while the breaker is open
+"""
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.outbox_service import NotionOutbox
+from app.services.state_service import SharedState
+from app.utils.breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeNotion:
+    """
+    Records the writes it receives. `failing` pages raise, or return False
+    like NotionService on an outage with `returns_false`; `opens_on` opens
+    the breaker.
+    """
+
+    def __init__(self):
+        self.breaker = CircuitBreaker("notion-test", window=60, min_calls=1, failure_rate=0.5, open_seconds=3600, half_open_calls=1)
+        self.calls = []
+        self.failing = set()
+        self.returns_false = False
+        self.opens_on = None
+
+    async def sync_child_page(self, parent_page_id: str, title: str, content: str):
+        self.breaker.check()
+        self.calls.append(("sync_child_page", parent_page_id, title, content))
+        return parent_page_id
+
+    async def update_job_status(self, page_id: str, status: str, files=None):
+        if page_id == self.opens_on:
+            self.breaker.record_failure()
+            raise CircuitOpenError("notion-test", 3600)
+        if page_id in self.failing:
+            if self.returns_false:
+                return False
+            raise Exception("Failed to update job status: 500")
+        self.calls.append(("update_job_status", page_id, status))
+        return True
+
+
+@pytest.fixture
+def notion():
+    return FakeNotion()
+
+
+@pytest.fixture
+def outbox(tmp_path, notion):
+    box = NotionOutbox(SharedState(str(tmp_path / "state.db")), notion)
+    box.max_attempts = 3
+    return box
+
+
+def open_breaker(notion: FakeNotion):
+    notion.breaker.record_failure()
+    assert notion.breaker.is_open
+
+
+def close_breaker(notion: FakeNotion):
+    notion.breaker._transition("closed")
+
+
+def test_write_goes_straight_through_while_closed(outbox, notion):
+    assert asyncio.run(outbox.write("update_job_status", page_id="p1", status="Applied")) is True
+    assert notion.calls == [("update_job_status", "p1", "Applied")]
+    assert outbox.state.outbox_size() == 0
+
+
+def test_write_that_returns_false_is_queued(outbox, notion):
+    notion.failing.add("p1")
+    notion.returns_false = True
+    assert asyncio.run(outbox.write("update_job_status", page_id="p1", status="Applied")) is False
+    assert [entry["operation"] for entry in outbox.state.pending()] == ["update_job_status"]
+
+    notion.failing.clear()
+    assert asyncio.run(outbox.flush()) == {"sent": 1, "failed": 0, "dropped": 0}
+    assert notion.calls == [("update_job_status", "p1", "Applied")]
+
+
+def test_queued_writes_replay_latest_content_in_order(outbox, notion):
+    open_breaker(notion)
+
+    async def queue():
+        assert await outbox.write("sync_child_page", parent_page_id="p1", title="Resume", content="v1") is False
+        assert await outbox.write("update_job_status", page_id="p1", status="Applied") is False
+        # Same page and title: replaces v1 and moves behind the status update
+        assert await outbox.write("sync_child_page", parent_page_id="p1", title="Resume", content="v2") is False
+    asyncio.run(queue())
+    assert notion.calls == []
+    assert outbox.state.outbox_size() == 2
+
+    # Nothing is replayed while the breaker is still open
+    assert asyncio.run(outbox.flush()) == {"sent": 0, "failed": 0, "dropped": 0}
+
+    close_breaker(notion)
+    assert asyncio.run(outbox.flush()) == {"sent": 2, "failed": 0, "dropped": 0}
+    assert notion.calls == [
+        ("update_job_status", "p1", "Applied"),
+        ("sync_child_page", "p1", "Resume", "v2")
+    ]
+    assert outbox.state.outbox_size() == 0
+
+
+def test_failing_write_is_retried_then_dropped(outbox, notion):
+    notion.failing.add("p1")
+    asyncio.run(outbox.add("update_job_status", page_id="p1", status="Applied"))
+    asyncio.run(outbox.add("update_job_status", page_id="p2", status="Applied"))
+
+    assert asyncio.run(outbox.flush()) == {"sent": 1, "failed": 1, "dropped": 0}
+    assert asyncio.run(outbox.flush()) == {"sent": 0, "failed": 1, "dropped": 0}
+    assert asyncio.run(outbox.flush()) == {"sent": 0, "failed": 0, "dropped": 1}
+    assert outbox.state.outbox_size() == 0
+    assert notion.calls == [("update_job_status", "p2", "Applied")]
+
+
+def test_flush_stops_when_the_breaker_opens(outbox, notion):
+    notion.opens_on = "p1"
+    for page_id in ("p1", "p2"):
+        asyncio.run(outbox.add("update_job_status", page_id=page_id, status="Applied"))
+
+    assert asyncio.run(outbox.flush()) == {"sent": 0, "failed": 0, "dropped": 0}
+    # Both stay queued without using up an attempt
+    assert [entry["attempts"] for entry in outbox.state.pending()] == [0, 0]
+    assert notion.calls == []
+
+
+def test_unknown_operation_is_rejected(outbox):
+    with pytest.raises(Exception, match="unknown operation"):
+        asyncio.run(outbox.add("pages.delete", page_id="p1"))
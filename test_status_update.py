@@ -11,10 +11,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Add app directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from services.notion_service import NotionService
+from app.services.notion_service import NotionService
 
 async def test_status_update():
     """Test updating Notion status"""
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for startup warm-up steps
+"""
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.warmup_service import WarmUp
+from app.utils.metrics import metrics
+
+
+def test_warm_up_steps_are_not_counted_in_metrics():
+    counter = metrics.counter("test_warmup_calls_total", "Calls made by the test steps", ("step",))
+    histogram = metrics.histogram("test_warmup_call_seconds", "Duration of the test steps", ("step",))
+
+    def blocking_step():
+        counter.inc(step="blocking")
+        histogram.observe(0.5, step="blocking")
+
+    async def async_step():
+        counter.inc(step="async")
+        with metrics.dependency_request("test", "warm_up"):
+            await asyncio.sleep(0)
+
+    warm_up = WarmUp(enabled=True, timeout=5)
+    warm_up.register("blocking", blocking_step)
+    warm_up.register("async", async_step)
+    results = asyncio.run(warm_up.run())
+
+    assert {name: result["status"] for name, result in results.items()} == {"blocking": "ok", "async": "ok"}
+    assert counter.get(step="blocking") == 0
+    assert counter.get(step="async") == 0
+    assert histogram.count(step="blocking") == 0
+    assert metrics.dependency_request_duration.count(dependency="test", operation="warm_up") == 0
+
+    # Outside warm-up the same calls are recorded
+    blocking_step()
+    assert counter.get(step="blocking") == 1
+    assert histogram.count(step="blocking") == 1